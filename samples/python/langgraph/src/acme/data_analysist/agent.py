@@ -1,50 +1,43 @@
-"""LangGraph bootstrapper that builds a StateGraph based on local ADP metadata."""
+"""LangGraph bootstrapper that compiles the ADP flow into a StateGraph."""
 from __future__ import annotations
 
 import json
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
-import yaml
+from adp_sdk.adp_model import ADP
+from adp_sdk.flowgraph import FlowCompiler
 
-try:
-    from langgraph.graph import StateGraph
-except ImportError:  # pragma: no cover - optional dependency
-    StateGraph = None
+ADP_PATH = Path(__file__).resolve().parents[3] / "adp" / "agent.yaml"
 
 
-def load_adp(path: Path | None = None) -> dict[str, Any]:
-    """Load the ADP manifest adjacent to this module."""
-    if path is None:
-        path = Path(__file__).resolve().parents[3] / "adp" / "agent.yaml"
-    return yaml.safe_load(path.read_text())
+def greet(adp: ADP, node: dict) -> Callable[[dict], dict]:
+    """Handler for the ``invoke-graph`` node; runs once per compile."""
+    prompts = getattr(adp, "prompts", None) or {}
+    system_prompt = (
+        prompts.get("system") or "You are the Acme LangGraph sample agent."
+    ).strip()
 
+    def run(state: dict) -> dict:
+        return {
+            "agent_id": adp.id,
+            "name": adp.name,
+            "system_prompt": system_prompt,
+            "message": "Hello from LangGraph",
+        }
 
-def build_graph() -> Any:
-    """Build and compile a LangGraph StateGraph using ADP metadata for context."""
-    if StateGraph is None:
-        raise ImportError("langgraph is not installed")
+    return run
 
-    adp = load_adp()
-    class State(dict):
-        pass
 
-    graph = StateGraph(State)
+# One compiler per process: agent.yaml is re-read only when its mtime or size
+# changes, and the graph is rebuilt only when its content does.
+COMPILER = FlowCompiler({"invoke-graph": greet})
 
-    def start(state: State) -> State:
-        state["agent_id"] = adp.get("id")
-        state["name"] = adp.get("name")
-        system_prompt = (
-            adp.get("prompts", {}).get("system")
-            or "You are the Acme LangGraph sample agent."
-        )
-        state["system_prompt"] = system_prompt.strip()
-        state["message"] = "Hello from LangGraph"
-        return state
 
-    graph.add_node("start", start)
-    graph.set_entry_point("start")
-    return graph.compile()
+def build_graph(path: Path | None = None) -> Any:
+    """Return the compiled graph for ``flow.graph`` in the ADP manifest."""
+    return COMPILER.for_file(path or ADP_PATH)
 
 
 def main() -> Any:
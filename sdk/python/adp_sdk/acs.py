@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import posixpath
+import shlex
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from pathlib import Path
+
+import yaml
+from jsonschema import Draft202012Validator
+
+from .validation import _load_schema
+
+# Copy groups, in the order they are emitted: sources that change least go
+# first so edits under src/ only rebuild the last layer.
+_COPY_GROUPS = ("adp", "other", "src")
+
+
+@lru_cache(maxsize=1)
+def _validator() -> Draft202012Validator:
+    # The ACS schema has no $refs, so one validator can be shared.
+    return Draft202012Validator(_load_schema("acs.schema.json"))
+
+
+def load_acs(path: str | Path) -> dict:
+    data = yaml.safe_load(Path(path).read_text())
+    if not isinstance(data, dict):
+        raise TypeError(f"{path}: ACS document must be a mapping")
+    return data
+
+
+def validate_acs(acs: dict) -> list[str]:
+    """Validate an ACS document against ``acs.schema.json``."""
+    errors = []
+    for error in _validator().iter_errors(acs):
+        where = "/".join(str(p) for p in error.path)
+        errors.append(f"{where}: {error.message}" if where else error.message)
+    return errors
+
+
+@dataclass
+class BuildStep:
+    name: str
+    instructions: list[str]
+    inputs: list[str] = field(default_factory=list)
+    digest: str = ""
+
+
+@dataclass
+class BuildPlan:
+    steps: list[BuildStep]
+    warnings: list[str] = field(default_factory=list)
+
+    def digests(self) -> dict[str, str]:
+        return {step.name: step.digest for step in self.steps}
+
+    def changed_since(self, previous: dict[str, str]) -> list[BuildStep]:
+        """Steps to rebuild given the digests of a previous build.
+
+        Each digest already covers every earlier step, so this is the first
+        step whose digest differs and everything after it.
+        """
+        for i, step in enumerate(self.steps):
+            if previous.get(step.name) != step.digest:
+                return self.steps[i:]
+        return []
+
+    def dockerfile(self) -> str:
+        lines = []
+        for step in self.steps:
+            lines.append(f"# {step.name} {step.digest}")
+            lines.extend(step.instructions)
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        return {
+            "steps": [
+                {
+                    "name": s.name,
+                    "digest": s.digest,
+                    "instructions": s.instructions,
+                    "inputs": s.inputs,
+                }
+                for s in self.steps
+            ],
+            "warnings": self.warnings,
+        }
+
+
+def _hash_tree(hasher, root: Path, src: str) -> None:
+    path = (root / src).resolve()
+    if not path.is_relative_to(root.resolve()):
+        raise ValueError(f"build.copy source is outside the build root: {src}")
+    if not path.exists():
+        raise FileNotFoundError(f"build.copy source not found: {src}")
+    files = (
+        [path] if path.is_file() else sorted(p for p in path.rglob("*") if p.is_file())
+    )
+    for file_path in files:
+        rel = file_path.relative_to(root.resolve()).as_posix()
+        hasher.update(rel.encode() + b"\0")
+        with file_path.open("rb") as f:
+            for chunk in iter(partial(f.read, 1024 * 1024), b""):
+                hasher.update(chunk)
+        hasher.update(b"\0")
+
+
+def _copy_group(src: str) -> str:
+    parts = Path(src).parts
+    name = parts[0] if parts else ""
+    return name if name in ("adp", "src") else "other"
+
+
+def _copy_dest(working_dir: str, dest: str) -> str:
+    return posixpath.normpath(posixpath.join(working_dir, dest))
+
+
+def _overlaps(a: str, b: str) -> bool:
+    return (
+        a == b or a.startswith(b.rstrip("/") + "/") or b.startswith(a.rstrip("/") + "/")
+    )
+
+
+def _grouped_copies(copies: list[dict], working_dir: str) -> dict[str, list[dict]]:
+    """Group ``copies`` for caching, keeping declared order within a group.
+
+    Grouping moves entries ahead of ones declared earlier; if two such
+    entries write overlapping destinations that would change which one
+    wins in the image, so it is an error.
+    """
+    groups: dict[str, list[dict]] = {g: [] for g in _COPY_GROUPS}
+    for entry in copies:
+        groups[_copy_group(entry["src"])].append(entry)
+    rank = {id(e): i for i, e in enumerate(copies)}
+    emitted = [e for g in _COPY_GROUPS for e in groups[g]]
+    for i, first in enumerate(emitted):
+        for later in emitted[i + 1 :]:
+            if rank[id(later)] > rank[id(first)]:
+                continue
+            if _overlaps(
+                _copy_dest(working_dir, first["dest"]),
+                _copy_dest(working_dir, later["dest"]),
+            ):
+                raise ValueError(
+                    f"build.copy entries {later['src']!r} and {first['src']!r} "
+                    "have overlapping destinations; grouping them for layer "
+                    "caching would change which one wins"
+                )
+    return groups
+
+
+def _is_pinned(requirement: str) -> bool:
+    return "==" in requirement or "@" in requirement
+
+
+def build_plan(acs: dict, root: str | Path) -> BuildPlan:
+    """Turn an ACS document into ordered, content-addressed build steps.
+
+    Steps run base image, system packages, Python packages, then the
+    ``build.copy`` entries grouped as ``adp/``, other paths and ``src/``
+    (declared order is kept within a group, and overlapping destinations
+    may not be reordered), and finally the runtime configuration. Each step's digest hashes its own
+    instructions and copied file contents together with the previous
+    step's digest, mirroring how container layer caches are chained.
+    """
+    errors = validate_acs(acs)
+    if errors:
+        raise ValueError("invalid ACS: " + "; ".join(errors))
+    root_path = Path(root)
+    build = acs["build"]
+    deps = build.get("dependencies") or {}
+    plan = BuildPlan([])
+
+    steps: list[BuildStep] = [
+        BuildStep(
+            "base",
+            [f"FROM {acs['base_image']}", f"WORKDIR {build['working_dir']}"],
+        )
+    ]
+    system = sorted(set(deps.get("system") or []))
+    if system:
+        steps.append(
+            BuildStep(
+                "system-deps",
+                [
+                    "RUN apt-get update"
+                    " && apt-get install -y --no-install-recommends "
+                    + " ".join(shlex.quote(p) for p in system)
+                    + " && rm -rf /var/lib/apt/lists/*"
+                ],
+            )
+        )
+    python = sorted(set(deps.get("python") or []))
+    if python:
+        unpinned = [r for r in python if not _is_pinned(r)]
+        if unpinned:
+            plan.warnings.append(
+                "unpinned python dependencies defeat layer caching: "
+                + ", ".join(unpinned)
+            )
+        steps.append(
+            BuildStep(
+                "python-deps",
+                [
+                    "RUN pip install --no-cache-dir "
+                    + " ".join(shlex.quote(r) for r in python)
+                ],
+            )
+        )
+
+    groups = _grouped_copies(build.get("copy") or [], build["working_dir"])
+    for group in _COPY_GROUPS:
+        entries = groups[group]
+        if entries:
+            steps.append(
+                BuildStep(
+                    f"copy-{group}",
+                    [f"COPY {e['src']} {e['dest']}" for e in entries],
+                    [e["src"] for e in entries],
+                )
+            )
+
+    runtime = acs["runtime"]
+    config = []
+    for env in runtime.get("env") or []:
+        config.append(f"ENV {env}")
+    if runtime.get("ports"):
+        config.append("EXPOSE " + " ".join(str(p) for p in runtime["ports"]))
+    health = runtime.get("healthcheck") or {}
+    if health.get("path") and runtime.get("ports"):
+        url = f"http://localhost:{runtime['ports'][0]}{health['path']}"
+        probe = f"import urllib.request; urllib.request.urlopen({url!r})"
+        config.append(
+            f"HEALTHCHECK --interval={health.get('interval_seconds', 30)}s"
+            f" --timeout={health.get('timeout_seconds', 30)}s"
+            f" CMD python -c {shlex.quote(probe)}"
+        )
+    command = list(runtime["command"]) + list(runtime.get("args") or [])
+    config.append(f"CMD {json.dumps(command)}")
+    steps.append(BuildStep("runtime", config))
+
+    parent = ""
+    for step in steps:
+        hasher = hashlib.sha256(parent.encode())
+        hasher.update("\n".join(step.instructions).encode())
+        for src in step.inputs:
+            _hash_tree(hasher, root_path, src)
+        step.digest = parent = f"sha256:{hasher.hexdigest()}"
+    plan.steps = steps
+    return plan
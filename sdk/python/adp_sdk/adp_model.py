@@ -1,11 +1,25 @@
 from __future__ import annotations
 
+import re
 from pathlib import Path
 from typing import Any
 
 import yaml
 from pydantic import BaseModel, Field
 
+from .aio import run_blocking
+
+try:
+    _Loader: Any = yaml.CSafeLoader
+except AttributeError:  # PyYAML built without libyaml
+    _Loader = yaml.SafeLoader
+
+# A top-level block-mapping key at column 0: ``name:`` or ``"quoted name":``.
+_TOP_KEY = re.compile(
+    r"""^(?:([A-Za-z_][\w.-]*)|"([^"\\]*)"|'([^']*)')[ \t]*:(?:[ \t]|$)"""
+)
+_ANCHOR = re.compile(r"(?:^|[\s\[{,:-])&[^\s,\[\]{}]")
+
 
 class RuntimeEntry(BaseModel):
     backend: str
@@ -48,8 +62,118 @@ class ADP(BaseModel):
         data = yaml.safe_load(Path(path).read_text())
         return cls.model_validate(data)
 
+    @classmethod
+    async def afrom_file(cls, path: str | Path) -> ADP:
+        return await run_blocking(cls.from_file, path)
+
     def to_yaml(self, path: str | Path | None = None) -> str:
         text = yaml.safe_dump(self.model_dump(exclude_none=True), sort_keys=False)
         if path:
             Path(path).write_text(text)
         return text
+
+
+def split_sections(text: str) -> dict[str, str] | None:
+    """Split a YAML block mapping into its top-level ``key: ...`` sections.
+
+    Returns ``None`` when the document cannot be split safely (anchors,
+    directives, flow-style or otherwise irregular top-level lines), in which
+    case the caller should parse the whole document.
+    """
+    if _ANCHOR.search(text):
+        return None
+    sections: dict[str, list[str]] = {}
+    current: list[str] | None = None
+    for line in text.splitlines(keepends=True):
+        # Indented lines, comments and "- item" entries of a top-level
+        # sequence belong to the current section.
+        if not line.strip() or line[0] in " \t#" or line[:2] in ("- ", "-\n"):
+            if current is not None:
+                current.append(line)
+            continue
+        if line.startswith("---") and current is None:
+            continue
+        match = _TOP_KEY.match(line)
+        if match is None:
+            return None
+        key = next(g for g in match.groups() if g is not None)
+        if key in sections:
+            return None
+        current = sections[key] = [line]
+    return {key: "".join(lines) for key, lines in sections.items()}
+
+
+class LazyADP:
+    """Read-only ADP manifest view that parses heavy subtrees on first access.
+
+    Only the top-level structure is scanned up front; the small sections
+    (``id``, ``adp_version``, ``name``, ``tags``, ...) are parsed
+    immediately and ``flow``, ``evaluation``, ``tools`` and ``runtime`` are
+    parsed, and ``runtime`` validated, when first read. Use :meth:`to_adp`
+    for the fully validated :class:`ADP`.
+    """
+
+    LAZY = ("flow", "evaluation", "tools", "runtime")
+
+    def __init__(self, text: str):
+        sections = split_sections(text)
+        if sections is None:
+            data = yaml.load(text, Loader=_Loader) or {}
+            if not isinstance(data, dict):
+                raise ValueError("ADP manifest must be a mapping")
+            self._values = data
+            self._pending: dict[str, str] = {}
+        else:
+            self._pending = {k: sections.pop(k) for k in self.LAZY if k in sections}
+            self._values = self._parse("".join(sections.values()))
+        self._runtime: RuntimeModel | None = None
+        for key in ("adp_version", "id"):
+            if key not in self._values:
+                raise ValueError(f"ADP manifest field {key!r} is required")
+            if not isinstance(self._values[key], str):
+                raise TypeError(f"ADP manifest field {key!r} must be a string")
+        if "runtime" not in self._values and "runtime" not in self._pending:
+            raise ValueError("ADP manifest field 'runtime' is required")
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> LazyADP:
+        return cls(Path(path).read_text())
+
+    @staticmethod
+    def _parse(text: str) -> dict:
+        return yaml.load(text, Loader=_Loader) or {}
+
+    def _get(self, key: str) -> Any:
+        if key in self._pending:
+            self._values[key] = self._parse(self._pending.pop(key)).get(key)
+        if key != "runtime":
+            return self._values[key]
+        if self._runtime is None:
+            self._runtime = RuntimeModel.model_validate(self._values[key])
+        return self._runtime
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self._pending or name in self._values:
+            return self._get(name)
+        if name in ("flow", "evaluation"):
+            return {}
+        if name in ("name", "description"):
+            return None
+        raise AttributeError(f"ADP manifest has no field {name!r}")
+
+    @property
+    def loaded(self) -> set[str]:
+        """Top-level keys parsed so far."""
+        return set(self._values)
+
+    def to_dict(self) -> dict:
+        """The full manifest as plain data, parsing any pending sections."""
+        for key, text in list(self._pending.items()):
+            self._values[key] = self._parse(text).get(key)
+            del self._pending[key]
+        return dict(self._values)
+
+    def to_adp(self) -> ADP:
+        return ADP.model_validate(self.to_dict())
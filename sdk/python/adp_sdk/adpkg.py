@@ -1,16 +1,43 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
+import os
+import sys
 import tarfile
+import tempfile
+from collections.abc import Callable, Iterable
+from contextlib import ExitStack
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List
+from typing import BinaryIO, List
 
 import yaml
 
-from .adp_model import ADP
+from .adp_model import ADP, LazyADP
+from .aio import run_blocking
+from .bytecode import BYTECODE_MEDIA_TYPE, CACHE_TAG_ANNOTATION, build_bytecode_layer
+from .chunking import (
+    CHUNKED_LAYER_MEDIA_TYPE,
+    ChunkParams,
+    chunk_descriptors,
+    open_chunked,
+    write_chunks,
+)
+from .diff import LayerDiff, PackageDiff, diff_configs, diff_layers, keyed_layers
+from .tracing import span
+from .unpack import UnpackResult, extract_layers
 from .validation import validate_adp
+from .wheelhouse import (
+    WHEELHOUSE_MEDIA_TYPE,
+    WHEELHOUSE_TITLE,
+    install_wheelhouse,
+    resolve_wheels,
+    source_requirements,
+    write_wheelhouse_layer,
+)
+from .workers import WorkerPool
 
 OCI_LAYOUT = {"imageLayoutVersion": "1.0.0"}
 MANIFEST_MEDIA_TYPE = "application/vnd.oci.image.manifest.v1+json"
@@ -18,6 +45,37 @@ LAYER_MEDIA_TYPE = "application/vnd.adp.package.v1+tar"
 CONFIG_MEDIA_TYPE = "application/vnd.adp.config.v1+json"
 
 
+class VerificationError(ValueError):
+    """Raised by :meth:`ADPackage.verify` with every problem found."""
+
+    def __init__(self, errors: list[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+@dataclass
+class PackageConfig:
+    """Agent identity from the config blob; see :meth:`ADPackage.read_config`."""
+
+    agent_id: str
+    adp_version: str
+    name: str | None = None
+    description: str | None = None
+    tags: list[str] | None = None
+    version: dict | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> PackageConfig:
+        return cls(
+            agent_id=data["agent_id"],
+            adp_version=data["adp_version"],
+            name=data.get("name"),
+            description=data.get("description"),
+            tags=data.get("tags"),
+            version=data.get("version"),
+        )
+
+
 @dataclass
 class Descriptor:
     mediaType: str
@@ -36,16 +94,86 @@ class Descriptor:
         return data
 
 
+class _HashingWriter:
+    """Write-only sink that hashes and counts bytes, optionally forwarding them."""
+
+    def __init__(self, target: BinaryIO | None = None):
+        self.target = target
+        self.hasher = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.hasher.update(data)
+        self.size += len(data)
+        if self.target is not None:
+            self.target.write(data)
+        return len(data)
+
+    @property
+    def digest(self) -> str:
+        return f"sha256:{self.hasher.hexdigest()}"
+
+
+class _ArchiveWriter:
+    """Minimal forward-only tar writer for ``oci-archive`` streams."""
+
+    def __init__(self, fileobj: BinaryIO):
+        self.fileobj = fileobj
+        self.offset = 0
+
+    def _emit(self, data: bytes) -> None:
+        self.fileobj.write(data)
+        self.offset += len(data)
+
+    def _header(self, name: str, size: int) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mode = 0o644
+        self._emit(info.tobuf(tarfile.PAX_FORMAT))
+
+    def _pad(self, size: int) -> None:
+        remainder = size % tarfile.BLOCKSIZE
+        if remainder:
+            self._emit(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+
+    def add_bytes(self, name: str, data: bytes) -> None:
+        self._header(name, len(data))
+        self._emit(data)
+        self._pad(len(data))
+
+    def add_stream(
+        self, name: str, size: int, produce: Callable[[BinaryIO], None]
+    ) -> str:
+        self._header(name, size)
+        sink = _HashingWriter(self.fileobj)
+        produce(sink)
+        if sink.size != size:
+            raise RuntimeError(
+                f"{name}: expected {size} bytes, producer wrote {sink.size}"
+            )
+        self.offset += size
+        self._pad(size)
+        return sink.digest
+
+    def close(self) -> None:
+        self._emit(tarfile.NUL * (tarfile.BLOCKSIZE * 2))
+        remainder = self.offset % tarfile.RECORDSIZE
+        if remainder:
+            self._emit(tarfile.NUL * (tarfile.RECORDSIZE - remainder))
+
+
 class ADPackage:
     """OCI-based ADP package helper."""
 
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, ref: str | None = None):
         self.path = Path(path)
+        self.ref = ref
 
     @staticmethod
     def _iter_files(root: Path) -> Iterable[Path]:
         for path in root.rglob("*"):
-            if path.is_file():
+            # Interpreter caches belong in bytecode layers, not the source layer.
+            if path.is_file() and "__pycache__" not in path.relative_to(root).parts:
                 yield path
 
     @staticmethod
@@ -57,10 +185,11 @@ class ADPackage:
     def _hash_file(path: Path) -> tuple[str, int]:
         hasher = hashlib.sha256()
         size = 0
-        with path.open("rb") as f:
+        with span("adp.hash") as sp, path.open("rb") as f:
             for chunk in iter(lambda: f.read(8192), b""):
                 hasher.update(chunk)
                 size += len(chunk)
+            sp.set_attribute("adp.bytes", size)
         return f"sha256:{hasher.hexdigest()}", size
 
     @staticmethod
@@ -69,59 +198,55 @@ class ADPackage:
         return f"sha256:{h}", len(data)
 
     @classmethod
-    def create_from_directory(
-        cls, src: str | Path, out_path: str | Path
-    ) -> "ADPackage":
-        src_path = Path(src)
-        out_dir = Path(out_path)
-        out_dir.mkdir(parents=True, exist_ok=True)
-        if out_dir.suffix != "":
-            raise ValueError(
-                "OCI layout is a directory; provide a directory path, not a file"
-            )
+    def _write_layer(cls, src_path: Path, fileobj: BinaryIO) -> None:
+        with span("adp.pack.iter_files") as sp:
+            files = sorted(cls._iter_files(src_path))
+            sp.set_attribute("adp.files", len(files))
+        with span("adp.pack.tar") as sp:
+            with tarfile.open(fileobj=fileobj, mode="w|") as tar:
+                for file_path in files:
+                    arcname = file_path.relative_to(src_path)
+                    tar.add(file_path, arcname=arcname)
+            sp.set_attribute("adp.bytes", tar.offset)
 
+    @staticmethod
+    def _load_source(src_path: Path) -> ADP:
         adp_path = src_path / "adp" / "agent.yaml"
-        adp = ADP.from_file(adp_path)
+        with span("adp.pack.load"):
+            adp = ADP.from_file(adp_path)
         validate_adp(adp)
+        return adp
 
-        blobs = out_dir / "blobs" / "sha256"
-        blobs.mkdir(parents=True, exist_ok=True)
-
-        # Config blob (minimal metadata)
-        config_bytes = json.dumps(
-            {"agent_id": adp.id, "adp_version": adp.adp_version}
-        ).encode()
-        config_digest, config_size = cls._hash_bytes(config_bytes)
-        config_path = cls._blob_path(out_dir / "blobs", config_digest)
-        config_path.parent.mkdir(parents=True, exist_ok=True)
-        config_path.write_bytes(config_bytes)
-        config_desc = Descriptor(CONFIG_MEDIA_TYPE, config_digest, config_size)
-
-        # Layer blob: tar of src directory contents
-        layer_tar = out_dir / "layer.tar"
-        with tarfile.open(layer_tar, "w") as tar:
-            for file_path in cls._iter_files(src_path):
-                arcname = file_path.relative_to(src_path)
-                tar.add(file_path, arcname=arcname)
-        layer_digest, layer_size = cls._hash_file(layer_tar)
-        layer_blob_path = cls._blob_path(out_dir / "blobs", layer_digest)
-        layer_blob_path.parent.mkdir(parents=True, exist_ok=True)
-        layer_blob_path.write_bytes(layer_tar.read_bytes())
-        layer_tar.unlink()
-        layer_desc = Descriptor(LAYER_MEDIA_TYPE, layer_digest, layer_size)
+    @staticmethod
+    def _config_bytes(adp: ADP, src_path: Path) -> bytes:
+        # Everything identity queries need, so they never open the layer.
+        config: dict = {"agent_id": adp.id, "adp_version": adp.adp_version}
+        for key in ("name", "description"):
+            if getattr(adp, key) is not None:
+                config[key] = getattr(adp, key)
+        tags = (adp.model_extra or {}).get("tags")
+        if isinstance(tags, list):
+            config["tags"] = tags
+        try:
+            version = json.loads((src_path / "metadata" / "version.json").read_text())
+        except (OSError, ValueError):
+            version = None
+        if isinstance(version, dict) and version:
+            config["version"] = version
+        return json.dumps(config).encode()
 
+    @staticmethod
+    def _manifest_bytes(config_desc: Descriptor, layers: list[Descriptor]) -> bytes:
         manifest = {
             "schemaVersion": 2,
             "mediaType": MANIFEST_MEDIA_TYPE,
             "config": config_desc.to_dict(),
-            "layers": [layer_desc.to_dict()],
+            "layers": [layer.to_dict() for layer in layers],
         }
-        manifest_bytes = json.dumps(manifest, indent=2).encode()
-        manifest_digest, manifest_size = cls._hash_bytes(manifest_bytes)
-        manifest_path = cls._blob_path(out_dir / "blobs", manifest_digest)
-        manifest_path.parent.mkdir(parents=True, exist_ok=True)
-        manifest_path.write_bytes(manifest_bytes)
+        return json.dumps(manifest, indent=2).encode()
 
+    @staticmethod
+    def _index_bytes(adp: ADP, manifest_digest: str, manifest_size: int) -> bytes:
         index = {
             "schemaVersion": 2,
             "manifests": [
@@ -133,38 +258,549 @@ class ADPackage:
                 }
             ],
         }
-        (out_dir / "index.json").write_text(json.dumps(index, indent=2))
-        (out_dir / "oci-layout").write_text(json.dumps(OCI_LAYOUT))
+        return json.dumps(index, indent=2).encode()
+
+    @classmethod
+    def _write_chunked(
+        cls, layer: Path, blobs: Path, params: ChunkParams
+    ) -> list[Descriptor]:
+        """Store ``layer`` as chunk blobs plus a chunk index; remove ``layer``."""
+        with span("adp.pack.chunk") as sp:
+            try:
+                index_bytes = write_chunks(
+                    layer,
+                    lambda chunk: cls._store_blob(blobs, chunk),
+                    LAYER_MEDIA_TYPE,
+                    params,
+                )
+            finally:
+                os.unlink(layer)
+            chunks = chunk_descriptors(json.loads(index_bytes))
+            sp.set_attribute("adp.chunks", len(chunks))
+        index_desc = Descriptor(
+            CHUNKED_LAYER_MEDIA_TYPE, *cls._store_blob(blobs, index_bytes)
+        )
+        return [index_desc] + [
+            Descriptor(c["mediaType"], c["digest"], c["size"]) for c in chunks
+        ]
+
+    @classmethod
+    def _store_blob(cls, blobs: Path, data: bytes) -> tuple[str, int]:
+        digest, size = cls._hash_bytes(data)
+        path = cls._blob_path(blobs, digest)
+        if not path.exists():
+            with span("adp.pack.blob_write", **{"adp.bytes": size}):
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+                    tmp.write(data)
+                os.replace(tmp.name, path)
+        return digest, size
+
+    @classmethod
+    def _write_wheelhouse(
+        cls, src_path: Path, blobs: Path, wheel_dir: Path
+    ) -> Descriptor | None:
+        requirements = source_requirements(src_path)
+        if not requirements:
+            return None
+        with span("adp.pack.wheelhouse") as sp:
+            wheels = resolve_wheels(requirements, wheel_dir)
+            with tempfile.NamedTemporaryFile(dir=blobs / "sha256", delete=False) as tmp:
+                try:
+                    write_wheelhouse_layer(wheels, requirements, tmp)
+                except BaseException:
+                    os.unlink(tmp.name)
+                    raise
+            digest, size = cls._hash_file(Path(tmp.name))
+            os.replace(tmp.name, cls._blob_path(blobs, digest))
+            sp.set_attribute("adp.bytes", size)
+        return Descriptor(
+            WHEELHOUSE_MEDIA_TYPE,
+            digest,
+            size,
+            {"org.opencontainers.image.title": WHEELHOUSE_TITLE},
+        )
+
+    @classmethod
+    def _write_bytecode(
+        cls,
+        src_path: Path,
+        blobs: Path,
+        python: str | None,
+        invalidation_mode: str,
+    ) -> Descriptor:
+        with span("adp.pack.bytecode") as sp:
+            with tempfile.NamedTemporaryFile(dir=blobs / "sha256", delete=False) as tmp:
+                try:
+                    tag, modules = build_bytecode_layer(
+                        src_path,
+                        tmp,
+                        python=python,
+                        invalidation_mode=invalidation_mode,
+                    )
+                except BaseException:
+                    os.unlink(tmp.name)
+                    raise
+            digest, size = cls._hash_file(Path(tmp.name))
+            os.replace(tmp.name, cls._blob_path(blobs, digest))
+            sp.set_attribute("adp.files", modules)
+            sp.set_attribute("adp.bytes", size)
+        return Descriptor(
+            BYTECODE_MEDIA_TYPE,
+            digest,
+            size,
+            {
+                "org.opencontainers.image.title": f"bytecode-{tag}",
+                CACHE_TAG_ANNOTATION: tag,
+            },
+        )
+
+    @classmethod
+    def _write_blobs(
+        cls,
+        src_path: Path,
+        out_dir: Path,
+        wheelhouse: Path | None = None,
+        bytecode: Iterable[str | None] = (),
+        invalidation_mode: str = "checked-hash",
+        chunking: ChunkParams | None = None,
+    ) -> tuple[ADP, Descriptor]:
+        """Write config, layer and manifest blobs; return the manifest descriptor.
+
+        Blobs are written under temporary names and renamed into place, so
+        several packers may share one ``blobs/`` directory.
+        """
+        adp = cls._load_source(src_path)
+
+        blobs = out_dir / "blobs"
+        (blobs / "sha256").mkdir(parents=True, exist_ok=True)
+
+        # Config blob (minimal metadata)
+        config_digest, config_size = cls._store_blob(
+            blobs, cls._config_bytes(adp, src_path)
+        )
+        config_desc = Descriptor(CONFIG_MEDIA_TYPE, config_digest, config_size)
+
+        # Layer blob: tar of src directory contents
+        with tempfile.NamedTemporaryFile(dir=blobs / "sha256", delete=False) as tmp:
+            try:
+                cls._write_layer(src_path, tmp)
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+        if chunking is not None:
+            layers = cls._write_chunked(Path(tmp.name), blobs, chunking)
+        else:
+            layer_digest, layer_size = cls._hash_file(Path(tmp.name))
+            with span("adp.pack.blob_write", **{"adp.bytes": layer_size}):
+                os.replace(tmp.name, cls._blob_path(blobs, layer_digest))
+            layers = [Descriptor(LAYER_MEDIA_TYPE, layer_digest, layer_size)]
+        if wheelhouse is not None:
+            wheel_desc = cls._write_wheelhouse(src_path, blobs, Path(wheelhouse))
+            if wheel_desc is not None:
+                layers.append(wheel_desc)
+        tags: set[str] = set()
+        for python in bytecode:
+            desc = cls._write_bytecode(src_path, blobs, python, invalidation_mode)
+            if desc.annotations[CACHE_TAG_ANNOTATION] not in tags:
+                tags.add(desc.annotations[CACHE_TAG_ANNOTATION])
+                layers.append(desc)
+
+        manifest_bytes = cls._manifest_bytes(config_desc, layers)
+        manifest_digest, manifest_size = cls._store_blob(blobs, manifest_bytes)
+        return adp, Descriptor(MANIFEST_MEDIA_TYPE, manifest_digest, manifest_size)
+
+    @classmethod
+    def create_from_directory(
+        cls,
+        src: str | Path,
+        out_path: str | Path,
+        *,
+        wheelhouse: str | Path | None = None,
+        bytecode: bool | Iterable[str] = False,
+        invalidation_mode: str = "checked-hash",
+        chunked: bool | ChunkParams = False,
+    ) -> ADPackage:
+        """Pack ``src`` into an OCI layout at ``out_path``.
+
+        With ``wheelhouse``, the ``build.dependencies.python`` requirements
+        from ``acs/container.yaml`` are resolved from that local wheel
+        directory and stored as a separate, deterministic layer; see
+        :meth:`install_dependencies`.
+
+        With ``bytecode``, every ``.py`` file is also compiled to hash-based
+        ``__pycache__`` files and stored as one layer per interpreter cache
+        tag: ``True`` compiles for the running interpreter, an iterable of
+        interpreter paths compiles for each. :meth:`unpack` extracts the
+        layer that matches the target interpreter, so agents import without
+        recompiling even on read-only filesystems.
+
+        With ``chunked`` (``True`` or a :class:`~adp_sdk.chunking.ChunkParams`),
+        the package layer is split by a content-defined chunker into chunk
+        blobs listed in a chunk index. A small change to a large file then
+        adds only the chunks around it; identical chunks are stored, pushed
+        and pulled once. Reading and unpacking reassemble the layer.
+        """
+        src_path = Path(src)
+        out_dir = Path(out_path)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        if out_dir.suffix != "":
+            raise ValueError(
+                "OCI layout is a directory; provide a directory path, not a file"
+            )
+
+        with span("adp.pack", **{"adp.src": str(src_path)}):
+            pythons: Iterable[str | None] = (
+                [None] if bytecode is True else (bytecode or [])
+            )
+            adp, manifest_desc = cls._write_blobs(
+                src_path,
+                out_dir,
+                wheelhouse,
+                pythons,
+                invalidation_mode,
+                ChunkParams() if chunked is True else (chunked or None),
+            )
+
+            index_bytes = cls._index_bytes(
+                adp, manifest_desc.digest, manifest_desc.size
+            )
+            (out_dir / "index.json").write_bytes(index_bytes)
+            (out_dir / "oci-layout").write_text(json.dumps(OCI_LAYOUT))
         return cls(out_dir)
 
     @classmethod
-    def open(cls, path: str | Path) -> "ADPackage":
-        return cls(Path(path))
+    def write_archive(cls, src: str | Path, fileobj: BinaryIO) -> Descriptor:
+        """Write the package for ``src`` as one ``oci-archive`` tar stream.
+
+        ``fileobj`` only needs a ``write`` method, so stdout, pipes and sockets
+        work. Nothing is staged on disk: the layer is generated twice, once to
+        learn its digest and size for the tar header and once into the stream
+        (hashed again on the fly), and the manifest and ``index.json`` are
+        written last. Returns the manifest descriptor.
+        """
+        src_path = Path(src)
+        adp = cls._load_source(src_path)
+
+        probe = _HashingWriter()
+        cls._write_layer(src_path, probe)
+        layer_desc = Descriptor(LAYER_MEDIA_TYPE, probe.digest, probe.size)
+
+        config_bytes = cls._config_bytes(adp, src_path)
+        config_desc = Descriptor(CONFIG_MEDIA_TYPE, *cls._hash_bytes(config_bytes))
+        manifest_bytes = cls._manifest_bytes(config_desc, [layer_desc])
+        manifest_digest, manifest_size = cls._hash_bytes(manifest_bytes)
+
+        archive = _ArchiveWriter(fileobj)
+        archive.add_bytes("oci-layout", json.dumps(OCI_LAYOUT).encode())
+        archive.add_bytes(f"blobs/sha256/{config_desc.digest[7:]}", config_bytes)
+        digest = archive.add_stream(
+            f"blobs/sha256/{layer_desc.digest[7:]}",
+            layer_desc.size,
+            lambda sink: cls._write_layer(src_path, sink),
+        )
+        if digest != layer_desc.digest:
+            raise RuntimeError("source directory changed while writing archive")
+        archive.add_bytes(f"blobs/sha256/{manifest_digest[7:]}", manifest_bytes)
+        archive.add_bytes(
+            "index.json", cls._index_bytes(adp, manifest_digest, manifest_size)
+        )
+        archive.close()
+        return Descriptor(MANIFEST_MEDIA_TYPE, manifest_digest, manifest_size)
+
+    @classmethod
+    def open(cls, path: str | Path, ref: str | None = None) -> ADPackage:
+        """Open a layout; ``ref`` selects a manifest in a multi-agent index."""
+        return cls(Path(path), ref)
 
     def list_blobs(self) -> List[str]:
         return [p.name for p in (self.path / "blobs" / "sha256").glob("*")]
 
-    def read_adp(self) -> ADP:
-        # Extract layer tar and read adp/agent.yaml
+    def _blob(self, digest: str) -> Path:
+        return self._blob_path(self.path / "blobs", digest)
+
+    def _manifest_desc(self) -> dict:
         index = json.loads((self.path / "index.json").read_text())
-        manifest_desc = index["manifests"][0]
-        manifest = json.loads(
-            (
-                self.path
-                / "blobs"
-                / manifest_desc["digest"].replace("sha256:", "sha256/")
-            ).read_text()
+        if self.ref is None:
+            return index["manifests"][0]
+        for desc in index["manifests"]:
+            annotations = desc.get("annotations", {})
+            if self.ref in (
+                desc["digest"],
+                annotations.get("org.opencontainers.image.title"),
+                annotations.get("org.opencontainers.image.ref.name"),
+            ):
+                return desc
+        raise KeyError(f"no manifest matching {self.ref!r} in {self.path}")
+
+    def _manifest(self) -> dict:
+        manifest_desc = self._manifest_desc()
+        return json.loads(self._blob(manifest_desc["digest"]).read_text())
+
+    def _package_layers(self, manifest: dict | None = None) -> list[dict]:
+        manifest = manifest if manifest is not None else self._manifest()
+        return [
+            layer
+            for layer in manifest["layers"]
+            if layer.get("mediaType", LAYER_MEDIA_TYPE)
+            in (LAYER_MEDIA_TYPE, CHUNKED_LAYER_MEDIA_TYPE)
+        ]
+
+    def _open_layer(self, desc: dict) -> BinaryIO:
+        """Open a layer blob for streaming; chunked layers are reassembled and verified."""
+        if desc.get("mediaType") == CHUNKED_LAYER_MEDIA_TYPE:
+            index = json.loads(self._blob(desc["digest"]).read_text())
+            return open_chunked(index, self._blob)
+        return self._blob(desc["digest"]).open("rb")
+
+    def _bytecode_layer(self, tag: str | None = None) -> dict | None:
+        tag = tag or sys.implementation.cache_tag
+        for layer in self._manifest()["layers"]:
+            annotations = layer.get("annotations") or {}
+            if (
+                layer.get("mediaType") == BYTECODE_MEDIA_TYPE
+                and annotations.get(CACHE_TAG_ANNOTATION) == tag
+            ):
+                return layer
+        return None
+
+    def bytecode_tags(self) -> list[str]:
+        """Cache tags (e.g. ``cpython-312``) of the bundled bytecode layers."""
+        return [
+            layer["annotations"][CACHE_TAG_ANNOTATION]
+            for layer in self._manifest()["layers"]
+            if layer.get("mediaType") == BYTECODE_MEDIA_TYPE
+        ]
+
+    def _wheelhouse_layer(self) -> dict | None:
+        for layer in self._manifest()["layers"]:
+            if layer.get("mediaType") == WHEELHOUSE_MEDIA_TYPE:
+                return layer
+        return None
+
+    def install_dependencies(
+        self, target: str | Path | None = None, *, cache_dir: str | Path | None = None
+    ) -> str:
+        """Install the bundled wheelhouse offline; see :func:`install_wheelhouse`."""
+        return install_wheelhouse(self, target, cache_dir=cache_dir)
+
+    def worker_pool(self, **kwargs) -> WorkerPool:
+        """Warm worker pool for the python runtime entry; see :class:`WorkerPool`."""
+        return WorkerPool.from_package(self, **kwargs)
+
+    def read_config(self) -> PackageConfig:
+        """Agent identity from the config blob alone, without opening a layer.
+
+        Packages written before the config carried ``name``, ``tags`` and
+        ``version`` (the contents of ``metadata/version.json``) report those
+        as ``None``; use :meth:`read_adp` for them.
+        """
+        with span("adp.read_config", **{"adp.path": str(self.path)}):
+            digest = self._manifest()["config"]["digest"]
+            return PackageConfig.from_dict(json.loads(self._blob(digest).read_text()))
+
+    def read_adp(self, *, lazy: bool = False) -> ADP | LazyADP:
+        """Parse ``adp/agent.yaml`` from the package layer.
+
+        With ``lazy``, return a :class:`~adp_sdk.adp_model.LazyADP` that
+        defers parsing ``flow``, ``evaluation``, ``tools`` and ``runtime``.
+        """
+        with span("adp.read_adp", **{"adp.path": str(self.path)}):
+            return self._read_adp(lazy)
+
+    def _read_adp(self, lazy: bool = False) -> ADP | LazyADP:
+        with span("adp.read.manifest"):
+            layer_desc = self._package_layers()[0]
+        with span("adp.read.layer") as sp:
+            # Stream the tar and stop at the manifest instead of indexing
+            # every member header first.
+            data = None
+            with (
+                self._open_layer(layer_desc) as f,
+                tarfile.open(fileobj=f, mode="r|") as tar,
+            ):
+                for member in tar:
+                    if member.name.removeprefix("./") == "adp/agent.yaml":
+                        if member.isreg():
+                            data = tar.extractfile(member).read().decode()
+                        break
+            if data is None:
+                raise FileNotFoundError("adp/agent.yaml not found in layer")
+            sp.set_attribute("adp.bytes", len(data))
+        with span("adp.read.parse"):
+            if lazy:
+                return LazyADP(data)
+            return ADP.model_validate(yaml.safe_load(data))
+
+    def unpack(
+        self,
+        dest: str | Path,
+        *,
+        workers: int | None = None,
+        cache_dir: str | Path | None = None,
+        python_tag: str | None = None,
+    ) -> UnpackResult:
+        """Extract the package layers into ``dest``.
+
+        Unchanged files are skipped and, with ``cache_dir``, identical content
+        is hardlinked from a shared cache; see :func:`extract_layers`. The
+        bytecode layer for ``python_tag`` (default: the running interpreter's
+        cache tag) is extracted too, if the package has one.
+        """
+        descs = self._package_layers()
+        bytecode = self._bytecode_layer(python_tag)
+        if bytecode is not None:
+            descs.append(bytecode)
+        with ExitStack() as stack:
+            files = [stack.enter_context(self._open_layer(d)) for d in descs]
+            return extract_layers(files, dest, workers=workers, cache_dir=cache_dir)
+
+    def _check_structure(self) -> tuple[list[str], list[dict]]:
+        """Return layout errors and the descriptors whose blobs need hashing."""
+        errors: list[str] = []
+        try:
+            layout = json.loads((self.path / "oci-layout").read_text())
+        except (OSError, ValueError):
+            layout = None
+        if layout != OCI_LAYOUT:
+            errors.append("oci-layout is missing or has the wrong version")
+        try:
+            manifest_desc = self._manifest_desc()
+            manifest = self._manifest()
+        except (OSError, ValueError, KeyError, IndexError) as exc:
+            errors.append(f"cannot read manifest: {exc}")
+            return errors, []
+        if manifest.get("mediaType") != MANIFEST_MEDIA_TYPE:
+            errors.append(f"manifest mediaType is not {MANIFEST_MEDIA_TYPE}")
+        config_desc = manifest.get("config", {})
+        if config_desc.get("mediaType") != CONFIG_MEDIA_TYPE:
+            errors.append(f"config mediaType is not {CONFIG_MEDIA_TYPE}")
+        if not self._package_layers(manifest):
+            errors.append(f"manifest has no {LAYER_MEDIA_TYPE} layer")
+        return errors, [manifest_desc, config_desc, *manifest.get("layers", [])]
+
+    def _check_blob(self, desc: dict) -> str | None:
+        path = self._blob(desc["digest"])
+        if not path.is_file():
+            return f"blob {desc['digest']} is missing"
+        digest, size = self._hash_file(path)
+        if digest != desc["digest"]:
+            return f"blob {desc['digest']} has digest {digest}"
+        if size != desc["size"]:
+            return f"blob {desc['digest']} has size {size}, expected {desc['size']}"
+        return None
+
+    def _check_content(self) -> list[str]:
+        manifest = self._manifest()
+        config = json.loads(self._blob(manifest["config"]["digest"]).read_text())
+        errors = [
+            f"config is missing {key}"
+            for key in ("agent_id", "adp_version")
+            if key not in config
+        ]
+        try:
+            adp = self.read_adp()
+        except (FileNotFoundError, ValueError, yaml.YAMLError) as exc:
+            return [*errors, str(exc)]
+        errors.extend(validate_adp(adp))
+        listed = {layer["digest"] for layer in manifest["layers"]}
+        for layer in self._package_layers(manifest):
+            if layer.get("mediaType") != CHUNKED_LAYER_MEDIA_TYPE:
+                continue
+            index = json.loads(self._blob(layer["digest"]).read_text())
+            errors.extend(
+                f"chunk {chunk['digest']} is not listed in the manifest"
+                for chunk in index["chunks"]
+                if chunk["digest"] not in listed
+            )
+        if config.get("agent_id") not in (None, adp.id):
+            errors.append(f"config agent_id {config['agent_id']!r} != {adp.id!r}")
+        return errors
+
+    def verify(self) -> None:
+        """Check layout structure, blob digests and the ADP manifest.
+
+        Raises :class:`VerificationError` listing every problem found.
+        """
+        errors, descriptors = self._check_structure()
+        errors.extend(e for e in map(self._check_blob, descriptors) if e)
+        if not errors:
+            errors.extend(self._check_content())
+        if errors:
+            raise VerificationError(errors)
+
+    # Async variants ---------------------------------------------------------
+    # Each offloads blocking tar I/O and hashing to the bounded executor from
+    # adp_sdk.aio, so an event loop can serve many packages concurrently.
+
+    @classmethod
+    async def aopen(cls, path: str | Path, ref: str | None = None) -> ADPackage:
+        pkg = cls.open(path, ref)
+        if not await run_blocking((pkg.path / "index.json").is_file):
+            raise FileNotFoundError(f"{pkg.path} has no index.json")
+        return pkg
+
+    @classmethod
+    async def acreate_from_directory(
+        cls, src: str | Path, out_path: str | Path, **kwargs
+    ) -> ADPackage:
+        return await run_blocking(cls.create_from_directory, src, out_path, **kwargs)
+
+    async def alist_blobs(self) -> list[str]:
+        return await run_blocking(self.list_blobs)
+
+    async def aread_adp(self, *, lazy: bool = False) -> ADP | LazyADP:
+        return await run_blocking(self.read_adp, lazy=lazy)
+
+    async def aread_config(self) -> PackageConfig:
+        return await run_blocking(self.read_config)
+
+    async def aunpack(self, dest: str | Path, **kwargs) -> UnpackResult:
+        return await run_blocking(self.unpack, dest, **kwargs)
+
+    async def averify(self) -> None:
+        """Async :meth:`verify`; blobs are hashed concurrently."""
+        errors, descriptors = await run_blocking(self._check_structure)
+        results = await asyncio.gather(
+            *(run_blocking(self._check_blob, desc) for desc in descriptors)
         )
-        layer_desc = manifest["layers"][0]
-        layer_path = (
-            self.path / "blobs" / layer_desc["digest"].replace("sha256:", "sha256/")
+        errors.extend(e for e in results if e)
+        if not errors:
+            errors.extend(await run_blocking(self._check_content))
+        if errors:
+            raise VerificationError(errors)
+
+    def diff(self, other: ADPackage) -> PackageDiff:
+        """Compare this package (old) with ``other`` (new) without extracting.
+
+        Manifests and config are compared first; layers with equal digests are
+        skipped, and the rest are compared member by member (name, size,
+        sha256) by streaming both tars in one pass.
+        """
+        old_desc, new_desc = self._manifest_desc(), other._manifest_desc()
+        result = PackageDiff(old_desc["digest"], new_desc["digest"])
+        if result.identical:
+            return result
+        old_manifest, new_manifest = self._manifest(), other._manifest()
+        result.config = diff_configs(
+            json.loads(self._blob(old_manifest["config"]["digest"]).read_text()),
+            json.loads(other._blob(new_manifest["config"]["digest"]).read_text()),
         )
-        with tarfile.open(layer_path, "r") as tar:
-            try:
-                member = tar.extractfile("adp/agent.yaml")
-            except KeyError:
-                raise FileNotFoundError("adp/agent.yaml not found in layer")
-            if not member:
-                raise FileNotFoundError("adp/agent.yaml not found in layer")
-            data = member.read().decode()
-        return ADP.model_validate(yaml.safe_load(data))
+        old_layers, new_layers = keyed_layers(old_manifest), keyed_layers(new_manifest)
+        for key in list(old_layers) + [k for k in new_layers if k not in old_layers]:
+            old_layer, new_layer = old_layers.get(key), new_layers.get(key)
+            old_digest = old_layer["digest"] if old_layer else None
+            new_digest = new_layer["digest"] if new_layer else None
+            if old_digest == new_digest:
+                continue
+            with ExitStack() as stack:
+                changes = diff_layers(
+                    stack.enter_context(self._open_layer(old_layer))
+                    if old_layer
+                    else None,
+                    stack.enter_context(other._open_layer(new_layer))
+                    if new_layer
+                    else None,
+                )
+            result.layers.append(LayerDiff(key, old_digest, new_digest, changes))
+        return result
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_executor: Executor | None = None
+
+
+def default_workers() -> int:
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def set_executor(executor: Executor | None) -> None:
+    """Use ``executor`` for all async SDK calls (``None`` restores the default).
+
+    Hashing and tar I/O run there, so its size bounds how much blocking work
+    the event loop can have in flight at once.
+    """
+    global _executor
+    with _lock:
+        _executor = executor
+
+
+def get_executor() -> Executor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=default_workers(), thread_name_prefix="adp-sdk"
+            )
+        return _executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking SDK call on the shared bounded executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from email.utils import formatdate
+from pathlib import Path
+from typing import Self
+from urllib.parse import unquote, urlsplit
+
+from .adpkg import MANIFEST_MEDIA_TYPE, ADPackage
+
+_DIGEST = re.compile(r"^sha256:[0-9a-f]{64}$")
+_BLOB_PATH = re.compile(r"^/v2/(?P<name>.+)/blobs/(?P<digest>[^/]+)$")
+_MANIFEST_PATH = re.compile(r"^/v2/(?P<name>.+)/manifests/(?P<ref>[^/]+)$")
+_TAGS_PATH = re.compile(r"^/v2/(?P<name>.+)/tags/list$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_REASONS = {
+    200: "OK",
+    206: "Partial Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    412: "Precondition Failed",
+    416: "Range Not Satisfiable",
+}
+MAX_HEADER_BYTES = 64 * 1024
+# Larger blobs are never parsed as manifests.
+MAX_MANIFEST_BYTES = 4 * 1024 * 1024
+# Digest-addressed content never changes.
+_IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@dataclass
+class ServerStats:
+    requests: int = 0
+    bytes_sent: int = 0
+    connections: int = 0
+
+
+class _Request:
+    def __init__(self, method: str, target: str, version: str, headers: dict):
+        self.method = method
+        self.path = unquote(urlsplit(target).path)
+        self.version = version
+        self.headers = headers
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if header is None:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None | bool:
+    """Resolve a ``Range`` header to an inclusive ``(start, end)``.
+
+    Returns ``None`` to serve the whole body (no header, or a form this
+    server does not handle such as multiple ranges) and ``False`` when the
+    range cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+class BlobServer:
+    """Serve an ADPKG layout or blob store over the OCI distribution read API.
+
+    ``GET``/``HEAD`` on ``/v2/``, ``/v2/<name>/blobs/<digest>``,
+    ``/v2/<name>/manifests/<reference>`` and ``/v2/<name>/tags/list``. Any
+    repository name maps to ``root``; tags are the ``ref.name``/``title``
+    annotations in ``index.json`` (plus ``latest`` for a single-manifest
+    layout), so ``RegistryClient.pull`` works against it unchanged.
+
+    Blob bodies go from the file to the socket with ``loop.sendfile``,
+    which uses ``os.sendfile`` and never copies the data through Python.
+    Responses carry the digest as a strong ``ETag``, honour
+    ``If-None-Match`` and single ``Range``/``If-Range`` requests, and keep
+    connections alive; each client is one asyncio task.
+    """
+
+    def __init__(self, root: str | Path, host: str = "127.0.0.1", port: int = 0):
+        self.root = Path(root)
+        self.host = host
+        self.port = port
+        self.stats = ServerStats()
+        self._server: asyncio.Server | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # Content --------------------------------------------------------------
+
+    def _tags(self) -> dict[str, str]:
+        try:
+            index = json.loads((self.root / "index.json").read_text())
+        except (OSError, ValueError):
+            return {}
+        tags: dict[str, str] = {}
+        for desc in index.get("manifests", []):
+            annotations = desc.get("annotations") or {}
+            for key in (
+                "org.opencontainers.image.ref.name",
+                "org.opencontainers.image.title",
+            ):
+                if annotations.get(key):
+                    tags.setdefault(annotations[key], desc["digest"])
+        if len(index.get("manifests", [])) == 1:
+            tags.setdefault("latest", index["manifests"][0]["digest"])
+        return tags
+
+    def _blob(self, digest: str) -> Path | None:
+        if not _DIGEST.match(digest):
+            return None
+        path = ADPackage._blob_path(self.root / "blobs", digest)
+        return path if path.is_file() else None
+
+    def _manifest(self, ref: str) -> tuple[Path, str, str] | None:
+        """Path, digest and media type of the manifest ``ref`` names.
+
+        Only small JSON documents with ``schemaVersion`` 2 count as
+        manifests; a layer or config digest is not served from this route.
+        """
+        digest = ref if _DIGEST.match(ref) else self._tags().get(ref)
+        path = self._blob(digest) if digest else None
+        if path is None:
+            return None
+        try:
+            if path.stat().st_size > MAX_MANIFEST_BYTES:
+                return None
+            manifest = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(manifest, dict) or manifest.get("schemaVersion") != 2:
+            return None
+        return path, digest, manifest.get("mediaType", MANIFEST_MEDIA_TYPE)
+
+    # HTTP -----------------------------------------------------------------
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.stats.connections += 1
+        self._writers.add(writer)
+        self._tasks.add(asyncio.current_task())
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                self.stats.requests += 1
+                await self._respond(request, writer)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            self._tasks.discard(asyncio.current_task())
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> _Request | None:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            return None
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            return None
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length:
+            await reader.readexactly(length)  # read-only API: discard bodies
+        return _Request(method, target, version, headers)
+
+    def _head(self, status: int, headers: dict[str, str], keep_alive: bool) -> bytes:
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+        headers = {
+            "Date": formatdate(usegmt=True),
+            "Docker-Distribution-API-Version": "registry/2.0",
+            "Connection": "keep-alive" if keep_alive else "close",
+            **headers,
+        }
+        lines.extend(f"{k}: {v}" for k, v in headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send(
+        self,
+        writer: asyncio.StreamWriter,
+        request: _Request,
+        status: int,
+        body: bytes = b"",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        headers = {"Content-Length": str(len(body)), **(headers or {})}
+        writer.write(self._head(status, headers, request.keep_alive))
+        if request.method != "HEAD" and status not in (204, 304):
+            writer.write(body)
+            self.stats.bytes_sent += len(body)
+        await writer.drain()
+
+    async def _error(
+        self,
+        writer: asyncio.StreamWriter,
+        request: _Request,
+        status: int,
+        code: str,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        body = json.dumps({"errors": [{"code": code, "message": code}]}).encode()
+        headers = {**(headers or {}), "Content-Type": "application/json"}
+        await self._send(writer, request, status, body, headers)
+
+    async def _respond(self, request: _Request, writer: asyncio.StreamWriter) -> None:
+        if request.method not in ("GET", "HEAD"):
+            await self._error(writer, request, 405, "UNSUPPORTED")
+            return
+        if request.path in ("/v2", "/v2/"):
+            await self._send(
+                writer, request, 200, b"{}", {"Content-Type": "application/json"}
+            )
+            return
+        if match := _BLOB_PATH.match(request.path):
+            path = self._blob(match["digest"])
+            if path is None:
+                await self._error(writer, request, 404, "BLOB_UNKNOWN")
+                return
+            await self._send_file(
+                writer, request, path, match["digest"], "application/octet-stream"
+            )
+            return
+        if match := _MANIFEST_PATH.match(request.path):
+            found = await asyncio.to_thread(self._manifest, match["ref"])
+            if found is None:
+                await self._error(writer, request, 404, "MANIFEST_UNKNOWN")
+                return
+            await self._send_file(writer, request, *found)
+            return
+        if match := _TAGS_PATH.match(request.path):
+            tags = await asyncio.to_thread(self._tags)
+            body = json.dumps({"name": match["name"], "tags": sorted(tags)})
+            await self._send(
+                writer,
+                request,
+                200,
+                body.encode(),
+                {"Content-Type": "application/json"},
+            )
+            return
+        await self._error(writer, request, 404, "NAME_UNKNOWN")
+
+    async def _send_file(
+        self,
+        writer: asyncio.StreamWriter,
+        request: _Request,
+        path: Path,
+        digest: str,
+        media_type: str,
+    ) -> None:
+        etag = f'"{digest}"'
+        headers = {
+            "Content-Type": media_type,
+            "Docker-Content-Digest": digest,
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Cache-Control": _IMMUTABLE,
+        }
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            await self._send(writer, request, 304, headers=headers)
+            return
+        if_match = request.headers.get("if-match")
+        if if_match is not None and not _etag_matches(if_match, etag):
+            await self._error(writer, request, 412, "PRECONDITION_FAILED")
+            return
+        with path.open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if_range = request.headers.get("if-range")
+            span = (
+                parse_range(request.headers.get("range"), size)
+                if if_range is None or if_range == etag
+                else None
+            )
+            if span is False:
+                await self._error(
+                    writer,
+                    request,
+                    416,
+                    "RANGE_INVALID",
+                    {"Content-Range": f"bytes */{size}"},
+                )
+                return
+            status, start, count = 200, 0, size
+            if span:
+                status, start = 206, span[0]
+                count = span[1] - span[0] + 1
+                headers["Content-Range"] = f"bytes {span[0]}-{span[1]}/{size}"
+            headers["Content-Length"] = str(count)
+            writer.write(self._head(status, headers, request.keep_alive))
+            await writer.drain()
+            if request.method == "HEAD" or count == 0:
+                return
+            loop = asyncio.get_running_loop()
+            sent = await loop.sendfile(writer.transport, f, start, count)
+            self.stats.bytes_sent += sent
+
+    # Lifecycle ------------------------------------------------------------
+
+    async def start(self) -> Self:
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=MAX_HEADER_BYTES, backlog=1024
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def aclose(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise hold wait_closed().
+            for writer in list(self._writers):
+                writer.close()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    def start_background(self) -> Self:
+        """Run the server on its own event loop in a daemon thread."""
+        ready = threading.Event()
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.aclose())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="adp-blobserver", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> Self:
+        return self.start_background()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+
+def serve(root: str | Path, host: str = "127.0.0.1", port: int = 5000) -> None:
+    """Serve ``root`` until interrupted."""
+    server = BlobServer(root, host, port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
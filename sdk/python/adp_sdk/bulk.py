@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import yaml
+
+from .adpkg import MANIFEST_MEDIA_TYPE, OCI_LAYOUT, ADPackage
+
+REPORT_FILE = "pack-report.json"
+
+
+@dataclass
+class PackTiming:
+    source: str
+    agent_id: str | None = None
+    manifest_digest: str | None = None
+    manifest_size: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class BulkReport:
+    out_dir: str
+    seconds: float = 0.0
+    agents: list[PackTiming] = field(default_factory=list)
+
+    @property
+    def failed(self) -> list[PackTiming]:
+        return [a for a in self.agents if a.error]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def discover_agents(root: str | Path, exclude: Path | None = None) -> list[Path]:
+    """Return every directory under ``root`` that holds ``adp/agent.yaml``."""
+    root_path = Path(root).resolve()
+    excluded = exclude.resolve() if exclude else None
+    found = []
+    for manifest in root_path.rglob("adp/agent.yaml"):
+        agent_dir = manifest.parent.parent
+        if excluded and (agent_dir == excluded or excluded in agent_dir.parents):
+            continue
+        found.append(agent_dir)
+    return sorted(found)
+
+
+def _pack_one(src: str, out_dir: str) -> PackTiming:
+    timing = PackTiming(source=src)
+    start = time.perf_counter()
+    try:
+        adp, desc = ADPackage._write_blobs(Path(src), Path(out_dir))
+    except (
+        OSError,
+        ValueError,
+        RuntimeError,
+        yaml.YAMLError,
+    ) as exc:  # reported per agent, the rest keep going
+        timing.error = f"{type(exc).__name__}: {exc}"
+    else:
+        timing.agent_id = adp.id
+        timing.manifest_digest = desc.digest
+        timing.manifest_size = desc.size
+    timing.seconds = time.perf_counter() - start
+    return timing
+
+
+def pack_all(
+    root: str | Path,
+    out_path: str | Path,
+    *,
+    jobs: int | None = None,
+    executor: Executor | None = None,
+) -> BulkReport:
+    """Pack every agent under ``root`` into the layout at ``out_path``.
+
+    Agents are packed on a process pool of ``jobs`` workers (or the given
+    ``executor``), each worker reusing its imports and parsed schemas across
+    agents. All blobs land in one shared ``blobs/`` store, so content shared
+    between agents is stored once. ``index.json`` lists one manifest per
+    agent, annotated with the agent id; open a single agent with
+    ``ADPackage.open(out_path, ref=agent_id)``. The returned report is also
+    written to ``pack-report.json``.
+    """
+    out_dir = Path(out_path)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sources = [str(p) for p in discover_agents(root, exclude=out_dir)]
+    report = BulkReport(out_dir=str(out_dir))
+
+    start = time.perf_counter()
+    outs = [str(out_dir)] * len(sources)
+    if executor is not None:
+        report.agents = list(executor.map(_pack_one, sources, outs))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            report.agents = list(pool.map(_pack_one, sources, outs))
+    report.seconds = time.perf_counter() - start
+
+    manifests = [
+        {
+            "mediaType": MANIFEST_MEDIA_TYPE,
+            "digest": a.manifest_digest,
+            "size": a.manifest_size,
+            "annotations": {
+                "org.opencontainers.image.title": a.agent_id,
+                "org.opencontainers.image.ref.name": a.agent_id,
+            },
+        }
+        for a in report.agents
+        if not a.error
+    ]
+    index = {"schemaVersion": 2, "manifests": manifests}
+    (out_dir / "index.json").write_text(json.dumps(index, indent=2))
+    (out_dir / "oci-layout").write_text(json.dumps(OCI_LAYOUT))
+    (out_dir / REPORT_FILE).write_text(json.dumps(report.to_dict(), indent=2))
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="adp-pack-all",
+        description="Pack every adp/agent.yaml under ROOT into one ADPKG layout.",
+    )
+    parser.add_argument("root", type=Path)
+    parser.add_argument("out", type=Path)
+    parser.add_argument("-j", "--jobs", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    report = pack_all(args.root, args.out, jobs=args.jobs)
+    for agent in report.agents:
+        status = agent.error or agent.manifest_digest
+        print(f"{agent.seconds:8.3f}s  {agent.agent_id or agent.source}  {status}")
+    print(f"packed {len(report.agents)} agents in {report.seconds:.3f}s")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+from typing import BinaryIO
+
+BYTECODE_MEDIA_TYPE = "application/vnd.adp.bytecode.v1+tar"
+# Annotation holding the interpreter's ``sys.implementation.cache_tag``.
+CACHE_TAG_ANNOTATION = "org.adp.python.cache_tag"
+INVALIDATION_MODES = ("checked-hash", "unchecked-hash")
+
+
+def _run(python: str | None, *args: str) -> str:
+    cmd = [python or sys.executable, *args]
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    if proc.returncode != 0:
+        detail = (proc.stderr or proc.stdout).strip().splitlines()[-5:]
+        raise RuntimeError(f"{' '.join(cmd[:3])} failed: " + " | ".join(detail))
+    return proc.stdout
+
+
+def cache_tag(python: str | None = None) -> str:
+    """``sys.implementation.cache_tag`` of ``python`` (default: this one)."""
+    if python is None:
+        return sys.implementation.cache_tag
+    return _run(python, "-c", "import sys; print(sys.implementation.cache_tag)").strip()
+
+
+def source_files(src_path: Path) -> list[Path]:
+    return sorted(
+        p
+        for p in src_path.rglob("*.py")
+        if p.is_file() and "__pycache__" not in p.relative_to(src_path).parts
+    )
+
+
+def compile_sources(
+    src_path: Path,
+    out_dir: Path,
+    *,
+    python: str | None = None,
+    invalidation_mode: str = "checked-hash",
+) -> tuple[str, list[Path]]:
+    """Compile every ``.py`` under ``src_path`` for ``python`` into ``out_dir``.
+
+    Sources are copied into ``out_dir`` and compiled there with
+    ``compileall``, so the source tree is never written to. Hash-based pycs
+    embed the source hash instead of an mtime, which makes them identical
+    across builds and valid after extraction. Returns the interpreter's
+    cache tag and the pyc paths, relative to ``out_dir``.
+    """
+    if invalidation_mode not in INVALIDATION_MODES:
+        raise ValueError(f"invalidation_mode must be one of {INVALIDATION_MODES}")
+    tag = cache_tag(python)
+    sources = source_files(src_path)
+    for source in sources:
+        target = out_dir / source.relative_to(src_path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, target)
+    if sources:
+        # ``-d ""`` records relative file names, keeping the output path-free.
+        _run(
+            python,
+            "-m",
+            "compileall",
+            "-q",
+            "-j",
+            "0",
+            "-d",
+            "",
+            "--invalidation-mode",
+            invalidation_mode,
+            str(out_dir),
+        )
+    pycs = sorted(
+        p.relative_to(out_dir) for p in out_dir.rglob(f"__pycache__/*.{tag}.pyc")
+    )
+    return tag, pycs
+
+
+def _tarinfo(name: str, size: int) -> tarfile.TarInfo:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mode = 0o644
+    info.mtime = 0
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    return info
+
+
+def write_bytecode_layer(root: Path, pycs: Iterable[Path], fileobj: BinaryIO) -> None:
+    """Write a deterministic tar of ``pycs`` (paths relative to ``root``)."""
+    with tarfile.open(fileobj=fileobj, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        for rel in sorted(pycs):
+            with (root / rel).open("rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                tar.addfile(_tarinfo(rel.as_posix(), size), f)
+
+
+def build_bytecode_layer(
+    src_path: Path,
+    fileobj: BinaryIO,
+    *,
+    python: str | None = None,
+    invalidation_mode: str = "checked-hash",
+) -> tuple[str, int]:
+    """Compile ``src_path`` and write its bytecode layer to ``fileobj``.
+
+    Returns the cache tag and the number of modules compiled.
+    """
+    with tempfile.TemporaryDirectory(prefix="adp-bytecode-") as tmp:
+        root = Path(tmp)
+        tag, pycs = compile_sources(
+            src_path, root, python=python, invalidation_mode=invalidation_mode
+        )
+        write_bytecode_layer(root, pycs, fileobj)
+    return tag, len(pycs)
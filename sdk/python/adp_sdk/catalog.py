@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import tarfile
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Self
+
+import yaml
+
+from .adpkg import ADPackage
+
+try:
+    _Loader: Any = yaml.CSafeLoader
+except AttributeError:  # PyYAML built without libyaml
+    _Loader = yaml.SafeLoader
+
+TOOL_KINDS = ("mcp_servers", "http_apis", "sql_functions")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS layouts (
+    path TEXT PRIMARY KEY,
+    index_digest TEXT NOT NULL,
+    indexed REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS agents (
+    layout TEXT NOT NULL,
+    manifest TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    name TEXT,
+    adp_version TEXT,
+    version TEXT,
+    PRIMARY KEY (layout, manifest)
+);
+CREATE TABLE IF NOT EXISTS tags (layout TEXT, manifest TEXT, tag TEXT);
+CREATE TABLE IF NOT EXISTS skills (layout TEXT, manifest TEXT, skill TEXT);
+CREATE TABLE IF NOT EXISTS tools (layout TEXT, manifest TEXT, kind TEXT, tool TEXT);
+CREATE TABLE IF NOT EXISTS models (
+    layout TEXT, manifest TEXT, model_id TEXT, provider TEXT, model TEXT
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    layout TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    media_type TEXT,
+    PRIMARY KEY (layout, digest)
+);
+CREATE INDEX IF NOT EXISTS agents_id ON agents (agent_id);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag);
+CREATE INDEX IF NOT EXISTS skills_skill ON skills (skill);
+CREATE INDEX IF NOT EXISTS tools_tool ON tools (tool);
+CREATE INDEX IF NOT EXISTS models_model ON models (model);
+CREATE INDEX IF NOT EXISTS models_model_id ON models (model_id);
+CREATE INDEX IF NOT EXISTS blobs_digest ON blobs (digest);
+"""
+_TABLES = ("agents", "tags", "skills", "tools", "models", "blobs")
+
+
+@dataclass
+class IndexStats:
+    indexed: int = 0
+    skipped: int = 0
+    removed: int = 0
+    errors: dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+@dataclass
+class CatalogEntry:
+    layout: str
+    manifest: str
+    agent_id: str
+    name: str | None
+    adp_version: str | None
+    version: str | None
+
+
+def find_layouts(root: str | Path) -> list[Path]:
+    """Every OCI layout (directory holding ``oci-layout``) under ``root``."""
+    return sorted(p.parent.resolve() for p in Path(root).rglob("oci-layout"))
+
+
+def _index_digest(layout: Path) -> str:
+    data = (layout / "index.json").read_bytes()
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+def _read_sources(layer: BinaryIO) -> tuple[dict, dict]:
+    """Raw ``adp/agent.yaml`` and ``metadata/version.json`` from a layer.
+
+    The tar is streamed and reading stops once both members were seen.
+    """
+    wanted = {"adp/agent.yaml", "metadata/version.json"}
+    found: dict[str, bytes] = {}
+    with tarfile.open(fileobj=layer, mode="r|") as tar:
+        for member in tar:
+            name = member.name.removeprefix("./")
+            if name in wanted and member.isreg():
+                found[name] = tar.extractfile(member).read()
+                if len(found) == len(wanted):
+                    break
+    if "adp/agent.yaml" not in found:
+        raise FileNotFoundError("adp/agent.yaml not found in layer")
+    adp = yaml.load(found["adp/agent.yaml"], Loader=_Loader) or {}
+    if not isinstance(adp, dict):
+        raise TypeError("adp/agent.yaml must be a mapping")
+    try:
+        version = json.loads(found.get("metadata/version.json", b"{}"))
+    except ValueError:
+        version = {}
+    return adp, version if isinstance(version, dict) else {}
+
+
+def scan_layout(layout: str | Path) -> list[dict]:
+    """Catalog records for every manifest in ``layout``.
+
+    Reads the raw manifest YAML, since fields such as ``runtime.models`` are
+    not kept by the :class:`~adp_sdk.adp_model.ADP` model.
+    """
+    layout = Path(layout)
+    index = json.loads((layout / "index.json").read_text())
+    records = []
+    for desc in index["manifests"]:
+        pkg = ADPackage(layout, desc["digest"])
+        manifest = json.loads(pkg._blob(desc["digest"]).read_text())
+        layers = manifest["layers"]
+        with pkg._open_layer(pkg._package_layers(manifest)[0]) as f:
+            adp, version = _read_sources(f)
+        tools = adp.get("tools") or {}
+        runtime = adp.get("runtime") or {}
+        records.append(
+            {
+                "manifest": desc["digest"],
+                "agent_id": adp.get("id") or "",
+                "name": adp.get("name"),
+                "adp_version": adp.get("adp_version"),
+                "version": version.get("agent_version"),
+                "tags": list(adp.get("tags") or []),
+                "skills": [s["id"] for s in adp.get("skills") or [] if "id" in s],
+                "tools": [
+                    (kind, tool["id"])
+                    for kind in TOOL_KINDS
+                    for tool in tools.get(kind) or []
+                    if "id" in tool
+                ],
+                "models": [
+                    (m.get("id"), m.get("provider"), m.get("model"))
+                    for m in runtime.get("models") or []
+                ],
+                "blobs": [
+                    (desc["digest"], desc["size"], desc.get("mediaType")),
+                    (
+                        manifest["config"]["digest"],
+                        manifest["config"]["size"],
+                        manifest["config"].get("mediaType"),
+                    ),
+                    *((b["digest"], b["size"], b.get("mediaType")) for b in layers),
+                ],
+            }
+        )
+    return records
+
+
+def _scan(layout: str) -> tuple[str, list[dict] | None, str | None]:
+    try:
+        return layout, scan_layout(layout), None
+    except (
+        OSError,
+        ValueError,
+        TypeError,
+        KeyError,
+        yaml.YAMLError,
+        tarfile.TarError,
+    ) as exc:  # reported per layout, the rest keep going
+        return layout, None, f"{type(exc).__name__}: {exc}"
+
+
+class Catalog:
+    """SQLite index over many ADPKG layouts.
+
+    :meth:`index` records each layout's agents with their tags, skills,
+    ``tools.*`` ids, ``runtime.models`` and blob digests. A layout whose
+    ``index.json`` hashes the same as at the last run is skipped, so
+    re-indexing a large tree only reads what changed. The ``by_*`` queries
+    and :meth:`layouts_with_blob` are index lookups.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _delete(self, layout: str) -> None:
+        for table in _TABLES:
+            self._db.execute(f"DELETE FROM {table} WHERE layout = ?", (layout,))
+        self._db.execute("DELETE FROM layouts WHERE path = ?", (layout,))
+
+    def _insert(self, layout: str, digest: str, records: list[dict]) -> None:
+        self._delete(layout)
+        db = self._db
+        for r in records:
+            key = (layout, r["manifest"])
+            db.execute(
+                "INSERT OR REPLACE INTO agents VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, r["agent_id"], r["name"], r["adp_version"], r["version"]),
+            )
+            db.executemany(
+                "INSERT INTO tags VALUES (?, ?, ?)", [(*key, t) for t in r["tags"]]
+            )
+            db.executemany(
+                "INSERT INTO skills VALUES (?, ?, ?)", [(*key, s) for s in r["skills"]]
+            )
+            db.executemany(
+                "INSERT INTO tools VALUES (?, ?, ?, ?)",
+                [(*key, *t) for t in r["tools"]],
+            )
+            db.executemany(
+                "INSERT INTO models VALUES (?, ?, ?, ?, ?)",
+                [(*key, *m) for m in r["models"]],
+            )
+            db.executemany(
+                "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?)",
+                [(layout, *b) for b in r["blobs"]],
+            )
+        db.execute(
+            "INSERT INTO layouts VALUES (?, ?, ?)", (layout, digest, time.time())
+        )
+
+    def index(
+        self,
+        layouts: Iterable[str | Path],
+        *,
+        executor: Executor | None = None,
+        prune: bool = False,
+    ) -> IndexStats:
+        """Index ``layouts``, skipping those whose ``index.json`` is unchanged.
+
+        Layouts are read on ``executor`` when given, and written in one
+        transaction. With ``prune``, catalogued layouts not in ``layouts``
+        are dropped.
+        """
+        stats = IndexStats()
+        start = time.perf_counter()
+        paths = [str(Path(p).resolve()) for p in layouts]
+        with self._lock:
+            known = dict(self._db.execute("SELECT path, index_digest FROM layouts"))
+        todo: dict[str, str] = {}
+        for path in paths:
+            try:
+                digest = _index_digest(Path(path))
+            except OSError as exc:
+                stats.errors[path] = f"{type(exc).__name__}: {exc}"
+                continue
+            if known.get(path) == digest:
+                stats.skipped += 1
+            else:
+                todo[path] = digest
+        scanned = executor.map(_scan, todo) if executor else map(_scan, todo)
+        with self._lock, self._db:
+            for path, records, error in scanned:
+                if error is not None:
+                    stats.errors[path] = error
+                    continue
+                self._insert(path, todo[path], records)
+                stats.indexed += 1
+            if prune:
+                for path in set(known) - set(paths):
+                    self._delete(path)
+                    stats.removed += 1
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def index_tree(self, root: str | Path, **kwargs: Any) -> IndexStats:
+        """Index every layout under ``root``; see :meth:`index`."""
+        return self.index(find_layouts(root), **kwargs)
+
+    def _entries(self, where: str, params: tuple) -> list[CatalogEntry]:
+        sql = (
+            "SELECT DISTINCT a.layout, a.manifest, a.agent_id, a.name,"
+            " a.adp_version, a.version FROM agents a " + where
+        )
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY a.layout, a.agent_id", params)
+            return [CatalogEntry(*row) for row in rows]
+
+    def _joined(self, table: str, column: str, value: str) -> list[CatalogEntry]:
+        return self._entries(
+            f"JOIN {table} t ON t.layout = a.layout AND t.manifest = a.manifest"
+            f" WHERE t.{column} = ?",
+            (value,),
+        )
+
+    def agents(self) -> list[CatalogEntry]:
+        return self._entries("", ())
+
+    def by_agent(self, agent_id: str) -> list[CatalogEntry]:
+        return self._entries("WHERE a.agent_id = ?", (agent_id,))
+
+    def by_tag(self, tag: str) -> list[CatalogEntry]:
+        return self._joined("tags", "tag", tag)
+
+    def by_skill(self, skill_id: str) -> list[CatalogEntry]:
+        return self._joined("skills", "skill", skill_id)
+
+    def by_tool(self, tool_id: str) -> list[CatalogEntry]:
+        """Agents declaring ``tool_id`` under any ``tools.*`` list."""
+        return self._joined("tools", "tool", tool_id)
+
+    def by_model(self, model: str) -> list[CatalogEntry]:
+        """Agents whose ``runtime.models`` use ``model`` (name or model id)."""
+        return self._entries(
+            "JOIN models m ON m.layout = a.layout AND m.manifest = a.manifest"
+            " WHERE m.model = ? OR m.model_id = ?",
+            (model, model),
+        )
+
+    def layouts_with_blob(self, digest: str) -> list[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT layout FROM blobs WHERE digest = ? ORDER BY layout", (digest,)
+            )
+            return [row[0] for row in rows]
+
+    def shared_blobs(self, min_layouts: int = 2) -> list[tuple[str, int, int]]:
+        """``(digest, size, layouts)`` for blobs stored in several layouts."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT digest, MAX(size), COUNT(*) AS n FROM blobs"
+                " GROUP BY digest HAVING n >= ? ORDER BY MAX(size) * n DESC",
+                (min_layouts,),
+            )
+            return [tuple(row) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM layouts").fetchone()[0]
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import mmap
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency; the pure-Python scan is equivalent
+    np = None  # type: ignore[assignment]
+
+# Manifest descriptor of a chunked package layer: points at a JSON chunk
+# index whose chunks, concatenated, are the layer tar.
+CHUNKED_LAYER_MEDIA_TYPE = "application/vnd.adp.package.chunked.v1+json"
+CHUNK_MEDIA_TYPE = "application/vnd.adp.chunk.v1"
+
+_MASK32 = 0xFFFFFFFF
+# The gear hash at a byte depends on exactly the last 32 bytes.
+_WINDOW = 32
+_SCAN_BYTES = 4 * 1024 * 1024
+GEAR = tuple(
+    int.from_bytes(hashlib.sha256(bytes([i])).digest()[:4], "big") for i in range(256)
+)
+
+
+@dataclass(frozen=True)
+class ChunkParams:
+    """Chunk size bounds; ``avg_size`` is the mean gap between hash boundaries."""
+
+    min_size: int = 256 * 1024
+    avg_size: int = 1024 * 1024
+    max_size: int = 8 * 1024 * 1024
+
+    def __post_init__(self) -> None:
+        if self.avg_size & (self.avg_size - 1):
+            raise ValueError("avg_size must be a power of two")
+        if not 2 * _WINDOW <= self.min_size <= self.max_size:
+            raise ValueError(f"need {2 * _WINDOW} <= min_size <= max_size")
+
+    @property
+    def shift(self) -> int:
+        # Boundaries are tested on the top bits, which mix the whole window.
+        return 32 - self.avg_size.bit_length() + 1
+
+
+DEFAULT_CHUNK_PARAMS = ChunkParams()
+
+
+def _gear_candidates(data: Any, shift: int) -> Any:
+    """Sorted cut offsets ``i + 1`` where the gear hash of byte ``i`` is a boundary.
+
+    ``h[i] = sum(GEAR[data[i - k]] << k for k < 32) mod 2**32`` is evaluated
+    for all positions at once by doubling the summed window five times.
+    """
+    gear = np.array(GEAR, dtype=np.uint32)
+    n = len(data)
+    found = []
+    for lo in range(0, n, _SCAN_BYTES):
+        hi = min(lo + _SCAN_BYTES, n)
+        start = max(lo - (_WINDOW - 1), 0)
+        h = gear[np.frombuffer(data, np.uint8, hi - start, start)]
+        if lo == 0:
+            h = np.concatenate([np.zeros(_WINDOW - 1, np.uint32), h])
+        for step in (1, 2, 4, 8, 16):
+            h = h[step:] + (h[:-step] << np.uint32(step))
+        found.append(np.flatnonzero((h >> np.uint32(shift)) == 0) + (lo + 1))
+    return np.concatenate(found) if found else np.zeros(0, np.int64)
+
+
+def cut_points(data: Any, params: ChunkParams = DEFAULT_CHUNK_PARAMS) -> list[int]:
+    """End offsets of the content-defined chunks of ``data``.
+
+    A chunk ends at the first hash boundary at least ``min_size`` bytes in,
+    or after ``max_size`` bytes. Boundaries depend only on nearby content,
+    so an edit changes the chunks around it and the rest resynchronize.
+    The numpy scan and the pure-Python loop give the same cuts.
+    """
+    n = len(data)
+    cuts: list[int] = []
+    start = 0
+    if np is not None:
+        candidates = _gear_candidates(data, params.shift)
+        while start < n:
+            lo, hi = start + params.min_size, min(start + params.max_size, n)
+            cut = hi
+            if lo <= hi:
+                i = int(np.searchsorted(candidates, lo))
+                if i < len(candidates) and candidates[i] <= hi:
+                    cut = int(candidates[i])
+            cuts.append(cut)
+            start = cut
+        return cuts
+    while start < n:
+        end = min(start + params.max_size, n)
+        first = start + params.min_size - 1
+        cut = end
+        h = 0
+        for i in range(max(first - (_WINDOW - 1), 0), end):
+            h = ((h << 1) + GEAR[data[i]]) & _MASK32
+            if i >= first and not h >> params.shift:
+                cut = i + 1
+                break
+        cuts.append(cut)
+        start = cut
+    return cuts
+
+
+def write_chunks(
+    layer: Path,
+    store: Callable[[bytes], tuple[str, int]],
+    media_type: str,
+    params: ChunkParams = DEFAULT_CHUNK_PARAMS,
+) -> bytes:
+    """Split the ``media_type`` layer at ``layer`` into chunks; return the index.
+
+    Each chunk is passed to ``store``, which writes it as a blob and returns
+    its digest and size. The index records the whole layer's digest and
+    size, and every chunk in order (repeated chunks are listed again).
+    """
+    hasher = hashlib.sha256()
+    chunks = []
+    size = layer.stat().st_size
+    with layer.open("rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        try:
+            start = 0
+            for end in cut_points(data, params):
+                chunk = data[start:end]
+                hasher.update(chunk)
+                digest, chunk_size = store(chunk)
+                chunks.append({"digest": digest, "size": chunk_size})
+                start = end
+        finally:
+            if size:
+                data.close()
+    index = {
+        "mediaType": media_type,
+        "digest": f"sha256:{hasher.hexdigest()}",
+        "size": size,
+        "chunks": chunks,
+    }
+    return json.dumps(index).encode()
+
+
+def chunk_descriptors(index: dict) -> list[dict]:
+    """One manifest descriptor per distinct chunk, in first-use order."""
+    seen: dict[str, dict] = {}
+    for chunk in index["chunks"]:
+        seen.setdefault(
+            chunk["digest"],
+            {
+                "mediaType": CHUNK_MEDIA_TYPE,
+                "digest": chunk["digest"],
+                "size": chunk["size"],
+            },
+        )
+    return list(seen.values())
+
+
+class ChunkedReader(io.RawIOBase):
+    """Read a layer's chunks as one verified stream.
+
+    ``chunks`` yields ``(path, digest, size)`` per chunk. Each chunk is read
+    whole (at most ``max_size`` bytes) and checked before any of its bytes
+    are returned; at EOF the stream is checked against the layer's
+    ``digest`` and ``size``. A mismatch raises ``ValueError``.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[tuple[Path, str, int]],
+        digest: str | None = None,
+        size: int | None = None,
+    ):
+        self._chunks = iter(chunks)
+        self._digest = digest
+        self._size = size
+        self._hasher = hashlib.sha256()
+        self._read = 0
+        self._view = memoryview(b"")
+        self._done = False
+
+    def readable(self) -> bool:
+        return True
+
+    def _next_chunk(self) -> bool:
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        path, digest, size = chunk
+        if path.stat().st_size != size:
+            raise ValueError(f"chunk {digest} is not {size} bytes")
+        data = path.read_bytes()
+        if f"sha256:{hashlib.sha256(data).hexdigest()}" != digest:
+            raise ValueError(f"digest mismatch for chunk {digest}")
+        self._view = memoryview(data)
+        return True
+
+    def _finish(self) -> None:
+        self._done = True
+        if self._size is not None and self._read != self._size:
+            raise ValueError(
+                f"chunked layer is {self._read} bytes, index says {self._size}"
+            )
+        actual = f"sha256:{self._hasher.hexdigest()}"
+        if self._digest is not None and actual != self._digest:
+            raise ValueError(f"digest mismatch for layer {self._digest}: got {actual}")
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._view:
+            if self._done:
+                return 0
+            if not self._next_chunk():
+                self._finish()
+                return 0
+        n = min(len(buffer), len(self._view))
+        buffer[:n] = self._view[:n]
+        self._hasher.update(self._view[:n])
+        self._view = self._view[n:]
+        self._read += n
+        return n
+
+    def close(self) -> None:
+        self._view = memoryview(b"")
+        super().close()
+
+
+def open_chunked(index: dict, blob_path: Callable[[str], Path]) -> BinaryIO:
+    """Stream the layer described by a chunk ``index``, verifying as it goes."""
+    chunks = [
+        (blob_path(chunk["digest"]), chunk["digest"], chunk["size"])
+        for chunk in index["chunks"]
+    ]
+    reader = ChunkedReader(chunks, index.get("digest"), index.get("size"))
+    return io.BufferedReader(reader, buffer_size=1024 * 1024)
@@ -0,0 +1,506 @@
+from __future__ import annotations
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import sys
+import tarfile
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+
+import yaml
+
+from .acs import load_acs, validate_acs
+from .adp_model import ADP
+from .adpkg import ADPackage, VerificationError
+from .blobserver import serve
+from .bulk import discover_agents
+from .validation import validate_adp
+
+IGNORED_DIRS = {"__pycache__", ".git", ".venv", "node_modules"}
+
+
+@dataclass
+class Result:
+    command: str
+    target: str
+    ok: bool
+    detail: str = ""
+    seconds: float = 0.0
+    data: dict | None = None
+
+
+# Parsed manifests keyed by path, reused while (mtime, size) is unchanged.
+_MANIFESTS: dict[str, tuple[tuple[int, int], ADP]] = {}
+
+
+def load_manifest(path: Path) -> ADP:
+    st = path.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _MANIFESTS.get(str(path))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    adp = ADP.model_validate(yaml.safe_load(path.read_text()))
+    _MANIFESTS[str(path)] = (key, adp)
+    return adp
+
+
+def _run_task(
+    command: str, fn: Callable[..., tuple[str, dict | None]], target: str, *args
+) -> Result:
+    start = time.perf_counter()
+    try:
+        detail, data = fn(Path(target), *args)
+        ok = True
+    except VerificationError as exc:
+        detail, data, ok = "; ".join(exc.errors), None, False
+    except (
+        OSError,
+        ValueError,
+        TypeError,
+        KeyError,
+        RuntimeError,
+        yaml.YAMLError,
+        tarfile.TarError,
+    ) as exc:  # reported per target, the rest keep going
+        detail, data, ok = f"{type(exc).__name__}: {exc}", None, False
+    return Result(command, target, ok, detail, time.perf_counter() - start, data)
+
+
+def _validate(target: Path, acs: bool = False) -> tuple[str, None]:
+    manifest = target if target.is_file() else target / "adp" / "agent.yaml"
+    errors = validate_adp(load_manifest(manifest))
+    acs_path = target / "acs" / "container.yaml"
+    if acs and target.is_dir() and acs_path.is_file():
+        errors.extend(f"acs: {e}" for e in validate_acs(load_acs(acs_path)))
+    if errors:
+        raise ValueError("; ".join(errors))
+    return "valid", None
+
+
+def _pack(
+    src: Path, out: str, bytecode: bool, wheelhouse: str | None, chunked: bool = False
+) -> tuple[str, None]:
+    pkg = ADPackage.create_from_directory(
+        src, out, bytecode=bytecode, wheelhouse=wheelhouse, chunked=chunked
+    )
+    return f"{out} {pkg._manifest_desc()['digest']}", None
+
+
+def _unpack(layout: Path, dest: str) -> tuple[str, None]:
+    result = ADPackage.open(layout).unpack(dest)
+    return (
+        (
+            f"{dest}: {result.written} written, {result.linked} linked,"
+            f" {result.skipped} unchanged"
+        ),
+        None,
+    )
+
+
+def _verify(layout: Path) -> tuple[str, None]:
+    ADPackage.open(layout).verify()
+    return "verified", None
+
+
+def _inspect(layout: Path) -> tuple[str, dict]:
+    pkg = ADPackage.open(layout)
+    manifest_desc = pkg._manifest_desc()
+    manifest = pkg._manifest()
+    config = pkg.read_config()
+    data = {
+        "id": config.agent_id,
+        "adp_version": config.adp_version,
+        "name": config.name,
+        "manifest": manifest_desc["digest"],
+        "layers": [
+            {
+                "mediaType": layer["mediaType"],
+                "digest": layer["digest"],
+                "size": layer["size"],
+                "title": (layer.get("annotations") or {}).get(
+                    "org.opencontainers.image.title"
+                ),
+            }
+            for layer in manifest["layers"]
+        ],
+        "size": sum(layer["size"] for layer in manifest["layers"]),
+    }
+    return f"{config.agent_id} {manifest_desc['digest']}", data
+
+
+def expand_sources(targets: Iterable[str | Path]) -> list[Path]:
+    """Agent directories (or manifest files) named by ``targets``.
+
+    A directory without ``adp/agent.yaml`` stands for every agent below it.
+    """
+    found: list[Path] = []
+    for target in map(Path, targets):
+        if target.is_file() or (target / "adp" / "agent.yaml").is_file():
+            found.append(target)
+        elif target.is_dir():
+            found.extend(discover_agents(target))
+        else:
+            raise FileNotFoundError(f"no such agent: {target}")
+    return found
+
+
+def expand_layouts(targets: Iterable[str | Path]) -> list[Path]:
+    """OCI layouts named by ``targets``; a plain directory is searched."""
+    found: list[Path] = []
+    for target in map(Path, targets):
+        if (target / "oci-layout").is_file():
+            found.append(target)
+        elif target.is_dir():
+            found.extend(sorted(p.parent for p in target.rglob("oci-layout")))
+        else:
+            raise FileNotFoundError(f"no such layout: {target}")
+    return found
+
+
+def _output_paths(targets: Sequence[Path], out: Path) -> list[str]:
+    # One target writes to ``out`` itself; several get a subdirectory each.
+    if len(targets) == 1:
+        return [str(out)]
+    return [str(out / t.name) for t in targets]
+
+
+def run_tasks(
+    tasks: Sequence[Callable[[], Result]] | Sequence[partial],
+    executor: Executor | None = None,
+) -> list[Result]:
+    """Run ``tasks`` on ``executor``, or inline (and in order) without one."""
+    if executor is None or len(tasks) < 2:
+        return [task() for task in tasks]
+    return [f.result() for f in [executor.submit(task) for task in tasks]]
+
+
+class _Inotify:
+    """Minimal Linux inotify binding: wake up when a watched directory changes."""
+
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    # | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+    MASK = 0x002 | 0x004 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200 | 0x400
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watched: set[str] = set()
+
+    def watch(self, directories: Iterable[str]) -> None:
+        for directory in directories:
+            if directory not in self._watched:
+                if self._add(self.fd, os.fsencode(directory), self.MASK) < 0:
+                    raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+                self._watched.add(directory)
+
+    def wait(self, timeout: float | None) -> bool:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class Watcher:
+    """Report which targets changed, by inotify where available, else polling.
+
+    Each target is fingerprinted by the (mtime, size) of every file below
+    it, skipping ``ignore`` paths and cache directories. Only targets whose
+    fingerprint changed are returned, so callers redo just those.
+    """
+
+    def __init__(
+        self,
+        targets: Sequence[Path],
+        *,
+        method: str = "auto",
+        interval: float = 0.5,
+        debounce: float = 0.05,
+        ignore: Iterable[Path] = (),
+    ):
+        self.targets = list(targets)
+        self.interval = interval
+        self.debounce = debounce
+        self.ignore = {p.resolve() for p in ignore}
+        self._inotify: _Inotify | None = None
+        if method not in ("auto", "poll", "inotify"):
+            raise ValueError(f"unknown watch method {method!r}")
+        if method != "poll" and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError):
+                if method == "inotify":
+                    raise
+        elif method == "inotify":
+            raise OSError("inotify is only available on Linux")
+        self.method = "inotify" if self._inotify else "poll"
+        self._state = {t: self._scan(t) for t in self.targets}
+
+    def add(self, targets: Iterable[Path]) -> None:
+        """Start watching more targets, taking their current state as seen."""
+        for target in targets:
+            if target not in self._state:
+                self.targets.append(target)
+                self._state[target] = self._scan(target)
+
+    def _scan(self, target: Path) -> dict[str, tuple[int, int]]:
+        files: dict[str, tuple[int, int]] = {}
+        dirs: list[str] = []
+        if target.is_file():
+            st = target.stat()
+            files[str(target)] = (st.st_mtime_ns, st.st_size)
+            dirs.append(str(target.parent))
+        else:
+            for root, subdirs, names in os.walk(target):
+                subdirs[:] = [
+                    d
+                    for d in subdirs
+                    if d not in IGNORED_DIRS
+                    and Path(root, d).resolve() not in self.ignore
+                ]
+                dirs.append(root)
+                for name in names:
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:  # removed mid-scan
+                        continue
+                    files[path] = (st.st_mtime_ns, st.st_size)
+        if self._inotify is not None:
+            self._inotify.watch(dirs)
+        return files
+
+    def poll(self, timeout: float | None = None) -> list[Path]:
+        """Wait up to ``timeout`` seconds for changes; return changed targets."""
+        if self._inotify is not None:
+            if not self._inotify.wait(timeout):
+                return []
+            # Let a burst of writes (editor save, git checkout) settle.
+            while self._inotify.wait(self.debounce):
+                pass
+        else:
+            time.sleep(
+                self.interval if timeout is None else min(timeout, self.interval)
+            )
+        changed = []
+        for target in self.targets:
+            state = self._scan(target)
+            if state != self._state[target]:
+                if self._inotify is None:
+                    state = self._settle(target, state)
+                self._state[target] = state
+                changed.append(target)
+        return changed
+
+    def _settle(
+        self, target: Path, state: dict[str, tuple[int, int]]
+    ) -> dict[str, tuple[int, int]]:
+        # Polling can land mid-write; rescan until the burst has finished.
+        while True:
+            time.sleep(self.debounce)
+            again = self._scan(target)
+            if again == state:
+                return state
+            state = again
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+def _print(result: Result, as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(asdict(result)), flush=True)
+    else:
+        status = "ok  " if result.ok else "FAIL"
+        print(
+            f"{status} {result.seconds:7.3f}s  {result.target}  {result.detail}",
+            flush=True,
+        )
+        if result.data is not None:
+            print(json.dumps(result.data, indent=2), flush=True)
+
+
+def _build_tasks(args: argparse.Namespace, targets: list[Path]) -> list[partial]:
+    command = args.command
+    if command == "validate":
+        return [
+            partial(_run_task, command, _validate, str(t), args.acs) for t in targets
+        ]
+    if command == "pack":
+        outs = _output_paths(targets, args.out)
+        return [
+            partial(
+                _run_task,
+                command,
+                _pack,
+                str(t),
+                o,
+                args.bytecode,
+                args.wheelhouse,
+                args.chunked,
+            )
+            for t, o in zip(targets, outs, strict=True)
+        ]
+    if command == "unpack":
+        outs = _output_paths(targets, args.dest)
+        return [
+            partial(_run_task, command, _unpack, str(t), o)
+            for t, o in zip(targets, outs, strict=True)
+        ]
+    fn = _verify if command == "verify" else _inspect
+    return [partial(_run_task, command, fn, str(t)) for t in targets]
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="adp", description="Validate, pack and inspect ADP agents."
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "-j", "--jobs", type=int, default=1, help="parallel workers (0 = CPU count)"
+    )
+    common.add_argument("--json", action="store_true", help="one JSON result per line")
+    watch = argparse.ArgumentParser(add_help=False)
+    watch.add_argument(
+        "-w", "--watch", action="store_true", help="redo changed targets on change"
+    )
+    watch.add_argument(
+        "--watch-method", choices=("auto", "poll", "inotify"), default="auto"
+    )
+    watch.add_argument("--interval", type=float, default=0.5, help="poll seconds")
+
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser(
+        "validate", parents=[common, watch], help="validate agent manifests and ACS"
+    )
+    p.add_argument("targets", nargs="+", help="agent dirs, agent.yaml files or roots")
+    p.add_argument(
+        "--acs", action="store_true", help="also validate acs/container.yaml"
+    )
+    p = sub.add_parser("pack", parents=[common, watch], help="pack agents into layouts")
+    p.add_argument("targets", nargs="+", help="agent dirs or roots")
+    p.add_argument("-o", "--out", type=Path, required=True)
+    p.add_argument("--bytecode", action="store_true", help="add a bytecode layer")
+    p.add_argument("--wheelhouse", help="bundle dependencies from this wheel dir")
+    p.add_argument(
+        "--chunked", action="store_true", help="store the layer as dedup chunks"
+    )
+    p = sub.add_parser("unpack", parents=[common], help="extract layouts")
+    p.add_argument("targets", nargs="+", help="layouts or dirs holding layouts")
+    p.add_argument("-d", "--dest", type=Path, required=True)
+    for name, text in (("verify", "verify layouts"), ("inspect", "describe layouts")):
+        p = sub.add_parser(name, parents=[common], help=text)
+        p.add_argument("targets", nargs="+", help="layouts or dirs holding layouts")
+    p = sub.add_parser("serve", help="serve a layout over the OCI distribution API")
+    p.add_argument("layout", type=Path, help="layout or blob store root")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=5000)
+    return parser
+
+
+def _roots(args: argparse.Namespace) -> list[Path]:
+    """Directories in ``args.targets`` that stand for the agents below them."""
+    return [
+        Path(t)
+        for t in args.targets
+        if Path(t).is_dir() and not (Path(t) / "adp" / "agent.yaml").is_file()
+    ]
+
+
+def _watch(
+    args: argparse.Namespace,
+    targets: list[Path],
+    executor: Executor | None,
+    stop: threading.Event | None = None,
+) -> None:
+    ignore = [args.out] if args.command == "pack" else []
+    # Roots are watched too, so agents added below them are picked up.
+    roots = [r for r in _roots(args) if r not in targets]
+    watcher = Watcher(
+        [*targets, *roots],
+        method=args.watch_method,
+        interval=args.interval,
+        ignore=ignore,
+    )
+    print(f"watching {len(targets)} targets ({watcher.method})", flush=True)
+    try:
+        while stop is None or not stop.is_set():
+            changed = watcher.poll(timeout=0.5 if stop else None)
+            if any(c in roots for c in changed):
+                added = [t for t in expand_sources(args.targets) if t not in targets]
+                targets.extend(added)
+                watcher.add(added)
+                changed.extend(added)
+            changed = [c for c in changed if c not in roots]
+            if not changed:
+                continue
+            index = {t: i for i, t in enumerate(targets)}
+            tasks = _build_tasks(args, targets)
+            for result in run_tasks([tasks[index[t]] for t in changed], executor):
+                _print(result, args.json)
+    finally:
+        watcher.close()
+
+
+def main(argv: list[str] | None = None, *, stop: threading.Event | None = None) -> int:
+    args = _parser().parse_args(argv)
+    if args.command == "serve":
+        if not (args.layout / "blobs").is_dir():
+            print(f"adp: {args.layout}: no blobs/ directory", file=sys.stderr)
+            return 2
+        print(f"serving {args.layout} on http://{args.host}:{args.port}", flush=True)
+        serve(args.layout, args.host, args.port)
+        return 0
+    try:
+        if args.command in ("validate", "pack"):
+            targets = expand_sources(args.targets)
+        else:
+            targets = expand_layouts(args.targets)
+    except FileNotFoundError as exc:
+        print(f"adp: {exc}", file=sys.stderr)
+        return 2
+
+    jobs = args.jobs or os.cpu_count() or 1
+    # A long-lived pool: in watch mode its workers keep schemas and parsed
+    # manifests warm across iterations.
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        results = run_tasks(_build_tasks(args, targets), executor)
+        for result in results:
+            _print(result, args.json)
+        if getattr(args, "watch", False):
+            try:
+                _watch(args, targets, executor, stop)
+            except KeyboardInterrupt:
+                pass
+            return 0
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import hashlib
+import tarfile
+from collections.abc import Iterator
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import zip_longest
+from pathlib import Path
+from typing import BinaryIO
+
+from .chunking import CHUNK_MEDIA_TYPE
+
+ADDED = "added"
+REMOVED = "removed"
+MODIFIED = "modified"
+
+# (size, digest) of a layer member; links carry their target instead.
+Entry = tuple[int, str]
+
+
+@dataclass
+class MemberChange:
+    name: str
+    status: str
+    old: Entry | None = None
+    new: Entry | None = None
+
+
+@dataclass
+class LayerDiff:
+    key: str
+    old_digest: str | None
+    new_digest: str | None
+    changes: list[MemberChange] = field(default_factory=list)
+
+
+@dataclass
+class PackageDiff:
+    old_manifest: str
+    new_manifest: str
+    config: dict[str, tuple] = field(default_factory=dict)
+    layers: list[LayerDiff] = field(default_factory=list)
+
+    @property
+    def identical(self) -> bool:
+        return self.old_manifest == self.new_manifest
+
+    def changes(self, prefix: str = "") -> list[MemberChange]:
+        return [
+            change
+            for layer in self.layers
+            for change in layer.changes
+            if change.name.startswith(prefix)
+        ]
+
+    def changed(self, prefix: str = "") -> bool:
+        """True if any layer member under ``prefix`` (e.g. ``"src/"``) differs."""
+        return bool(self.changes(prefix))
+
+
+def _iter_entries(layer: Path | BinaryIO) -> Iterator[tuple[str, Entry]]:
+    with ExitStack() as stack:
+        if isinstance(layer, Path):
+            layer = stack.enter_context(layer.open("rb"))
+        tar = stack.enter_context(tarfile.open(fileobj=layer, mode="r|"))
+        for member in tar:
+            if member.isreg():
+                hasher = hashlib.sha256()
+                f = tar.extractfile(member)
+                if f is not None:
+                    for chunk in iter(partial(f.read, 1024 * 1024), b""):
+                        hasher.update(chunk)
+                yield member.name, (member.size, f"sha256:{hasher.hexdigest()}")
+            elif member.issym() or member.islnk():
+                yield member.name, (0, f"link:{member.linkname}")
+
+
+def diff_layers(
+    old: Path | BinaryIO | None, new: Path | BinaryIO | None
+) -> list[MemberChange]:
+    """Compare two layer tars member by member in a single streaming pass.
+
+    Both archives are read in lockstep. An entry is matched as soon as its
+    name has been seen on the other side, so for archives written in the same
+    (sorted) order only a handful of entries are ever held in memory.
+    """
+    left = _iter_entries(old) if old else iter(())
+    right = _iter_entries(new) if new else iter(())
+    pending_old: dict[str, Entry] = {}
+    pending_new: dict[str, Entry] = {}
+    changes: list[MemberChange] = []
+
+    def settle(name: str, entry: Entry, mine: dict, theirs: dict, is_old: bool):
+        other = theirs.pop(name, None)
+        if other is None:
+            mine[name] = entry
+            return
+        old_entry, new_entry = (entry, other) if is_old else (other, entry)
+        if old_entry != new_entry:
+            changes.append(MemberChange(name, MODIFIED, old_entry, new_entry))
+
+    for a, b in zip_longest(left, right):
+        if a is not None:
+            settle(a[0], a[1], pending_old, pending_new, True)
+        if b is not None:
+            settle(b[0], b[1], pending_new, pending_old, False)
+
+    changes.extend(MemberChange(n, REMOVED, old=e) for n, e in pending_old.items())
+    changes.extend(MemberChange(n, ADDED, new=e) for n, e in pending_new.items())
+    changes.sort(key=lambda c: c.name)
+    return changes
+
+
+def layer_key(desc: dict, ordinal: int) -> str:
+    title = desc.get("annotations", {}).get("org.opencontainers.image.title")
+    return title or f"{desc.get('mediaType')}#{ordinal}"
+
+
+def keyed_layers(manifest: dict) -> dict[str, dict]:
+    counts: dict[str, int] = {}
+    keyed = {}
+    for desc in manifest["layers"]:
+        media_type = desc.get("mediaType", "")
+        if media_type == CHUNK_MEDIA_TYPE:
+            continue  # compared through the chunked layer's index
+        ordinal = counts.get(media_type, 0)
+        counts[media_type] = ordinal + 1
+        keyed[layer_key(desc, ordinal)] = desc
+    return keyed
+
+
+def diff_configs(old: dict, new: dict) -> dict[str, tuple]:
+    return {
+        key: (old.get(key), new.get(key))
+        for key in sorted(old.keys() | new.keys())
+        if old.get(key) != new.get(key)
+    }
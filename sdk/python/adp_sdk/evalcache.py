@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 200_000
+
+# (layer digest, suite hash, metric id, task id)
+CacheKey = tuple[str, str, str, str]
+
+
+def suite_hash(suite: dict) -> str:
+    """Canonical hash of a suite definition (key order does not matter)."""
+    canonical = json.dumps(suite, sort_keys=True, separators=(",", ":"))
+    return "sha256:" + hashlib.sha256(canonical.encode()).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evicted: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class EvalCache:
+    """Persistent store of metric case results.
+
+    Entries are keyed on the package layer digest, the suite's canonical hash,
+    the metric id and the task id, so a result is reused only while neither
+    the packaged agent (including its ``eval/`` task files) nor the suite
+    definition changed. Cases that errored are never stored. Entries older
+    than ``ttl`` seconds are ignored and purged; beyond ``max_entries`` the
+    least recently used are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                layer TEXT NOT NULL,
+                suite TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                task TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created REAL NOT NULL,
+                used REAL NOT NULL,
+                PRIMARY KEY (layer, suite, metric, task)
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def get(self, key: CacheKey) -> dict | None:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created FROM results "
+                "WHERE layer = ? AND suite = ? AND metric = ? AND task = ?",
+                key,
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.stats.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE results SET used = ? "
+                "WHERE layer = ? AND suite = ? AND metric = ? AND task = ?",
+                (now, *key),
+            )
+            self.stats.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: CacheKey, value: dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, json.dumps(value), now, now),
+            )
+
+    def commit(self) -> None:
+        """Flush pending writes and apply TTL and size eviction."""
+        with self._lock:
+            cur = self._db.execute(
+                "DELETE FROM results WHERE created < ?", (time.time() - self.ttl,)
+            )
+            evicted = cur.rowcount
+            count = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            if count > self.max_entries:
+                cur = self._db.execute(
+                    "DELETE FROM results WHERE rowid IN "
+                    "(SELECT rowid FROM results ORDER BY used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+                evicted += cur.rowcount
+            self._db.commit()
+            self.stats.evicted += evicted
@@ -0,0 +1,464 @@
+from __future__ import annotations
+
+import json
+import tarfile
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import yaml
+
+from .adp_model import ADP
+from .aio import default_workers
+from .evalcache import EvalCache, suite_hash
+
+if TYPE_CHECKING:
+    from .adpkg import ADPackage
+
+# Used for suites that have no task file, so metrics such as ``noop`` or
+# telemetry checks still run once.
+DEFAULT_TASK_ID = "default"
+
+
+@dataclass
+class Task:
+    id: str
+    prompt: str | None = None
+    input: Any = None
+    expected_contains: str | None = None
+    expected_policy: str | None = None
+    data: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Task:
+        return cls(
+            id=str(data["id"]),
+            prompt=data.get("prompt"),
+            input=data.get("input"),
+            expected_contains=data.get("expected_contains"),
+            expected_policy=data.get("expected_policy"),
+            data=data,
+        )
+
+
+@dataclass
+class Case:
+    """One task's agent output, handed to every metric of the suite."""
+
+    task: Task
+    output: Any = None
+    latency_ms: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class CaseResult:
+    suite: str
+    metric: str
+    task: str
+    score: float
+    passed: bool
+    seconds: float
+    error: str | None = None
+
+
+@dataclass
+class SuiteResult:
+    suite: str
+    score: float
+    passed: bool
+    metrics: dict[str, float] = field(default_factory=dict)
+    cases: list[CaseResult] = field(default_factory=list)
+
+
+@dataclass
+class EvaluationReport:
+    suites: list[SuiteResult]
+    seconds: float
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.cache_hits + self.cache_misses
+        return self.cache_hits / total if total else 0.0
+
+    def suite(self, suite_id: str) -> SuiteResult:
+        for result in self.suites:
+            if result.suite == suite_id:
+                return result
+        raise KeyError(suite_id)
+
+    def passed(self, suite_ids: Iterable[str] | None = None) -> bool:
+        """True if every suite in ``suite_ids`` (default: all run) passed."""
+        wanted = None if suite_ids is None else set(suite_ids)
+        return all(
+            result.passed
+            for result in self.suites
+            if wanted is None or result.suite in wanted
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# Evaluators take the metric definition and a case and return a score; a bool
+# counts as 1.0/0.0.
+Evaluator = Callable[[dict, Case], "float | bool"]
+
+
+def _noop(metric: dict, case: Case) -> bool:
+    return True
+
+
+def _contains(metric: dict, case: Case) -> bool:
+    expected = case.task.expected_contains
+    return expected is None or expected in str(case.output)
+
+
+def _json_valid(metric: dict, case: Case) -> bool:
+    if not isinstance(case.output, str):
+        return case.output is not None
+    try:
+        json.loads(case.output)
+    except ValueError:
+        return False
+    return True
+
+
+FUNCTIONS: dict[str, Evaluator] = {
+    "noop": _noop,
+    "contains": _contains,
+    "json_valid": _json_valid,
+}
+
+
+def deterministic(metric: dict, case: Case) -> float | bool:
+    name = metric.get("function", "noop")
+    if name not in FUNCTIONS:
+        raise ValueError(f"unknown deterministic function {name!r}")
+    return FUNCTIONS[name](metric, case)
+
+
+def telemetry(metric: dict, case: Case) -> float | bool:
+    """Check the latency measured while running the task against ``max_ms``."""
+    if "max_ms" not in metric:
+        raise ValueError(f"telemetry metric {metric['id']!r} has no max_ms")
+    return case.latency_ms <= metric["max_ms"]
+
+
+DEFAULT_EVALUATORS: dict[str, Evaluator] = {
+    "deterministic": deterministic,
+    "telemetry": telemetry,
+}
+
+
+def load_suites(adp: ADP) -> list[dict]:
+    evaluation = adp.evaluation
+    if not isinstance(evaluation, dict):
+        evaluation = evaluation.model_dump()
+    return list(evaluation.get("suites", []))
+
+
+def _add_task_file(tasks: dict[str | None, list[Task]], data: Any) -> None:
+    if not isinstance(data, dict):
+        return
+    items = tasks.setdefault(data.get("suite"), [])
+    items.extend(Task.from_dict(t) for t in data.get("tasks") or [])
+
+
+def load_tasks(root: str | Path) -> dict[str | None, list[Task]]:
+    """Read ``eval/*.yaml`` task files under ``root``, keyed by ``suite``.
+
+    Files without a ``suite`` key are stored under ``None`` and apply to
+    every suite.
+    """
+    tasks: dict[str | None, list[Task]] = {}
+    for path in sorted((Path(root) / "eval").glob("*.y*ml")):
+        _add_task_file(tasks, yaml.safe_load(path.read_text()))
+    return tasks
+
+
+def load_package_tasks(package: ADPackage) -> dict[str | None, list[Task]]:
+    """Like :func:`load_tasks`, reading task files from the package layer."""
+    tasks: dict[str | None, list[Task]] = {}
+    layer = package._package_layers()[0]
+    files: dict[str, bytes] = {}
+    with (
+        package._open_layer(layer) as f,
+        tarfile.open(fileobj=f, mode="r|") as tar,
+    ):
+        for m in tar:
+            if (
+                m.isreg()
+                and m.name.startswith("eval/")
+                and m.name.count("/") == 1
+                and m.name.endswith((".yaml", ".yml"))
+            ):
+                files[m.name] = tar.extractfile(m).read()
+    for name in sorted(files):
+        _add_task_file(tasks, yaml.safe_load(files[name]))
+    return tasks
+
+
+def bound_suites(acs: dict, hook: str = "on_deploy") -> list[str]:
+    """Suite ids an ACS ``eval_bindings`` hook refers to."""
+    binding = (acs.get("eval_bindings") or {}).get(hook) or {}
+    key = "require_passing_suites" if hook == "on_deploy" else "run_suites"
+    return list(binding.get(key, []))
+
+
+def _run_agent(agent: Callable[[Task], Any] | None, task: Task) -> Case:
+    if agent is None:
+        return Case(task)
+    start = time.perf_counter()
+    try:
+        output = agent(task)
+    except Exception as exc:  # noqa: BLE001
+        # Agents are user code; record the error and let the metrics fail.
+        return Case(task, None, (time.perf_counter() - start) * 1000, repr(exc))
+    return Case(task, output, (time.perf_counter() - start) * 1000)
+
+
+def _run_metric(
+    evaluator: Evaluator | None, metric: dict, case: Case
+) -> tuple[float | None, float, str | None]:
+    start = time.perf_counter()
+    if case.error is not None:
+        return None, 0.0, f"agent failed: {case.error}"
+    if evaluator is None:
+        return None, 0.0, f"no evaluator for metric type {metric.get('type')!r}"
+    try:
+        score = evaluator(metric, case)
+    except Exception as exc:  # noqa: BLE001
+        # Evaluators are user code too; an error fails this metric only.
+        return None, time.perf_counter() - start, repr(exc)
+    return float(score), time.perf_counter() - start, None
+
+
+def case_passed(metric: dict, score: float | None) -> bool:
+    if score is None:
+        return False
+    threshold = metric.get("threshold")
+    if threshold is None or isinstance(threshold, bool):
+        return bool(score)
+    return score >= threshold
+
+
+def metric_value(metric: dict, cases: list[CaseResult]) -> float:
+    """Pass rate when the metric has a threshold, else the mean score."""
+    if not cases:
+        return 0.0
+    if metric.get("threshold") is not None:
+        return sum(c.passed for c in cases) / len(cases)
+    return sum(c.score for c in cases) / len(cases)
+
+
+def combine(scoring: dict, values: dict[str, float]) -> float:
+    """Combine per-metric values according to ``scoring.combine``."""
+    method = scoring.get("combine", "average")
+    if not values:
+        return 0.0
+    if method == "average":
+        return sum(values.values()) / len(values)
+    if method == "weighted_average":
+        weights = scoring.get("weights") or {}
+        total = sum(weights.get(k, 1.0) for k in values)
+        if not total:
+            return 0.0
+        return sum(v * weights.get(k, 1.0) for k, v in values.items()) / total
+    if method == "sum":
+        return sum(values.values())
+    if method == "boolean":
+        return 1.0 if all(v >= 1.0 for v in values.values()) else 0.0
+    raise ValueError(f"unknown scoring.combine {method!r}")
+
+
+def score_suite(suite: dict, cases: list[CaseResult]) -> SuiteResult:
+    by_metric: dict[str, list[CaseResult]] = {m["id"]: [] for m in suite["metrics"]}
+    for case in cases:
+        by_metric[case.metric].append(case)
+    values = {m["id"]: metric_value(m, by_metric[m["id"]]) for m in suite["metrics"]}
+    score = combine(suite.get("scoring") or {}, values)
+    threshold = suite.get("promotion_threshold")
+    if threshold is None:
+        passed = all(c.passed for c in cases)
+    else:
+        passed = score >= threshold
+    return SuiteResult(suite["id"], score, passed, values, cases)
+
+
+class EvaluationRunner:
+    """Run evaluation suites, spreading agent calls and metrics over a pool.
+
+    ``agent`` is called once per task and its output is scored by every metric
+    of the suite. ``evaluators`` maps metric ``type`` to an :data:`Evaluator`
+    and is merged over :data:`DEFAULT_EVALUATORS`. ``executor`` may be any
+    :class:`concurrent.futures.Executor` (a process pool needs picklable
+    callables); by default a thread pool of ``concurrency`` workers is used.
+    At most ``concurrency`` jobs are in flight at once.
+
+    With a ``cache`` and the package layer ``digest``, metric results are
+    reused from earlier runs and the agent only runs for tasks that still
+    have uncached metrics.
+    """
+
+    def __init__(
+        self,
+        suites: list[dict],
+        tasks: dict[str | None, list[Task]] | None = None,
+        agent: Callable[[Task], Any] | None = None,
+        *,
+        evaluators: dict[str, Evaluator] | None = None,
+        executor: Executor | None = None,
+        concurrency: int | None = None,
+        cache: EvalCache | None = None,
+        digest: str | None = None,
+    ):
+        self.suites = {suite["id"]: suite for suite in suites}
+        self.tasks = tasks or {}
+        self.agent = agent
+        self.evaluators = {**DEFAULT_EVALUATORS, **(evaluators or {})}
+        self.executor = executor
+        self.concurrency = concurrency or default_workers()
+        self.cache = cache
+        self.digest = digest
+
+    @classmethod
+    def from_adp(cls, adp: ADP, root: str | Path | None = None, **kwargs):
+        """Suites from ``adp``; tasks from ``root/eval`` when given."""
+        tasks = load_tasks(root) if root is not None else None
+        return cls(load_suites(adp), tasks, **kwargs)
+
+    @classmethod
+    def from_package(cls, package: ADPackage, **kwargs) -> EvaluationRunner:
+        kwargs.setdefault("digest", package._package_layers()[0]["digest"])
+        return cls(
+            load_suites(package.read_adp()), load_package_tasks(package), **kwargs
+        )
+
+    def tasks_for(self, suite_id: str) -> list[Task]:
+        tasks = self.tasks.get(suite_id, []) + self.tasks.get(None, [])
+        return tasks or [Task(DEFAULT_TASK_ID)]
+
+    def run(self, suite_ids: Iterable[str] | None = None) -> EvaluationReport:
+        start = time.perf_counter()
+        selected = list(suite_ids) if suite_ids is not None else list(self.suites)
+        for suite_id in selected:
+            if suite_id not in self.suites:
+                raise KeyError(f"unknown evaluation suite {suite_id!r}")
+
+        results: dict[str, list[CaseResult]] = {s: [] for s in selected}
+        if self.executor is not None:
+            hits, misses = self._schedule(self.executor, selected, results)
+        else:
+            with ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="adp-eval"
+            ) as pool:
+                hits, misses = self._schedule(pool, selected, results)
+        if self.cache is not None:
+            self.cache.commit()
+
+        suites = [score_suite(self.suites[s], results[s]) for s in selected]
+        return EvaluationReport(suites, time.perf_counter() - start, hits, misses)
+
+    def _cached(
+        self, suite_id: str, task: Task, results: list[CaseResult]
+    ) -> list[dict]:
+        """Append cached results for ``task`` and return the metrics to run."""
+        if self.cache is None or self.digest is None:
+            return list(self.suites[suite_id]["metrics"])
+        shash = self._suite_hashes[suite_id]
+        missing = []
+        for metric in self.suites[suite_id]["metrics"]:
+            hit = self.cache.get((self.digest, shash, metric["id"], task.id))
+            if hit is None:
+                missing.append(metric)
+            else:
+                results.append(CaseResult(suite_id, metric["id"], task.id, **hit))
+        return missing
+
+    def _schedule(
+        self,
+        pool: Executor,
+        selected: list[str],
+        results: dict[str, list[CaseResult]],
+    ) -> tuple[int, int]:
+        """Run agent calls, then each metric as soon as its task is done.
+
+        Task files without a ``suite`` key are shared, so their agent calls
+        run once however many suites use them. Returns cache hits and misses.
+        """
+        self._suite_hashes = {s: suite_hash(self.suites[s]) for s in selected}
+        # id(task) -> [(suite id, metrics still to run)]
+        todo: dict[int, list[tuple[str, list[dict]]]] = {}
+        queue: deque[tuple] = deque()
+        hits = misses = 0
+        for suite_id in selected:
+            for task in self.tasks_for(suite_id):
+                metrics = self._cached(suite_id, task, results[suite_id])
+                misses += len(metrics)
+                hits += len(self.suites[suite_id]["metrics"]) - len(metrics)
+                if not metrics:
+                    continue
+                if id(task) not in todo:
+                    queue.append(("agent", task))
+                todo.setdefault(id(task), []).append((suite_id, metrics))
+
+        running: dict[Future, tuple] = {}
+        while queue or running:
+            while queue and len(running) < self.concurrency:
+                job = queue.popleft()
+                if job[0] == "agent":
+                    future = pool.submit(_run_agent, self.agent, job[1])
+                else:
+                    _, suite_id, metric, case = job
+                    evaluator = self.evaluators.get(metric["type"])
+                    future = pool.submit(_run_metric, evaluator, metric, case)
+                running[future] = job
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                if job[0] == "agent":
+                    case = future.result()
+                    for suite_id, metrics in todo[id(job[1])]:
+                        for metric in metrics:
+                            queue.append(("metric", suite_id, metric, case))
+                    continue
+                _, suite_id, metric, case = job
+                score, seconds, error = future.result()
+                result = CaseResult(
+                    suite_id,
+                    metric["id"],
+                    case.task.id,
+                    score or 0.0,
+                    case_passed(metric, score),
+                    seconds,
+                    error,
+                )
+                results[suite_id].append(result)
+                if error is None and self.cache is not None and self.digest:
+                    self.cache.put(
+                        (
+                            self.digest,
+                            self._suite_hashes[suite_id],
+                            metric["id"],
+                            case.task.id,
+                        ),
+                        {
+                            "score": result.score,
+                            "passed": result.passed,
+                            "seconds": result.seconds,
+                        },
+                    )
+        return hits, misses
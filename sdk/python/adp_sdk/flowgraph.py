@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated, Any
+
+import yaml
+
+from .adp_model import ADP
+from .tracing import span
+
+if TYPE_CHECKING:
+    from .adpkg import ADPackage
+
+try:
+    from langgraph.graph import END, START, StateGraph
+except ImportError:  # optional dependency
+    StateGraph = None
+    START, END = "__start__", "__end__"
+
+NodeFn = Callable[[dict], dict]
+# A handler factory is called once per node at compile time and returns the
+# function LangGraph runs for that node.
+NodeFactory = Callable[[ADP, dict], Callable[[dict], "dict | None"]]
+ConditionFn = Callable[[str, dict], bool]
+
+
+def merge_state(current: dict | None, update: dict | None) -> dict:
+    """Reducer for the flow state: later updates overwrite earlier keys."""
+    return {**(current or {}), **(update or {})}
+
+
+# One root channel reduced with merge_state, so parallel branches can each
+# return their own update in the same step.
+FlowState = Annotated[dict, merge_state]
+
+
+def passthrough(adp: ADP, node: dict) -> Callable[[dict], None]:
+    return lambda state: None
+
+
+DEFAULT_HANDLERS: dict[str, NodeFactory] = {
+    "input": passthrough,
+    "output": passthrough,
+}
+
+
+def _lookup(state: dict, path: str) -> Any:
+    value: Any = state
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def evaluate_condition(condition: str, state: dict) -> bool:
+    """Evaluate an edge ``condition`` against the state.
+
+    Supports ``key``, ``not key``, ``key == value`` and ``key != value``,
+    where ``key`` is a dotted path into the state and ``value`` a YAML scalar.
+    """
+    expr = condition.strip()
+    for op in ("==", "!="):
+        if op in expr:
+            left, right = (s.strip() for s in expr.split(op, 1))
+            equal = _lookup(state, left) == yaml.safe_load(right)
+            return equal if op == "==" else not equal
+    if expr.startswith("not "):
+        return not _lookup(state, expr[4:].strip())
+    return bool(_lookup(state, expr))
+
+
+def _flow_graph(adp: ADP) -> dict:
+    flow = adp.flow if isinstance(adp.flow, dict) else adp.flow.model_dump()
+    graph = flow.get("graph")
+    if not graph:
+        raise ValueError(f"{adp.id}: flow has no graph to compile")
+    return graph
+
+
+def _node_fn(factory: NodeFactory, adp: ADP, node: dict) -> NodeFn:
+    run = factory(adp, node)
+    attributes = {"adp.node": node["id"], "adp.kind": node["kind"]}
+
+    def invoke(state: dict) -> dict:
+        with span("adp.flow.node", **attributes):
+            update = run(state)
+        return update or {}
+
+    return invoke
+
+
+def _router(edges: list[dict], condition: ConditionFn) -> Callable[[dict], list]:
+    def route(state: dict) -> list:
+        targets = [
+            e["to"]
+            for e in edges
+            if "condition" not in e or condition(e["condition"], state)
+        ]
+        return targets or [END]
+
+    return route
+
+
+def compile_flow(
+    adp: ADP,
+    handlers: Mapping[str, NodeFactory] | None = None,
+    *,
+    condition: ConditionFn = evaluate_condition,
+    state_graph: Any = None,
+) -> Any:
+    """Compile ``flow.graph`` into a LangGraph ``StateGraph`` and compile it.
+
+    Node functions come from ``handlers``, looked up by node id and then by
+    node kind, on top of :data:`DEFAULT_HANDLERS`. Edges with a ``condition``
+    become conditional edges routed by ``condition``; ``start_nodes`` hang off
+    ``START`` and ``end_nodes`` lead to ``END``. ``state_graph`` replaces
+    ``langgraph.graph.StateGraph``, e.g. for tests.
+    """
+    graph_cls = state_graph or StateGraph
+    if graph_cls is None:
+        raise ImportError("langgraph is not installed")
+    spec = _flow_graph(adp)
+    registry = {**DEFAULT_HANDLERS, **(handlers or {})}
+    node_ids = [n["id"] for n in spec["nodes"]]
+
+    graph = graph_cls(FlowState)
+    for node in spec["nodes"]:
+        factory = registry.get(node["id"]) or registry.get(node["kind"])
+        if factory is None:
+            raise ValueError(
+                f"{adp.id}: no handler for node {node['id']!r} (kind {node['kind']!r})"
+            )
+        graph.add_node(node["id"], _node_fn(factory, adp, node))
+
+    outgoing: dict[str, list[dict]] = {}
+    for edge in spec.get("edges") or []:
+        for end in ("from", "to"):
+            if edge[end] not in node_ids:
+                raise ValueError(
+                    f"{adp.id}: edge references unknown node {edge[end]!r}"
+                )
+        outgoing.setdefault(edge["from"], []).append(edge)
+    for source, edges in outgoing.items():
+        if any("condition" in e for e in edges):
+            targets = [e["to"] for e in edges]
+            graph.add_conditional_edges(
+                source, _router(edges, condition), [*targets, END]
+            )
+        else:
+            for edge in edges:
+                graph.add_edge(source, edge["to"])
+    for key, link in (("start_nodes", START), ("end_nodes", END)):
+        for node_id in spec[key]:
+            if node_id not in node_ids:
+                raise ValueError(f"{adp.id}: {key} references unknown node {node_id!r}")
+            if key == "start_nodes":
+                graph.add_edge(link, node_id)
+            else:
+                graph.add_edge(node_id, link)
+    return graph.compile()
+
+
+class FlowCompiler:
+    """Compile ADP flows once per package digest and reuse the result.
+
+    A long-running server keeps one compiler and asks it for each agent's
+    graph per request; the graph is built the first time a manifest digest
+    (or ``agent.yaml`` content hash) is seen and shared afterwards. Files are
+    only read again when their (mtime, size) changes.
+    """
+
+    def __init__(
+        self,
+        handlers: Mapping[str, NodeFactory] | None = None,
+        *,
+        condition: ConditionFn = evaluate_condition,
+        state_graph: Any = None,
+    ):
+        self.handlers = dict(handlers or {})
+        self.condition = condition
+        self.state_graph = state_graph
+        self._graphs: dict[str, Any] = {}
+        # path -> ((mtime_ns, size), graph key) of the last read.
+        self._files: dict[str, tuple[tuple[int, int], str]] = {}
+        self._lock = threading.Lock()
+
+    def compile(self, adp: ADP) -> Any:
+        return compile_flow(
+            adp, self.handlers, condition=self.condition, state_graph=self.state_graph
+        )
+
+    def cached(self, key: str, load: Callable[[], ADP]) -> Any:
+        """Graph memoized under ``key``; ``load`` runs only on a miss."""
+        with self._lock:
+            graph = self._graphs.get(key)
+        if graph is None:
+            with span("adp.flow.compile", **{"adp.key": key}):
+                graph = self.compile(load())
+            with self._lock:
+                graph = self._graphs.setdefault(key, graph)
+        return graph
+
+    def for_package(self, package: ADPackage) -> Any:
+        digest = package._manifest_desc()["digest"]
+        return self.cached(digest, package.read_adp)
+
+    def for_file(self, path: str | Path) -> Any:
+        path = Path(path)
+        st = path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            seen = self._files.get(str(path))
+            graph = self._graphs.get(seen[1]) if seen and seen[0] == stamp else None
+        if graph is not None:
+            return graph
+        data = path.read_bytes()
+        digest = f"sha256:{hashlib.sha256(data).hexdigest()}"
+        graph = self.cached(digest, lambda: ADP.model_validate(yaml.safe_load(data)))
+        with self._lock:
+            self._files[str(path)] = (stamp, digest)
+        return graph
+
+    def clear(self) -> None:
+        with self._lock:
+            self._graphs.clear()
+            self._files.clear()
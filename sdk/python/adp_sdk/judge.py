@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Self
+from urllib.parse import urlsplit
+
+from .connpool import ConnectionPool
+from .evaluation import Case
+
+_TRANSIENT = (OSError, http.client.HTTPException)
+_RETRY_STATUS = (429, 500, 502, 503, 504)
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+class JudgeError(RuntimeError):
+    """Raised when the judge endpoint fails or returns no usable score."""
+
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, ``burst`` deep."""
+
+    def __init__(self, rate: float, burst: int | None = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until ``tokens`` are available; return the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+@dataclass(frozen=True)
+class JudgeRequest:
+    model: str
+    system_prompt: str
+    prompt: str
+    answer: str
+
+
+def rubric_text(rubric: Any) -> str:
+    if rubric is None:
+        return ""
+    if isinstance(rubric, str):
+        return rubric
+    lines = []
+    for item in rubric:
+        if isinstance(item, str):
+            lines.append(f"- {item}")
+        else:
+            extra = f" (scale {item['scale']})" if item.get("scale") else ""
+            lines.append(f"- {item['criterion']}{extra}")
+    return "\n".join(lines)
+
+
+def build_request(metric: dict, case: Case) -> JudgeRequest:
+    system = metric.get("system_prompt", "You are an evaluator.")
+    rubric = rubric_text(metric.get("rubric"))
+    if rubric:
+        system = f"{system.rstrip()}\n\nRubric:\n{rubric}"
+    system += "\n\nReply with the numeric score only."
+    prompt = case.task.prompt or json.dumps(case.task.input, sort_keys=True)
+    return JudgeRequest(metric["model"], system, prompt, str(case.output))
+
+
+class JudgeClient:
+    """Score ``llm_judge`` metrics against an OpenAI-compatible endpoint.
+
+    Requests go to ``{base_url}/chat/completions`` over a pool of keep-alive
+    connections, each model limited by its own token bucket (``rate``
+    requests per second, ``burst`` deep). 429 and 5xx answers and dropped
+    connections are retried with exponential backoff. Identical
+    (model, prompt, answer) requests share one response, including requests
+    that are still in flight; up to ``cache_size`` scores are kept.
+
+    :meth:`score_many` groups requests by model and system prompt and sends
+    up to ``batch_size`` of them in one chat request, asking for a JSON
+    array of scores; a reply that is not such an array falls back to one
+    request per item. Use :meth:`evaluate` as the runner's ``llm_judge``
+    evaluator (one request per case), or :meth:`score_many` to score a
+    batch directly.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        api_key: str | None = None,
+        api_key_env: str = "OPENAI_API_KEY",
+        max_connections: int = 8,
+        rate: float = 10.0,
+        burst: int | None = None,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 60.0,
+        cache_size: int = 10_000,
+        batch_size: int = 8,
+    ):
+        self.base_url = base_url.rstrip("/")
+        key = api_key if api_key is not None else os.environ.get(api_key_env)
+        self.headers = {"Content-Type": "application/json"}
+        if key:
+            self.headers["Authorization"] = f"Bearer {key}"
+        self.max_connections = max_connections
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.cache_size = cache_size
+        self.batch_size = max(1, batch_size)
+        self.requests_sent = 0
+        self._path = urlsplit(self.base_url).path
+        self._pool = ConnectionPool(self.base_url, max_connections, timeout)
+        self._buckets: dict[str, TokenBucket] = {}
+        self._cache: OrderedDict[JudgeRequest, float] = OrderedDict()
+        self._inflight: dict[JudgeRequest, Future] = {}
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _bucket(self, model: str) -> TokenBucket:
+        with self._lock:
+            if model not in self._buckets:
+                self._buckets[model] = TokenBucket(self.rate, self.burst)
+            return self._buckets[model]
+
+    def _post(self, body: bytes, bucket: TokenBucket) -> dict:
+        attempts = self.retries + 1
+        for attempt in range(attempts):
+            # Retries are requests too and count against the model's rate.
+            bucket.acquire()
+            try:
+                with self._pool.connection() as conn:
+                    conn.request(
+                        "POST",
+                        f"{self._path}/chat/completions",
+                        body=body,
+                        headers=self.headers,
+                    )
+                    resp = conn.getresponse()
+                    data = resp.read()
+                with self._lock:
+                    self.requests_sent += 1
+            except _TRANSIENT:
+                if attempt + 1 == attempts:
+                    raise
+            else:
+                if resp.status == 200:
+                    return json.loads(data)
+                if resp.status not in _RETRY_STATUS or attempt + 1 == attempts:
+                    raise JudgeError(f"judge returned HTTP {resp.status}", resp.status)
+                retry_after = resp.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    time.sleep(float(retry_after))
+                    continue
+            time.sleep(self.backoff * (2**attempt))
+        raise AssertionError("unreachable")
+
+    def _complete(self, model: str, system: str, user: str) -> str:
+        body = {
+            "model": model,
+            "temperature": 0,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+        }
+        reply = self._post(json.dumps(body).encode(), self._bucket(model))
+        return reply["choices"][0]["message"]["content"] or ""
+
+    @staticmethod
+    def _item(request: JudgeRequest) -> str:
+        return f"Question:\n{request.prompt}\n\nAnswer:\n{request.answer}"
+
+    def _call(self, request: JudgeRequest) -> float:
+        content = self._complete(
+            request.model, request.system_prompt, self._item(request)
+        )
+        match = _NUMBER.search(content)
+        if match is None:
+            raise JudgeError(f"no score in judge reply: {content[:80]!r}")
+        return float(match.group())
+
+    def _call_batch(self, requests: list[JudgeRequest]) -> list[float]:
+        """Score requests sharing a model and system prompt in one request."""
+        if len(requests) == 1:
+            return [self._call(requests[0])]
+        items = "\n\n".join(
+            f"Item {i}\n{self._item(r)}" for i, r in enumerate(requests, 1)
+        )
+        first = requests[0]
+        content = self._complete(
+            first.model,
+            first.system_prompt,
+            f"Score each of the following {len(requests)} items separately. "
+            f"Reply with a JSON array of {len(requests)} numbers, one per item "
+            f"in order, and nothing else.\n\n{items}",
+        )
+        try:
+            scores = json.loads(content[content.index("[") : content.rindex("]") + 1])
+        except ValueError:
+            scores = None
+        if (
+            not isinstance(scores, list)
+            or len(scores) != len(requests)
+            or not all(
+                isinstance(v, (int, float)) and not isinstance(v, bool) for v in scores
+            )
+        ):
+            return [self._call(r) for r in requests]
+        return [float(v) for v in scores]
+
+    def _claim(self, request: JudgeRequest) -> tuple[Future, bool]:
+        """Future for ``request``'s score, and whether the caller computes it."""
+        with self._lock:
+            if request in self._cache:
+                self._cache.move_to_end(request)
+                future: Future = Future()
+                future.set_result(self._cache[request])
+                return future, False
+            future = self._inflight.get(request)
+            if future is not None:
+                return future, False
+            future = self._inflight[request] = Future()
+            return future, True
+
+    def _settle(
+        self,
+        request: JudgeRequest,
+        future: Future,
+        value: float | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+        with self._lock:
+            if error is None:
+                self._cache[request] = value
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            self._inflight.pop(request, None)
+
+    def _score_batch(self, requests: list[JudgeRequest]) -> list[float]:
+        claims = [self._claim(r) for r in requests]
+        owned = [
+            (r, f) for r, (f, owner) in zip(requests, claims, strict=True) if owner
+        ]
+        if owned:
+            try:
+                values = self._call_batch([r for r, _ in owned])
+            except BaseException as exc:
+                for request, future in owned:
+                    self._settle(request, future, error=exc)
+                raise
+            for (request, future), value in zip(owned, values, strict=True):
+                self._settle(request, future, value)
+        return [future.result() for future, _ in claims]
+
+    def score(self, request: JudgeRequest) -> float:
+        """Score one request, reusing cached and in-flight identical ones."""
+        return self._score_batch([request])[0]
+
+    def score_many(self, requests: Iterable[JudgeRequest]) -> list[float]:
+        """Score requests in per-model batches, concurrently; order is preserved.
+
+        Duplicates are sent once. Failed batches raise after the rest have
+        finished.
+        """
+        requests = list(requests)
+        groups: dict[tuple[str, str], list[JudgeRequest]] = {}
+        for request in dict.fromkeys(requests):
+            groups.setdefault((request.model, request.system_prompt), []).append(
+                request
+            )
+        batches = [
+            group[i : i + self.batch_size]
+            for group in groups.values()
+            for i in range(0, len(group), self.batch_size)
+        ]
+        with ThreadPoolExecutor(
+            max_workers=self.max_connections, thread_name_prefix="adp-judge"
+        ) as pool:
+            jobs = [pool.submit(self._score_batch, batch) for batch in batches]
+        scores: dict[JudgeRequest, float] = {}
+        for batch, job in zip(batches, jobs, strict=True):
+            scores.update(zip(batch, job.result(), strict=True))
+        return [scores[r] for r in requests]
+
+    def evaluate(self, metric: dict, case: Case) -> float:
+        """:data:`adp_sdk.evaluation.Evaluator` for ``llm_judge`` metrics."""
+        return self.score(build_request(metric, case))
@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import hashlib
+import http.client
+import json
+import os
+import re
+import shutil
+import time
+import urllib.request
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Self
+from urllib.parse import urlencode, urlsplit
+
+from .adpkg import MANIFEST_MEDIA_TYPE, OCI_LAYOUT, ADPackage
+from .connpool import ConnectionPool
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+_READ_SIZE = 64 * 1024
+_REDIRECTS = (301, 302, 303, 307, 308)
+_TRANSIENT = (OSError, http.client.HTTPException)
+_DIGEST = re.compile(r"^sha256:[0-9a-f]{64}$")
+
+
+def _blob_descriptors(manifest: dict) -> list[dict]:
+    """The config and layer descriptors of ``manifest``, one per digest.
+
+    Digests become blob file names, so anything but ``sha256:<hex>`` is
+    rejected before a path is built from it.
+    """
+    seen: dict[str, dict] = {}
+    for desc in [manifest["config"], *manifest["layers"]]:
+        digest = desc.get("digest")
+        if not isinstance(digest, str) or not _DIGEST.match(digest):
+            raise ValueError(f"invalid blob digest in manifest: {digest!r}")
+        seen.setdefault(digest, desc)
+    return list(seen.values())
+
+
+class RegistryError(RuntimeError):
+    """Raised when the registry answers with an unexpected status."""
+
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class TransferResult:
+    manifest_digest: str = ""
+    transferred: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    bytes_transferred: int = 0
+
+
+class RegistryClient:
+    """Push and pull ADPKG layouts over the OCI distribution API.
+
+    Blobs are transferred concurrently over a pool of keep-alive connections,
+    in ``chunk_size`` pieces. Uploads skip blobs the registry already has
+    (``HEAD``), and both directions resume from the last acknowledged byte
+    after a dropped connection. Digests are verified while streaming. Extra
+    ``headers`` (e.g. a bearer token) are sent with every request.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        max_connections: int = 4,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        retries: int = 3,
+        backoff: float = 0.2,
+        timeout: float = 60.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.headers = dict(headers or {})
+        self.max_connections = max_connections
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.backoff = backoff
+        self._pool = ConnectionPool(self.base_url, max_connections, timeout)
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @staticmethod
+    def _target(location: str) -> str:
+        parts = urlsplit(location)
+        if parts.scheme:
+            return parts.path + (f"?{parts.query}" if parts.query else "")
+        return location
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        retries: int | None = None,
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        attempts = (self.retries if retries is None else retries) + 1
+        merged = {**self.headers, **(headers or {})}
+        for attempt in range(attempts):
+            try:
+                with self._pool.connection() as conn:
+                    conn.request(method, self._target(path), body=body, headers=merged)
+                    resp = conn.getresponse()
+                    data = resp.read()
+            except _TRANSIENT:
+                if attempt + 1 == attempts:
+                    raise
+            else:
+                if resp.status < 500 or attempt + 1 == attempts:
+                    return resp.status, resp.headers, data
+            time.sleep(self.backoff * (2**attempt))
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def _expect(status: int, expected: tuple[int, ...], what: str) -> None:
+        if status not in expected:
+            raise RegistryError(f"{what}: unexpected HTTP {status}", status)
+
+    # Upload -------------------------------------------------------------
+
+    def _upload_offset(self, location: str) -> tuple[int, str]:
+        status, headers, _ = self._request("GET", location)
+        self._expect(status, (204,), "upload status")
+        location = headers.get("Location", location)
+        received = headers.get("Range")
+        if not received:
+            return 0, location
+        start, _, end = received.partition("-")
+        if start != "0" or not end.isdigit():
+            raise RegistryError(f"upload status: bad Range {received!r}")
+        # Registries report an empty session as 0-0 as well; resume from the
+        # start rather than skip a byte that was never received.
+        return (int(end) + 1 if int(end) else 0), location
+
+    def _upload_blob(self, repo: str, path: Path, digest: str, size: int) -> bool:
+        status, _, _ = self._request("HEAD", f"/v2/{repo}/blobs/{digest}")
+        if status == 200:
+            return False
+        status, headers, _ = self._request("POST", f"/v2/{repo}/blobs/uploads/")
+        self._expect(status, (202,), f"start upload of {digest}")
+        location = headers["Location"]
+        offset = 0
+        failures = 0
+        with path.open("rb") as f:
+            while offset < size:
+                f.seek(offset)
+                chunk = f.read(self.chunk_size)
+                chunk_headers = {
+                    "Content-Type": "application/octet-stream",
+                    "Content-Range": f"{offset}-{offset + len(chunk) - 1}",
+                    "Content-Length": str(len(chunk)),
+                }
+                try:
+                    status, headers, _ = self._request(
+                        "PATCH", location, body=chunk, headers=chunk_headers, retries=0
+                    )
+                    self._expect(status, (202,), f"upload chunk of {digest}")
+                except (*_TRANSIENT, RegistryError):
+                    failures += 1
+                    if failures > self.retries:
+                        raise
+                    time.sleep(self.backoff * (2 ** (failures - 1)))
+                    offset, location = self._upload_offset(location)
+                    continue
+                location = headers.get("Location", location)
+                offset += len(chunk)
+        sep = "&" if "?" in location else "?"
+        status, _, _ = self._request(
+            "PUT",
+            f"{location}{sep}{urlencode({'digest': digest})}",
+            headers={"Content-Length": "0"},
+        )
+        self._expect(status, (201,), f"finish upload of {digest}")
+        return True
+
+    def push(
+        self, package: ADPackage, repository: str, reference: str = "latest"
+    ) -> TransferResult:
+        """Upload ``package`` to ``repository`` and tag it as ``reference``."""
+        manifest_digest = package._manifest_desc()["digest"]
+        manifest_bytes = package._blob(manifest_digest).read_bytes()
+        manifest = json.loads(manifest_bytes)
+        descriptors = _blob_descriptors(manifest)
+
+        def upload(desc: dict) -> bool:
+            return self._upload_blob(
+                repository, package._blob(desc["digest"]), desc["digest"], desc["size"]
+            )
+
+        result = TransferResult(manifest_digest=manifest_digest)
+        with ThreadPoolExecutor(max_workers=self.max_connections) as pool:
+            for desc, sent in zip(
+                descriptors, pool.map(upload, descriptors), strict=True
+            ):
+                if sent:
+                    result.transferred.append(desc["digest"])
+                    result.bytes_transferred += desc["size"]
+                else:
+                    result.skipped.append(desc["digest"])
+
+        status, _, _ = self._request(
+            "PUT",
+            f"/v2/{repository}/manifests/{reference}",
+            body=manifest_bytes,
+            headers={"Content-Type": manifest.get("mediaType", MANIFEST_MEDIA_TYPE)},
+        )
+        self._expect(status, (201,), f"push manifest {reference}")
+        return result
+
+    # Download -----------------------------------------------------------
+
+    @contextmanager
+    def _get(self, path: str, headers: dict[str, str]) -> Iterator:
+        merged = {**self.headers, **headers}
+        with self._pool.connection() as conn:
+            conn.request("GET", self._target(path), headers=merged)
+            resp = conn.getresponse()
+            if resp.status in _REDIRECTS:
+                resp.read()
+                # Blob storage often lives on another host; fetch it directly.
+                req = urllib.request.Request(resp.headers["Location"], headers=headers)
+                with urllib.request.urlopen(req, timeout=self._pool.timeout) as other:
+                    yield other
+                return
+            try:
+                yield resp
+            finally:
+                resp.read()
+
+    def _download_blob(self, repo: str, desc: dict, blobs: Path) -> bool:
+        digest, size = desc["digest"], desc["size"]
+        target = ADPackage._blob_path(blobs, digest)
+        if target.exists():
+            return False
+        partial = target.with_name(f"{target.name}.partial")
+        hasher = hashlib.sha256()
+        offset = 0
+        if partial.exists():
+            with partial.open("rb") as f:
+                for block in iter(lambda: f.read(_READ_SIZE), b""):
+                    hasher.update(block)
+                    offset += len(block)
+        failures = 0
+        with partial.open("ab") as out:
+            while offset < size:
+                end = min(offset + self.chunk_size, size) - 1
+                try:
+                    with self._get(
+                        f"/v2/{repo}/blobs/{digest}",
+                        {"Range": f"bytes={offset}-{end}"},
+                    ) as resp:
+                        if resp.status == 200 and offset:
+                            # Range ignored: the full blob follows, start over.
+                            out.truncate(0)
+                            hasher = hashlib.sha256()
+                            offset = 0
+                        elif resp.status not in (200, 206):
+                            raise RegistryError(
+                                f"fetch {digest}: unexpected HTTP {resp.status}",
+                                resp.status,
+                            )
+                        for block in iter(lambda: resp.read(_READ_SIZE), b""):
+                            out.write(block)
+                            hasher.update(block)
+                            offset += len(block)
+                except _TRANSIENT:
+                    failures += 1
+                    if failures > self.retries:
+                        raise
+                    out.flush()
+                    time.sleep(self.backoff * (2 ** (failures - 1)))
+        actual = f"sha256:{hasher.hexdigest()}"
+        if actual != digest or offset != size:
+            partial.unlink()
+            raise ValueError(f"digest mismatch for {digest}: got {actual}")
+        os.replace(partial, target)
+        return True
+
+    @staticmethod
+    def _seed_blob(desc: dict, blobs: Path, seeds: list[Path]) -> bool:
+        """Link (or copy) ``desc`` from a seed layout if one has it intact."""
+        target = ADPackage._blob_path(blobs, desc["digest"])
+        if target.exists():
+            return True
+        for seed in seeds:
+            source = ADPackage._blob_path(seed / "blobs", desc["digest"])
+            if not source.is_file() or ADPackage._hash_file(source) != (
+                desc["digest"],
+                desc["size"],
+            ):
+                continue
+            try:
+                os.link(source, target)
+            except FileExistsError:
+                pass
+            except OSError:
+                partial = target.with_name(f"{target.name}.partial")
+                shutil.copyfile(source, partial)
+                os.replace(partial, target)
+            return True
+        return False
+
+    def pull(
+        self,
+        repository: str,
+        reference: str,
+        dest: str | Path,
+        *,
+        seed: Iterable[str | Path] = (),
+    ) -> TransferResult:
+        """Fetch ``repository:reference`` into an ADPKG layout at ``dest``.
+
+        Blobs already present in ``dest``, or in any ``seed`` layout (such as
+        the previously pulled version), are not downloaded; seeded blobs are
+        hardlinked, or copied across filesystems. For chunked packages only
+        the chunks that changed are transferred.
+        """
+        status, _, manifest_bytes = self._request(
+            "GET",
+            f"/v2/{repository}/manifests/{reference}",
+            headers={"Accept": MANIFEST_MEDIA_TYPE},
+        )
+        self._expect(status, (200,), f"fetch manifest {reference}")
+        manifest_digest, manifest_size = ADPackage._hash_bytes(manifest_bytes)
+        if reference.startswith("sha256:") and reference != manifest_digest:
+            raise ValueError(f"digest mismatch for manifest {reference}")
+
+        out_dir = Path(dest)
+        blobs = out_dir / "blobs"
+        (blobs / "sha256").mkdir(parents=True, exist_ok=True)
+        manifest_path = ADPackage._blob_path(blobs, manifest_digest)
+        manifest_path.write_bytes(manifest_bytes)
+        manifest = json.loads(manifest_bytes)
+        descriptors = _blob_descriptors(manifest)
+
+        seeds = [Path(s) for s in seed]
+
+        def download(desc: dict) -> bool:
+            if self._seed_blob(desc, blobs, seeds):
+                return False
+            return self._download_blob(repository, desc, blobs)
+
+        result = TransferResult(manifest_digest=manifest_digest)
+        with ThreadPoolExecutor(max_workers=self.max_connections) as pool:
+            for desc, fetched in zip(
+                descriptors, pool.map(download, descriptors), strict=True
+            ):
+                if fetched:
+                    result.transferred.append(desc["digest"])
+                    result.bytes_transferred += desc["size"]
+                else:
+                    result.skipped.append(desc["digest"])
+
+        annotations = {"org.opencontainers.image.ref.name": reference}
+        config = json.loads(
+            ADPackage._blob_path(blobs, manifest["config"]["digest"]).read_text()
+        )
+        if "agent_id" in config:
+            annotations["org.opencontainers.image.title"] = config["agent_id"]
+        index = {
+            "schemaVersion": 2,
+            "manifests": [
+                {
+                    "mediaType": manifest.get("mediaType", MANIFEST_MEDIA_TYPE),
+                    "digest": manifest_digest,
+                    "size": manifest_size,
+                    "annotations": annotations,
+                }
+            ],
+        }
+        (out_dir / "index.json").write_text(json.dumps(index, indent=2))
+        (out_dir / "oci-layout").write_text(json.dumps(OCI_LAYOUT))
+        return result
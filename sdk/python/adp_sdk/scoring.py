@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from .evaluation import CaseResult
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "adp_sdk.scoring requires numpy; "
+            "install it with 'pip install adp-sdk[scoring]'"
+        )
+
+
+@dataclass
+class SuiteScore:
+    score: float
+    passed: bool
+    metrics: dict[str, float] = field(default_factory=dict)
+    cases: int = 0
+
+
+class ResultTable:
+    """Metric results of one suite in columnar form.
+
+    ``scores`` is a ``(tasks, metrics)`` float array with one column per metric
+    id; ``present`` marks which cells were evaluated. Failed cases are stored
+    as NaN: they count as evaluated but never pass.
+    """
+
+    def __init__(
+        self,
+        metric_ids: Sequence[str],
+        task_ids: Sequence[str],
+        scores: Any,
+        present: Any | None = None,
+        tags: Mapping[str, Iterable[str]] | None = None,
+    ):
+        _require_numpy()
+        self.metric_ids = list(metric_ids)
+        self.task_ids = list(task_ids)
+        self.scores = np.asarray(scores, dtype=np.float64)
+        if self.scores.shape != (len(self.task_ids), len(self.metric_ids)):
+            raise ValueError(
+                f"scores shape {self.scores.shape} does not match "
+                f"{len(self.task_ids)} tasks x {len(self.metric_ids)} metrics"
+            )
+        if present is None:
+            present = np.ones(self.scores.shape, dtype=bool)
+        self.present = np.asarray(present, dtype=bool)
+        self.tags = {k: list(v) for k, v in (tags or {}).items()}
+
+    @classmethod
+    def from_columns(
+        cls,
+        columns: Mapping[str, Any],
+        task_ids: Sequence[str] | None = None,
+        tags: Mapping[str, Iterable[str]] | None = None,
+    ) -> ResultTable:
+        """Build from ``{metric_id: array}`` columns of equal length."""
+        _require_numpy()
+        metric_ids = list(columns)
+        scores = np.column_stack([np.asarray(columns[m], float) for m in metric_ids])
+        if task_ids is None:
+            task_ids = [str(i) for i in range(scores.shape[0])]
+        return cls(metric_ids, task_ids, scores, None, tags)
+
+    @classmethod
+    def from_cases(
+        cls,
+        cases: Iterable[CaseResult],
+        tags: Mapping[str, Iterable[str]] | None = None,
+    ) -> ResultTable:
+        """Pivot runner :class:`~adp_sdk.evaluation.CaseResult` rows."""
+        _require_numpy()
+        metric_index: dict[str, int] = {}
+        task_index: dict[str, int] = {}
+        rows, cols, values = [], [], []
+        for case in cases:
+            rows.append(task_index.setdefault(case.task, len(task_index)))
+            cols.append(metric_index.setdefault(case.metric, len(metric_index)))
+            values.append(np.nan if case.error else case.score)
+        shape = (len(task_index), len(metric_index))
+        scores = np.full(shape, np.nan)
+        present = np.zeros(shape, dtype=bool)
+        scores[rows, cols] = values
+        present[rows, cols] = True
+        return cls(list(metric_index), list(task_index), scores, present, tags)
+
+    def column(self, metric_id: str) -> Any:
+        return self.scores[:, self.metric_ids.index(metric_id)]
+
+    def _columns_for(self, suite: dict) -> Any:
+        """Column index per suite metric; -1 for metrics with no results."""
+        index = {m: i for i, m in enumerate(self.metric_ids)}
+        return [index.get(m["id"], -1) for m in suite["metrics"]]
+
+
+def passed_matrix(suite: dict, table: ResultTable) -> tuple[Any, Any, Any]:
+    """Pass flags, present mask and scores, with columns in suite order.
+
+    Mirrors :func:`adp_sdk.evaluation.case_passed`: numeric thresholds are
+    ``score >= threshold``, boolean or missing thresholds test truthiness.
+    """
+    _require_numpy()
+    cols = table._columns_for(suite)
+    n = len(table.task_ids)
+    scores = np.full((n, len(cols)), np.nan)
+    present = np.zeros((n, len(cols)), dtype=bool)
+    for j, col in enumerate(cols):
+        if col >= 0:
+            scores[:, j] = table.scores[:, col]
+            present[:, j] = table.present[:, col]
+
+    thresholds = np.array(
+        [
+            t if isinstance(t, (int, float)) and not isinstance(t, bool) else np.nan
+            for t in (m.get("threshold") for m in suite["metrics"])
+        ]
+    )
+    numeric = ~np.isnan(thresholds)
+    with np.errstate(invalid="ignore"):
+        passed = np.where(
+            numeric, scores >= np.where(numeric, thresholds, 0), scores != 0
+        )
+    passed &= present & ~np.isnan(scores)
+    return passed, present, scores
+
+
+def _metric_values(suite: dict, passed: Any, present: Any, scores: Any, groups=None):
+    """Per-metric value (pass rate or mean score), optionally per group.
+
+    ``groups`` is ``(rows, inverse, count)``: row ``rows[k]`` belongs to group
+    ``inverse[k]``. Returns a ``(groups, metrics)`` array, or ``(metrics,)``.
+    """
+    has_threshold = np.array([m.get("threshold") is not None for m in suite["metrics"]])
+    numer_src = np.where(has_threshold, passed, np.nan_to_num(scores) * present)
+    if groups is None:
+        numer = numer_src.sum(axis=0)
+        denom = present.sum(axis=0)
+    else:
+        rows, inverse, count = groups
+        numer = np.empty((count, numer_src.shape[1]))
+        denom = np.empty_like(numer)
+        for j in range(numer_src.shape[1]):
+            numer[:, j] = np.bincount(inverse, numer_src[rows, j], minlength=count)
+            denom[:, j] = np.bincount(inverse, present[rows, j], minlength=count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denom > 0, numer / np.where(denom > 0, denom, 1), 0.0)
+
+
+def combine_values(scoring: dict, metric_ids: Sequence[str], values: Any) -> Any:
+    """Vectorized ``scoring.combine`` over the last axis of ``values``."""
+    _require_numpy()
+    method = scoring.get("combine", "average")
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape[-1] == 0:
+        return np.zeros(values.shape[:-1])
+    if method == "average":
+        return values.mean(axis=-1)
+    if method == "weighted_average":
+        weights = scoring.get("weights") or {}
+        w = np.array([weights.get(m, 1.0) for m in metric_ids], dtype=np.float64)
+        total = w.sum()
+        return values @ w / total if total else np.zeros(values.shape[:-1])
+    if method == "sum":
+        return values.sum(axis=-1)
+    if method == "boolean":
+        return (values >= 1.0).all(axis=-1).astype(np.float64)
+    raise ValueError(f"unknown scoring.combine {method!r}")
+
+
+def _decide(suite: dict, scores: Any, all_passed: Any) -> Any:
+    threshold = suite.get("promotion_threshold")
+    if threshold is None:
+        return all_passed
+    return scores >= threshold
+
+
+def score_suite(suite: dict, table: ResultTable) -> SuiteScore:
+    """Combined score and promotion decision for ``suite`` over ``table``."""
+    passed, present, scores = passed_matrix(suite, table)
+    metric_ids = [m["id"] for m in suite["metrics"]]
+    values = _metric_values(suite, passed, present, scores)
+    score = combine_values(suite.get("scoring") or {}, metric_ids, values)
+    all_passed = bool((passed | ~present).all())
+    return SuiteScore(
+        float(score),
+        bool(_decide(suite, score, all_passed)),
+        dict(zip(metric_ids, values.tolist(), strict=True)),
+        int(present.sum()),
+    )
+
+
+def score_slices(
+    suite: dict, table: ResultTable, by: str | Mapping[str, str] = "tag"
+) -> dict[str, SuiteScore]:
+    """Score every slice of ``table`` in one pass.
+
+    ``by`` is ``"tag"`` (a task appears in each of its tags' slices),
+    ``"task"`` (one slice per task) or an explicit ``{task_id: label}`` map.
+    """
+    passed, present, scores = passed_matrix(suite, table)
+    if by == "task":
+        pairs = [(i, t) for i, t in enumerate(table.task_ids)]
+    elif by == "tag":
+        pairs = [
+            (i, tag)
+            for i, t in enumerate(table.task_ids)
+            for tag in table.tags.get(t, ())
+        ]
+    else:
+        pairs = [
+            (i, by[t])
+            for i, t in enumerate(table.task_ids)
+            if t in by  # type: ignore[index]
+        ]
+    if not pairs:
+        return {}
+    rows = np.fromiter((p[0] for p in pairs), dtype=np.intp, count=len(pairs))
+    labels, inverse = np.unique(np.array([p[1] for p in pairs]), return_inverse=True)
+    count = len(labels)
+
+    metric_ids = [m["id"] for m in suite["metrics"]]
+    values = _metric_values(suite, passed, present, scores, (rows, inverse, count))
+    combined = combine_values(suite.get("scoring") or {}, metric_ids, values)
+    failures = np.bincount(
+        inverse, (present[rows] & ~passed[rows]).sum(axis=1), minlength=count
+    )
+    cases = np.bincount(inverse, present[rows].sum(axis=1), minlength=count)
+    decisions = _decide(suite, combined, failures == 0)
+    return {
+        str(label): SuiteScore(
+            float(combined[g]),
+            bool(decisions[g]),
+            dict(zip(metric_ids, values[g].tolist(), strict=True)),
+            int(cases[g]),
+        )
+        for g, label in enumerate(labels)
+    }
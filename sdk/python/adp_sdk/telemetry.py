@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+DEFAULT_COMPRESSION = 200
+DEFAULT_SHARD_BYTES = 64 * 1024 * 1024
+_QUANTILE_METRIC = re.compile(r"^p(\d{1,2}(?:\.\d+)?)_(.+)$")
+
+
+class TDigest:
+    """Mergeable quantile sketch (merging t-digest).
+
+    Memory is bounded by roughly ``compression`` centroids plus an insert
+    buffer, whatever the number of values. Accuracy is best in the tails,
+    which is where latency percentiles live. Digests built over separate
+    shards combine with :meth:`merge`.
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means: list[float] = []
+        self.weights: list[float] = []
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: list[float] = []
+        self._buffer_size = compression * 5
+
+    def add(self, value: float) -> None:
+        self._buffer.append(value)
+        if len(self._buffer) >= self._buffer_size:
+            self._flush()
+
+    def update(self, values: Iterable[float]) -> TDigest:
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: TDigest) -> TDigest:
+        """Fold ``other`` into this digest and return self."""
+        other._flush()
+        self._flush(list(zip(other.means, other.weights, strict=True)))
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inv(self, k: float) -> float:
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def _flush(self, centroids: list[tuple[float, float]] | None = None) -> None:
+        items = list(zip(self.means, self.weights, strict=True))
+        if self._buffer:
+            self.min = min(self.min, min(self._buffer))
+            self.max = max(self.max, max(self._buffer))
+            items.extend((v, 1.0) for v in self._buffer)
+            self._buffer = []
+        if centroids:
+            items.extend(centroids)
+        if len(items) == len(self.means) and not centroids:
+            return
+        items.sort(key=lambda c: c[0])
+        total = sum(w for _, w in items)
+        means: list[float] = []
+        weights: list[float] = []
+        q0 = 0.0
+        limit = self._k_inv(self._k(q0) + 1)
+        mean, weight = items[0]
+        for next_mean, next_weight in items[1:]:
+            if q0 + (weight + next_weight) / total <= limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                q0 += weight / total
+                limit = self._k_inv(self._k(q0) + 1)
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+        self.means, self.weights, self.count = means, weights, total
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile (0..1); NaN for an empty digest."""
+        self._flush()
+        if not self.means:
+            return math.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        target = q * self.count
+        centers = []
+        cumulative = 0.0
+        for weight in self.weights:
+            centers.append(cumulative + weight / 2)
+            cumulative += weight
+        i = bisect_left(centers, target)
+        if i == 0:
+            lo_rank, lo, hi_rank, hi = 0.0, self.min, centers[0], self.means[0]
+        elif i == len(centers):
+            lo_rank, lo = centers[-1], self.means[-1]
+            hi_rank, hi = self.count, self.max
+        else:
+            lo_rank, lo = centers[i - 1], self.means[i - 1]
+            hi_rank, hi = centers[i], self.means[i]
+        if hi_rank == lo_rank:
+            return lo
+        return lo + (hi - lo) * (target - lo_rank) / (hi_rank - lo_rank)
+
+    def to_dict(self) -> dict:
+        self._flush()
+        return {
+            "compression": self.compression,
+            "means": self.means,
+            "weights": self.weights,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> TDigest:
+        digest = cls(data["compression"])
+        digest.means = list(data["means"])
+        digest.weights = list(data["weights"])
+        digest.count = sum(digest.weights)
+        digest.min, digest.max = data["min"], data["max"]
+        return digest
+
+
+def _extract(record: Any, field: str) -> float | None:
+    for part in field.split("."):
+        if not isinstance(record, dict) or part not in record:
+            return None
+        record = record[part]
+    if isinstance(record, bool) or not isinstance(record, (int, float)):
+        return None
+    return float(record)
+
+
+def iter_values(
+    path: str | Path, field: str, start: int = 0, end: int | None = None
+) -> Iterator[float]:
+    """Yield ``field`` from each JSONL record starting in ``[start, end)``.
+
+    The file is memory-mapped, so only the pages being parsed are resident.
+    ``field`` is a dotted path; records without a numeric value are skipped.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if size == 0 or start >= end:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = start
+            if start > 0:
+                # The line straddling ``start`` belongs to the previous shard.
+                newline = data.find(b"\n", start - 1)
+                pos = size if newline < 0 else newline + 1
+            while pos < end:
+                newline = data.find(b"\n", pos)
+                stop = size if newline < 0 else newline
+                line = data[pos:stop].strip()
+                pos = stop + 1
+                if not line:
+                    continue
+                try:
+                    value = _extract(json.loads(line), field)
+                except ValueError:
+                    continue
+                if value is not None:
+                    yield value
+
+
+def shard_ranges(path: str | Path, shard_bytes: int) -> list[tuple[int, int]]:
+    size = Path(path).stat().st_size
+    return [(s, min(s + shard_bytes, size)) for s in range(0, size, shard_bytes)]
+
+
+def sketch_range(path: str, field: str, start: int, end: int, compression: int) -> dict:
+    """Sketch one shard; returns :meth:`TDigest.to_dict` so it pickles small."""
+    digest = TDigest(compression).update(iter_values(path, field, start, end))
+    return digest.to_dict()
+
+
+def sketch_files(
+    paths: Iterable[str | Path],
+    field: str,
+    *,
+    compression: int = DEFAULT_COMPRESSION,
+    shard_bytes: int = DEFAULT_SHARD_BYTES,
+    executor: Executor | None = None,
+    workers: int | None = None,
+) -> TDigest:
+    """Sketch ``field`` over JSONL trace files, one job per byte shard.
+
+    Shards run on ``executor`` (default: a process pool of ``workers``) and
+    their digests are merged, so memory stays bounded for any input size.
+    """
+    jobs = [
+        (str(path), field, start, end, compression)
+        for path in paths
+        for start, end in shard_ranges(path, shard_bytes)
+    ]
+    result = TDigest(compression)
+    if not jobs:
+        return result
+    if len(jobs) == 1 and executor is None:
+        return result.merge(TDigest.from_dict(sketch_range(*jobs[0])))
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(sketch_range, *job) for job in jobs]
+        for future in futures:
+            result.merge(TDigest.from_dict(future.result()))
+    finally:
+        if executor is None:
+            pool.shutdown()
+    return result
+
+
+def parse_quantile_metric(name: str) -> tuple[float, str]:
+    """``"p95_latency_ms"`` -> ``(0.95, "latency_ms")``."""
+    match = _QUANTILE_METRIC.match(name)
+    if not match:
+        raise ValueError(f"not a quantile metric: {name!r}")
+    return float(match.group(1)) / 100, match.group(2)
+
+
+class TelemetryEvaluator:
+    """``telemetry`` evaluator backed by trace exports instead of live runs.
+
+    For a metric such as ``p95_latency_ms`` the 0.95 quantile of ``field``
+    (default: the metric's unit part, ``latency_ms``; override per metric via
+    ``fields``) is computed once over ``paths`` and compared with ``max_ms``.
+    The verdict is the score, so a metric ``threshold`` applies to it as for
+    any pass/fail metric. Every task of the suite gets the same verdict. The
+    computed quantiles are kept in ``values``.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str | Path],
+        *,
+        fields: dict[str, str] | None = None,
+        **sketch_options: Any,
+    ):
+        self.paths = [Path(p) for p in paths]
+        self.fields = dict(fields or {})
+        self.sketch_options = sketch_options
+        self.values: dict[str, float] = {}
+        self._digests: dict[str, TDigest] = {}
+        self._lock = threading.Lock()
+
+    def digest(self, field: str) -> TDigest:
+        with self._lock:
+            if field not in self._digests:
+                self._digests[field] = sketch_files(
+                    self.paths, field, **self.sketch_options
+                )
+            return self._digests[field]
+
+    def value(self, metric: dict) -> float:
+        name = metric.get("metric") or (metric.get("telemetry") or {}).get("metric")
+        if not name:
+            raise ValueError(f"telemetry metric {metric['id']!r} names no metric")
+        q, unit = parse_quantile_metric(name)
+        field = self.fields.get(name, unit)
+        value = self.digest(field).quantile(q)
+        self.values[metric["id"]] = value
+        return value
+
+    def __call__(self, metric: dict, case: Any) -> bool:
+        value = self.value(metric)
+        limit = metric.get("max_ms")
+        if limit is None or isinstance(limit, bool):
+            raise ValueError(f"telemetry metric {metric['id']!r} has no max_ms")
+        return not math.isnan(value) and value <= limit
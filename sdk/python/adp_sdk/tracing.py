@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import contextvars
+import time
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
+from typing import Any, Protocol, Self
+
+
+class Span(Protocol):
+    def set_attribute(self, key: str, value: Any) -> None: ...
+
+
+class Tracer(Protocol):
+    """Anything that can open a span context; OpenTelemetry tracers qualify
+    through :class:`OpenTelemetryTracer`."""
+
+    def span(
+        self, name: str, attributes: dict[str, Any]
+    ) -> AbstractContextManager[Span]: ...
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+_tracer: Tracer | None = None
+
+
+def set_tracer(tracer: Tracer | None) -> None:
+    """Install ``tracer`` for all SDK phases; ``None`` disables tracing."""
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Tracer | None:
+    return _tracer
+
+
+def span(name: str, **attributes: Any) -> AbstractContextManager[Span]:
+    """Open a span for an SDK phase.
+
+    With no tracer installed this returns a shared no-op context, so
+    instrumented code pays one global lookup and nothing else.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, attributes)
+
+
+@dataclass
+class SpanRecord:
+    name: str
+    parent: str | None
+    start: float
+    seconds: float = 0.0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+_current: contextvars.ContextVar[SpanRecord | None] = contextvars.ContextVar(
+    "adp_sdk_span", default=None
+)
+
+
+class _RecordingSpan:
+    def __init__(self, tracer: CallbackTracer, name: str, attributes: dict):
+        parent = _current.get()
+        self.tracer = tracer
+        self.record = SpanRecord(name, parent.name if parent else None, 0.0)
+        self.record.attributes.update(attributes)
+        self._token: contextvars.Token | None = None
+
+    def __enter__(self) -> Self:
+        self._token = _current.set(self.record)
+        self.record.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.record.seconds = time.perf_counter() - self.record.start
+        if exc_type is not None:
+            self.record.error = exc_type.__name__
+        _current.reset(self._token)
+        self.tracer.callback(self.record)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.record.attributes[key] = value
+
+
+class CallbackTracer:
+    """Times each span and hands the finished :class:`SpanRecord` to ``callback``."""
+
+    def __init__(self, callback: Callable[[SpanRecord], None]):
+        self.callback = callback
+
+    def span(self, name: str, attributes: dict[str, Any]) -> _RecordingSpan:
+        return _RecordingSpan(self, name, attributes)
+
+
+class RecordingTracer(CallbackTracer):
+    """Keeps every finished span in ``records``; handy for tests and reports."""
+
+    def __init__(self) -> None:
+        self.records: list[SpanRecord] = []
+        super().__init__(self.records.append)
+
+    def totals(self) -> dict[str, float]:
+        """Total seconds per span name."""
+        out: dict[str, float] = {}
+        for record in self.records:
+            out[record.name] = out.get(record.name, 0.0) + record.seconds
+        return out
+
+
+class OpenTelemetryTracer:
+    """Adapter for an OpenTelemetry-style tracer.
+
+    Wraps any object with ``start_as_current_span(name, attributes=...)``,
+    e.g. ``opentelemetry.trace.get_tracer("adp_sdk")``; the SDK does not
+    import OpenTelemetry itself.
+    """
+
+    def __init__(self, tracer: Any):
+        self.tracer = tracer
+
+    def span(
+        self, name: str, attributes: dict[str, Any]
+    ) -> AbstractContextManager[Span]:
+        return self.tracer.start_as_current_span(name, attributes=attributes)
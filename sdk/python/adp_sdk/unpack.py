@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO
+
+# Per-destination record of what a previous unpack wrote, so a redeploy can
+# trust (size, mtime) instead of re-hashing files that have not been touched.
+# It is kept outside the destination tree; see state_path().
+STATE_FILE = ".adpkg-state.json"
+
+# Upper bound on member bytes held in memory while waiting for writers.
+MAX_PENDING_BYTES = 64 * 1024 * 1024
+# Members larger than this are streamed to disk instead of read into memory.
+STREAM_THRESHOLD = 8 * 1024 * 1024
+_COPY_BUFSIZE = 1024 * 1024
+
+
+@dataclass
+class UnpackResult:
+    written: int = 0
+    linked: int = 0
+    skipped: int = 0
+    bytes_written: int = 0
+
+    def merge(self, other: UnpackResult) -> None:
+        self.written += other.written
+        self.linked += other.linked
+        self.skipped += other.skipped
+        self.bytes_written += other.bytes_written
+
+
+def safe_target(dest: Path, name: str) -> Path:
+    """Map a tar member name onto ``dest``, rejecting anything that escapes it."""
+    rel = PurePosixPath(name.replace("\\", "/"))
+    if rel.is_absolute() or ".." in rel.parts or rel.drive:
+        raise ValueError(f"unsafe path in layer: {name!r}")
+    parts = [p for p in rel.parts if p not in ("", ".")]
+    if not parts:
+        raise ValueError(f"unsafe path in layer: {name!r}")
+    target = dest.joinpath(*parts)
+    resolved = target.parent.resolve()
+    if resolved != dest and dest not in resolved.parents:
+        raise ValueError(f"unsafe path in layer: {name!r}")
+    return target
+
+
+def state_path(dest: Path, cache_dir: Path | None = None) -> Path:
+    """Where the unpack state for ``dest`` lives: never inside ``dest``.
+
+    With a cache it is kept under ``cache_dir/state``, keyed by the resolved
+    destination; otherwise it is a hidden file next to ``dest``.
+    """
+    dest = dest.resolve()
+    if cache_dir is not None:
+        key = hashlib.sha256(str(dest).encode()).hexdigest()
+        return Path(cache_dir) / "state" / f"{key}.json"
+    return dest.with_name(f".{dest.name}{STATE_FILE}")
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    else:
+        path.unlink()
+
+
+class _HashingWriter:
+    def __init__(self, fileobj: BinaryIO) -> None:
+        self.fileobj = fileobj
+        self.hasher = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.hasher.update(data)
+        return self.fileobj.write(data)
+
+
+def _digest(data: bytes) -> str:
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+def _hash_path(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return f"sha256:{hasher.hexdigest()}"
+
+
+class _Extractor:
+    def __init__(self, dest: Path, workers: int | None, cache_dir: Path | None) -> None:
+        self.dest = dest
+        self.cache = cache_dir / "sha256" if cache_dir else None
+        self.workers = workers
+        self.state_path = state_path(dest, cache_dir)
+        try:
+            self.state: dict[str, list] = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            self.state = {}
+        self.new_state: dict[str, list] = {}
+
+    def _unchanged(self, rel: str, target: Path, size: int, digest: str) -> bool:
+        try:
+            st = target.stat()
+        except OSError:
+            return False
+        if st.st_size != size or not target.is_file() or target.is_symlink():
+            return False
+        record = self.state.get(rel)
+        if record and record[0] == size and record[1] == st.st_mtime_ns:
+            current = record[2]
+        else:
+            current = _hash_path(target)
+        if current != digest:
+            return False
+        self.new_state[rel] = [size, st.st_mtime_ns, digest]
+        return True
+
+    @staticmethod
+    def _tmp_path(target: Path) -> Path:
+        tmp = target.with_name(f".{target.name}.adpkg-tmp")
+        if tmp.exists():
+            tmp.unlink()
+        return tmp
+
+    def _commit(self, tmp: Path, target: Path, digest: str, mode: int) -> bool:
+        """Move the written ``tmp`` onto ``target``; return True if hardlinked."""
+        os.chmod(tmp, mode)
+        if target.is_symlink() or target.is_dir():
+            _remove(target)
+        if self.cache is None:
+            os.replace(tmp, target)
+            return False
+        cached = self.cache / digest.split(":", 1)[1]
+        if not cached.exists():
+            self.cache.mkdir(parents=True, exist_ok=True)
+            cache_tmp = cached.with_name(f".{cached.name}.{os.getpid()}.tmp")
+            try:
+                os.link(tmp, cache_tmp)
+            except OSError:
+                shutil.copyfile(tmp, cache_tmp)
+                os.chmod(cache_tmp, mode)
+            os.replace(cache_tmp, cached)
+            os.replace(tmp, target)
+            return False
+        os.unlink(tmp)
+        try:
+            os.link(cached, tmp)
+        except OSError:
+            shutil.copyfile(cached, tmp)
+            os.chmod(tmp, mode)
+            os.replace(tmp, target)
+            return False
+        os.replace(tmp, target)
+        return True
+
+    def _finish(
+        self,
+        rel: str,
+        target: Path,
+        tmp: Path,
+        size: int,
+        digest: str,
+        mode: int,
+        check: bool = True,
+    ) -> UnpackResult:
+        result = UnpackResult()
+        if check and self._unchanged(rel, target, size, digest):
+            tmp.unlink()
+            result.skipped = 1
+            return result
+        if self._commit(tmp, target, digest, mode):
+            result.linked = 1
+        else:
+            result.written = 1
+            result.bytes_written = size
+        self.new_state[rel] = [size, target.stat().st_mtime_ns, digest]
+        return result
+
+    def _write(self, rel: str, target: Path, data: bytes, mode: int) -> UnpackResult:
+        digest = _digest(data)
+        if self._unchanged(rel, target, len(data), digest):
+            return UnpackResult(skipped=1)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._tmp_path(target)
+        tmp.write_bytes(data)
+        return self._finish(rel, target, tmp, len(data), digest, mode, check=False)
+
+    def _write_stream(
+        self, rel: str, target: Path, fileobj: BinaryIO, mode: int
+    ) -> UnpackResult:
+        """Copy a large member to disk, hashing as it goes."""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._tmp_path(target)
+        with tmp.open("wb") as out:
+            writer = _HashingWriter(out)
+            shutil.copyfileobj(fileobj, writer, _COPY_BUFSIZE)
+            size = out.tell()
+        digest = f"sha256:{writer.hasher.hexdigest()}"
+        return self._finish(rel, target, tmp, size, digest, mode)
+
+    def _inside(self, path: str | Path) -> bool:
+        real = Path(os.path.realpath(path))
+        return real == self.dest or self.dest in real.parents
+
+    def _link(self, member: tarfile.TarInfo) -> UnpackResult:
+        result = UnpackResult()
+        # Earlier links may have changed what the path resolves to since the
+        # member was first checked, so check again against the disk as it is.
+        target = safe_target(self.dest, member.name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if member.issym():
+            link = PurePosixPath(member.linkname)
+            if link.is_absolute() or not self._inside(target.parent.resolve() / link):
+                raise ValueError(f"unsafe link in layer: {member.name!r}")
+            if target.is_symlink() and os.readlink(target) == member.linkname:
+                result.skipped = 1
+                return result
+            if target.exists() or target.is_symlink():
+                _remove(target)
+            os.symlink(member.linkname, target)
+        else:
+            source = safe_target(self.dest, member.linkname)
+            if not self._inside(source):
+                raise ValueError(f"unsafe link in layer: {member.name!r}")
+            if target.exists() or target.is_symlink():
+                if target.exists() and os.path.samefile(source, target):
+                    result.skipped = 1
+                    return result
+                _remove(target)
+            os.link(source, target, follow_symlinks=False)
+        result.linked = 1
+        return result
+
+    def _sweep_links(self, links: list[tarfile.TarInfo]) -> None:
+        """Remove symlinks that now resolve outside ``dest`` and fail.
+
+        A later link can redirect an earlier one (``d -> "a/b/c/../.."``,
+        then ``a/b/c -> ".."``), so each is checked again once all exist.
+        """
+        escaped = []
+        for member in links:
+            parts = [p for p in PurePosixPath(member.name).parts if p not in ("", ".")]
+            target = self.dest.joinpath(*parts)
+            if not member.issym() or not self._inside(target.parent):
+                continue
+            if target.is_symlink() and not self._inside(target):
+                target.unlink()
+                escaped.append(member.name)
+        if escaped:
+            raise ValueError(f"unsafe link in layer: {escaped[0]!r}")
+
+    def run(self, layers: list[BinaryIO]) -> UnpackResult:
+        result = UnpackResult()
+        links: list[tarfile.TarInfo] = []
+        pending: dict[Future, int] = {}
+        # Latest write per path: a repeated member waits for the earlier one,
+        # so the last occurrence in the stream wins.
+        writes: dict[str, Future] = {}
+        pending_bytes = 0
+
+        def drain(block_until: int) -> None:
+            nonlocal pending_bytes
+            while pending and pending_bytes > block_until:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    pending_bytes -= pending.pop(fut)
+                    result.merge(fut.result())
+
+        def settle(rel: str) -> None:
+            nonlocal pending_bytes
+            fut = writes.pop(rel, None)
+            if fut is not None and fut in pending:
+                pending_bytes -= pending.pop(fut)
+                result.merge(fut.result())
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for fileobj in layers:
+                with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+                    for member in tar:
+                        target = safe_target(self.dest, member.name)
+                        rel = target.relative_to(self.dest).as_posix()
+                        if member.isdir():
+                            target.mkdir(parents=True, exist_ok=True)
+                        elif member.issym() or member.islnk():
+                            links.append(member)
+                        elif member.isreg() and member.size > STREAM_THRESHOLD:
+                            settle(rel)
+                            result.merge(
+                                self._write_stream(
+                                    rel,
+                                    target,
+                                    tar.extractfile(member),
+                                    member.mode & 0o777,
+                                )
+                            )
+                        elif member.isreg():
+                            extracted = tar.extractfile(member)
+                            data = extracted.read() if extracted else b""
+                            settle(rel)
+                            fut = pool.submit(
+                                self._write, rel, target, data, member.mode & 0o777
+                            )
+                            writes[rel] = fut
+                            pending[fut] = len(data)
+                            pending_bytes += len(data)
+                            drain(MAX_PENDING_BYTES)
+                        else:
+                            raise ValueError(
+                                f"unsupported member type in layer: {member.name!r}"
+                            )
+            drain(-1)
+        # Links may point at members written later in the stream.
+        try:
+            for member in links:
+                result.merge(self._link(member))
+        finally:
+            self._sweep_links(links)
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps(self.new_state, sort_keys=True))
+        return result
+
+
+def extract_layers(
+    layers: list[BinaryIO],
+    dest: str | Path,
+    *,
+    workers: int | None = None,
+    cache_dir: str | Path | None = None,
+) -> UnpackResult:
+    """Stream tar layers into ``dest``, skipping files that already match.
+
+    Regular files are read sequentially from each layer and written by a pool
+    of ``workers`` threads. A file whose size and sha256 already match at the
+    destination is left alone. With ``cache_dir``, content is stored once in a
+    content-addressed cache and hardlinked into place, so identical files are
+    shared across destinations; hardlinked files must be treated as read-only.
+    What was written is recorded outside ``dest`` (see :func:`state_path`).
+    A name repeated in the layers takes the content of its last occurrence.
+    """
+    dest_path = Path(dest)
+    dest_path.mkdir(parents=True, exist_ok=True)
+    dest_path = dest_path.resolve()
+    cache = Path(cache_dir).resolve() if cache_dir else None
+    return _Extractor(dest_path, workers, cache).run(layers)
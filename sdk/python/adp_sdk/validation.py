@@ -1,26 +1,26 @@
 from __future__ import annotations
 
 import json
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import List
 
 from jsonschema import Draft202012Validator, RefResolver
 
 from .adp_model import ADP
+from .tracing import span
 
 # repo_root/sdk/python/adp_sdk -> parents[3] == repo root
 SCHEMA_DIR = Path(__file__).resolve().parents[3] / "schemas"
 
 
+@cache
 def _load_schema(name: str) -> dict:
     return json.loads((SCHEMA_DIR / name).read_text())
 
 
-def validate_adp(adp: ADP) -> List[str]:
-    """Validate an ADP model against the JSON Schema.
-
-    Supports both ADP-Minimal (allows empty flow/evaluation) and ADP-Full.
-    """
+@lru_cache(maxsize=1)
+def _schema_store() -> tuple[dict, str, dict]:
+    """Load the ADP schema and its referenced schemas once per process."""
     schema = _load_schema("adp.schema.json")
     base_uri = (SCHEMA_DIR / "adp.schema.json").resolve().as_uri()
     store = {
@@ -34,6 +34,23 @@ def validate_adp(adp: ADP) -> List[str]:
             "evaluation.schema.json"
         ),
     }
+    return schema, base_uri, store
+
+
+def validate_adp(adp: ADP) -> list[str]:
+    """Validate an ADP model against the JSON Schema.
+
+    Supports both ADP-Minimal (allows empty flow/evaluation) and ADP-Full.
+    """
+    with span("adp.validate") as sp:
+        errors = _validate(adp)
+        sp.set_attribute("adp.errors", len(errors))
+    return errors
+
+
+def _validate(adp: ADP) -> list[str]:
+    schema, base_uri, store = _schema_store()
+    # Resolvers keep per-traversal scope state, so build them per call.
     resolver = RefResolver(base_uri=base_uri, referrer=schema, store=store)
     validator = Draft202012Validator(schema, resolver=resolver)
 
@@ -59,6 +76,38 @@ def validate_adp(adp: ADP) -> List[str]:
         validation_data["evaluation"] = {}
 
     # Validate ADP structure (excluding flow/evaluation if minimal)
+    errors = []
+    with span("adp.validate.schema"):
+        errors.extend(
+            _manifest_errors(
+                validator, validation_data, is_minimal_flow, is_minimal_eval
+            )
+        )
+
+    # If flow/evaluation are not empty, validate them against their schemas
+    if not is_minimal_flow:
+        with span("adp.validate.flow"):
+            flow_schema = store[(SCHEMA_DIR / "flow.schema.json").resolve().as_uri()]
+            flow_validator = Draft202012Validator(flow_schema, resolver=resolver)
+            errors.extend(e.message for e in flow_validator.iter_errors(flow_data))
+
+    if not is_minimal_eval:
+        with span("adp.validate.evaluation"):
+            eval_schema = store[
+                (SCHEMA_DIR / "evaluation.schema.json").resolve().as_uri()
+            ]
+            eval_validator = Draft202012Validator(eval_schema, resolver=resolver)
+            errors.extend(e.message for e in eval_validator.iter_errors(eval_data))
+
+    return errors
+
+
+def _manifest_errors(
+    validator: Draft202012Validator,
+    validation_data: dict,
+    is_minimal_flow: bool,
+    is_minimal_eval: bool,
+) -> list[str]:
     errors = []
     for error in validator.iter_errors(validation_data):
         error_path = "/".join(str(p) for p in error.path)
@@ -72,18 +121,4 @@ def validate_adp(adp: ADP) -> List[str]:
         ):
             continue
         errors.append(error.message)
-
-    # If flow/evaluation are not empty, validate them against their schemas
-    if not is_minimal_flow:
-        flow_schema = store[(SCHEMA_DIR / "flow.schema.json").resolve().as_uri()]
-        flow_validator = Draft202012Validator(flow_schema, resolver=resolver)
-        flow_errors = [e.message for e in flow_validator.iter_errors(flow_data)]
-        errors.extend(flow_errors)
-
-    if not is_minimal_eval:
-        eval_schema = store[(SCHEMA_DIR / "evaluation.schema.json").resolve().as_uri()]
-        eval_validator = Draft202012Validator(eval_schema, resolver=resolver)
-        eval_errors = [e.message for e in eval_validator.iter_errors(eval_data)]
-        errors.extend(eval_errors)
-
     return errors
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+import yaml
+
+from .unpack import safe_target
+
+if TYPE_CHECKING:
+    from .adpkg import ADPackage
+
+WHEELHOUSE_MEDIA_TYPE = "application/vnd.adp.wheelhouse.v1+tar"
+WHEELHOUSE_TITLE = "wheelhouse"
+REQUIREMENTS_FILE = "requirements.txt"
+
+
+def source_requirements(src_path: Path) -> list[str]:
+    """``build.dependencies.python`` from ``acs/container.yaml``, if any."""
+    acs_path = src_path / "acs" / "container.yaml"
+    if not acs_path.is_file():
+        return []
+    acs = yaml.safe_load(acs_path.read_text()) or {}
+    deps = ((acs.get("build") or {}).get("dependencies") or {}).get("python") or []
+    return sorted(set(deps))
+
+
+def _pip(python: str | None, *args: str) -> None:
+    cmd = [python or sys.executable, "-m", "pip", *args]
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    if proc.returncode != 0:
+        detail = (proc.stderr or proc.stdout).strip().splitlines()[-5:]
+        raise RuntimeError(f"{' '.join(cmd[:4])} failed: " + " | ".join(detail))
+
+
+def resolve_wheels(
+    requirements: Iterable[str], wheel_dir: str | Path, *, python: str | None = None
+) -> list[Path]:
+    """Resolve ``requirements`` and their dependencies from ``wheel_dir`` only.
+
+    Uses ``pip download --no-index``, so nothing is fetched from the network
+    and a missing wheel is an error. Returns the wheel files, sorted by name.
+    """
+    wheel_dir = Path(wheel_dir).resolve()
+    with tempfile.TemporaryDirectory(prefix="adp-wheels-") as tmp:
+        _pip(
+            python,
+            "download",
+            "--quiet",
+            "--no-index",
+            "--only-binary=:all:",
+            "--find-links",
+            str(wheel_dir),
+            "--dest",
+            tmp,
+            *requirements,
+        )
+        names = sorted(os.listdir(tmp))
+    return [wheel_dir / name for name in names]
+
+
+def _tarinfo(name: str, size: int) -> tarfile.TarInfo:
+    # Fixed metadata so identical inputs always produce identical bytes.
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mode = 0o644
+    info.mtime = 0
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    return info
+
+
+def write_wheelhouse_layer(
+    wheels: Iterable[Path], requirements: Iterable[str], fileobj: BinaryIO
+) -> None:
+    """Write a deterministic ``wheels/`` tar holding the wheels and pins."""
+    with tarfile.open(fileobj=fileobj, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        pins = "".join(f"{r}\n" for r in sorted(set(requirements))).encode()
+        tar.addfile(
+            _tarinfo(f"wheels/{REQUIREMENTS_FILE}", len(pins)), io.BytesIO(pins)
+        )
+        for wheel in sorted(wheels, key=lambda p: p.name):
+            with wheel.open("rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                tar.addfile(_tarinfo(f"wheels/{wheel.name}", size), f)
+
+
+def _extract(layer_path: Path, dest: Path) -> None:
+    with tarfile.open(layer_path, "r") as tar:
+        if hasattr(tarfile, "data_filter"):
+            tar.extractall(dest, filter="data")
+            return
+        # Extraction filters arrived in 3.11.4; check members by hand before.
+        members = tar.getmembers()
+        root = dest.resolve()
+        for member in members:
+            if not (member.isreg() or member.isdir()):
+                raise ValueError(f"unsafe wheelhouse member: {member.name}")
+            safe_target(root, member.name)
+        tar.extractall(dest, members)
+
+
+def install_wheelhouse(
+    package: ADPackage,
+    target: str | Path | None = None,
+    *,
+    cache_dir: str | Path | None = None,
+    python: str | None = None,
+) -> str:
+    """Install the package's bundled dependencies without a package index.
+
+    The wheelhouse layer is extracted (once per digest under ``cache_dir``,
+    so agents with the same dependency set share it) and installed with
+    ``pip install --no-index``, into ``target`` if given. Returns the
+    wheelhouse layer digest.
+    """
+    desc = package._wheelhouse_layer()
+    if desc is None:
+        raise ValueError(f"{package.path} has no {WHEELHOUSE_MEDIA_TYPE} layer")
+    layer_path = package._blob(desc["digest"])
+
+    with tempfile.TemporaryDirectory(prefix="adp-wheelhouse-") as tmp:
+        if cache_dir is None:
+            root = Path(tmp)
+            _extract(layer_path, root)
+        else:
+            root = Path(cache_dir) / desc["digest"].split(":", 1)[1]
+            if not root.is_dir():
+                root.parent.mkdir(parents=True, exist_ok=True)
+                staging = Path(tempfile.mkdtemp(dir=cache_dir, prefix=".staging-"))
+                _extract(layer_path, staging)
+                try:
+                    os.rename(staging, root)
+                except OSError:  # another installer won the race
+                    shutil.rmtree(staging, ignore_errors=True)
+        wheels = root / "wheels"
+        args = [
+            "install",
+            "--quiet",
+            "--no-index",
+            "--find-links",
+            str(wheels),
+            "-r",
+            str(wheels / REQUIREMENTS_FILE),
+        ]
+        if target is not None:
+            args += ["--target", str(target)]
+        _pip(python, *args)
+    return desc["digest"]
@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import importlib
+import inspect
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Self
+
+from .adp_model import ADP, RuntimeEntry
+
+if TYPE_CHECKING:
+    from .adpkg import ADPackage
+
+DEFAULT_MAX_REQUESTS = 1000
+_READY = "ready"
+# Pre-fork workers from a single-threaded server process where available:
+# cheaper than "spawn", and unlike "fork" workers never inherit the
+# caller's threads and held locks.
+DEFAULT_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+# How often a caller waiting for an idle worker checks whether the pool closed.
+_WAIT_POLL = 0.1
+
+
+class WorkerError(RuntimeError):
+    """Raised when the agent raised, or its worker died, during a call."""
+
+
+def entrypoint_spec(entry: RuntimeEntry) -> str:
+    """``module:attr`` for a python runtime entry."""
+    if isinstance(entry.entrypoint, str) and ":" in entry.entrypoint:
+        return entry.entrypoint
+    if entry.module:
+        return f"{entry.module}:main"
+    raise ValueError(f"runtime entry {entry.id!r} has no 'module:attr' entrypoint")
+
+
+def select_entry(adp: ADP, entry_id: str | None = None) -> RuntimeEntry:
+    for entry in adp.runtime.execution:
+        if entry.backend == "python" and entry_id in (None, entry.id):
+            return entry
+    wanted = f" with id {entry_id!r}" if entry_id else ""
+    raise ValueError(f"{adp.id}: no python runtime entry{wanted}")
+
+
+def resolve_entrypoint(spec: str) -> Callable[[Any], Any]:
+    """Import ``module:attr`` and return a one-argument callable.
+
+    Objects with an ``invoke`` method (e.g. compiled LangGraph graphs) are
+    called through it; zero-argument functions ignore the payload.
+    """
+    module_name, _, attr = spec.partition(":")
+    target: Any = importlib.import_module(module_name)
+    for part in attr.split("."):
+        target = getattr(target, part)
+    if hasattr(target, "invoke"):
+        return target.invoke
+    if not callable(target):
+        raise TypeError(f"entrypoint {spec!r} is not callable")
+    try:
+        takes_args = bool(inspect.signature(target).parameters)
+    except (TypeError, ValueError):
+        takes_args = True
+    return target if takes_args else (lambda payload: target())
+
+
+def _worker_main(conn, paths: list[str], spec: str, env: dict, max_requests: int):
+    os.environ.update(env)
+    sys.path[:0] = paths
+    try:
+        handler = resolve_entrypoint(spec)
+    except BaseException:  # noqa: BLE001 - importing agent code may raise anything
+        conn.send((_READY, False, traceback.format_exc()))
+        return
+    conn.send((_READY, True, os.getpid()))
+    served = 0
+    while True:
+        try:
+            payload = conn.recv()
+        except EOFError:
+            return
+        start = time.perf_counter()
+        try:
+            result, ok = handler(payload), True
+        except Exception:  # noqa: BLE001 - agent errors go back to the caller
+            result, ok = traceback.format_exc(), False
+        served += 1
+        recycle = served >= max_requests
+        conn.send((recycle, ok, result, time.perf_counter() - start))
+        if recycle:
+            return
+
+
+@dataclass
+class WorkerHealth:
+    pid: int
+    alive: bool
+    served: int
+    started: float
+
+
+@dataclass
+class PoolHealth:
+    workers: list[WorkerHealth] = field(default_factory=list)
+    requests: int = 0
+    errors: int = 0
+    recycled: int = 0
+    restarts: int = 0
+
+    @property
+    def healthy(self) -> bool:
+        return bool(self.workers) and all(w.alive for w in self.workers)
+
+
+class _Worker:
+    def __init__(self, ctx, args: tuple):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child, *args), daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.served = 0
+        self.started = time.time()
+
+    def wait_ready(self, timeout: float) -> None:
+        if not self.conn.poll(timeout):
+            self.stop()
+            raise WorkerError("worker did not start in time")
+        _, ok, detail = self.conn.recv()
+        if not ok:
+            self.stop()
+            raise WorkerError(f"cannot load entrypoint:\n{detail}")
+
+    def stop(self) -> None:
+        self.conn.close()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+@dataclass
+class _SpawnFailed:
+    """Put in the idle queue in place of a worker that could not be started."""
+
+    error: Exception
+
+
+class WorkerPool:
+    """Serve a packaged python entrypoint from a pool of warm processes.
+
+    The package is unpacked once and ``workers`` processes are started ahead
+    of traffic, each with the entry's ``env`` applied and its ``module:attr``
+    entrypoint already imported. :meth:`call` hands the payload to an idle
+    worker, so concurrent callers are served in parallel. A worker exits
+    after ``max_requests`` calls, and is replaced, like one that dies.
+    Payloads and results must be picklable.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        spec: str,
+        *,
+        env: dict[str, str] | None = None,
+        workers: int = 2,
+        max_requests: int = DEFAULT_MAX_REQUESTS,
+        start_method: str = DEFAULT_START_METHOD,
+        start_timeout: float = 60.0,
+    ):
+        self.root = Path(root).resolve()
+        self.spec = spec
+        self.env = dict(env or {})
+        self.size = workers
+        self.max_requests = max_requests
+        self.start_timeout = start_timeout
+        self._ctx = multiprocessing.get_context(start_method)
+        self._idle: queue.Queue[_Worker | _SpawnFailed] = queue.Queue()
+        self._all: list[_Worker] = []
+        self._lock = threading.Lock()
+        self._stats = PoolHealth()
+        self._tmp: tempfile.TemporaryDirectory | None = None
+        self._closed = False
+
+    @classmethod
+    def from_package(
+        cls,
+        package: ADPackage,
+        *,
+        entry_id: str | None = None,
+        dest: str | Path | None = None,
+        **kwargs: Any,
+    ) -> WorkerPool:
+        """Unpack ``package`` (to a temporary directory unless ``dest``)."""
+        tmp = None
+        if dest is None:
+            tmp = tempfile.TemporaryDirectory(prefix="adp-workers-")
+            dest = tmp.name
+        package.unpack(dest)
+        entry = select_entry(package.read_adp(), entry_id)
+        kwargs.setdefault("env", entry.env)
+        pool = cls(dest, entrypoint_spec(entry), **kwargs)
+        pool._tmp = tmp
+        return pool
+
+    def _paths(self) -> list[str]:
+        paths = [str(self.root)]
+        if (self.root / "src").is_dir():
+            paths.insert(0, str(self.root / "src"))
+        return paths
+
+    def _spawn(self) -> _Worker:
+        return _Worker(
+            self._ctx, (self._paths(), self.spec, self.env, self.max_requests)
+        )
+
+    def start(self) -> Self:
+        """Start all workers in parallel and wait until each is warm."""
+        started = [self._spawn() for _ in range(self.size)]
+        try:
+            for worker in started:
+                worker.wait_ready(self.start_timeout)
+        except BaseException:
+            for worker in started:
+                worker.stop()
+            raise
+        with self._lock:
+            self._all.extend(started)
+        for worker in started:
+            self._idle.put(worker)
+        return self
+
+    def _respawn(self) -> None:
+        """Start a worker and hand it, or the failure, to the idle queue."""
+        try:
+            fresh = self._spawn()
+            fresh.wait_ready(self.start_timeout)
+        except (WorkerError, EOFError, OSError) as exc:
+            self._idle.put(_SpawnFailed(exc))
+            return
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._all.append(fresh)
+        if closed:
+            fresh.stop()
+        else:
+            self._idle.put(fresh)
+
+    def _replace(self, worker: _Worker | None, recycled: bool) -> None:
+        """Retire ``worker`` and start its replacement in the background.
+
+        Callers never wait for the cold start themselves; they pick up the
+        replacement from the idle queue once it is warm.
+        """
+        if worker is not None:
+            worker.stop()
+        with self._lock:
+            if worker in self._all:
+                self._all.remove(worker)
+            if self._closed:
+                return
+            if recycled:
+                self._stats.recycled += 1
+            else:
+                self._stats.restarts += 1
+        threading.Thread(
+            target=self._respawn, name="adp-worker-respawn", daemon=True
+        ).start()
+
+    def _take(self, timeout: float | None) -> _Worker:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._closed:
+                raise RuntimeError("worker pool is closed")
+            wait = _WAIT_POLL
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    raise TimeoutError("no idle worker became available in time")
+            try:
+                item = self._idle.get(timeout=wait)
+            except queue.Empty:
+                continue
+            if isinstance(item, _SpawnFailed):
+                # Keep the slot: try again in the background, fail this call.
+                self._replace(None, recycled=False)
+                raise WorkerError(f"worker failed to start: {item.error}")
+            return item
+
+    def call(self, payload: Any = None, timeout: float | None = None) -> Any:
+        """Run the entrypoint on ``payload`` in a warm worker.
+
+        ``timeout`` bounds both the wait for an idle worker and the call.
+        """
+        start = time.monotonic()
+        worker = self._take(timeout)
+        try:
+            worker.conn.send(payload)
+            if timeout is not None:
+                remaining = max(timeout - (time.monotonic() - start), 0)
+                if not worker.conn.poll(remaining):
+                    raise TimeoutError(f"worker {worker.process.pid} timed out")
+            recycle, ok, result, _ = worker.conn.recv()
+        except (EOFError, OSError, TimeoutError) as exc:
+            if self._closed:
+                raise RuntimeError("worker pool closed during the call") from exc
+            self._replace(worker, recycled=False)
+            with self._lock:
+                self._stats.requests += 1
+                self._stats.errors += 1
+            if isinstance(exc, TimeoutError):
+                raise
+            raise WorkerError(f"worker died: {exc!r}") from exc
+        worker.served += 1
+        with self._lock:
+            self._stats.requests += 1
+            self._stats.errors += not ok
+            closed = self._closed
+        if recycle:
+            self._replace(worker, recycled=True)
+        elif closed:
+            worker.stop()
+        else:
+            self._idle.put(worker)
+        if not ok:
+            raise WorkerError(result)
+        return result
+
+    def health(self) -> PoolHealth:
+        with self._lock:
+            return PoolHealth(
+                [
+                    WorkerHealth(
+                        w.process.pid or 0, w.process.is_alive(), w.served, w.started
+                    )
+                    for w in self._all
+                ],
+                self._stats.requests,
+                self._stats.errors,
+                self._stats.recycled,
+                self._stats.restarts,
+            )
+
+    def measure_cold(self, payload: Any = None) -> float:
+        """Seconds for a fresh interpreter to import the agent and serve once."""
+        start = time.perf_counter()
+        worker = _Worker(
+            multiprocessing.get_context("spawn"),
+            (self._paths(), self.spec, self.env, 1),
+        )
+        try:
+            worker.wait_ready(self.start_timeout)
+            worker.conn.send(payload)
+            worker.conn.recv()
+        finally:
+            worker.stop()
+        return time.perf_counter() - start
+
+    def measure_warm(self, payload: Any = None, samples: int = 5) -> float:
+        """Median seconds per :meth:`call` on the warm pool."""
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            self.call(payload)
+            timings.append(time.perf_counter() - start)
+        return sorted(timings)[len(timings) // 2]
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers = list(self._all)
+            self._all.clear()
+        for worker in workers:
+            worker.stop()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,303 @@
+"""Run the packaging and validation benchmarks.
+
+Usage (from ``sdk/python``)::
+
+    python -m benchmarks.run --profile small --repeat 5
+    python -m benchmarks.run --profile small --save-baseline baseline.json
+    python -m benchmarks.run --profile small --compare baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import http.client
+import http.server
+import json
+import math
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+
+from adp_sdk.adp_model import ADP
+from adp_sdk.adpkg import ADPackage
+from adp_sdk.blobserver import BlobServer
+from adp_sdk.validation import validate_adp
+
+from .synthetic import PROFILES, Workload, make_agent
+
+
+@dataclass
+class CaseResult:
+    name: str
+    samples: int
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    throughput: float
+    unit: str
+    peak_rss_mb: float
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _time(fn: Callable[[], object], repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _case_pack(src: Path, work: Path, repeat: int) -> tuple[list[float], float]:
+    outs = iter(range(repeat))
+
+    def pack() -> None:
+        ADPackage.create_from_directory(src, work / f"oci{next(outs)}")
+
+    samples = _time(pack, repeat)
+    pkg = ADPackage.open(work / "oci0")
+    layer_bytes = pkg._package_layers()[0]["size"]
+    return samples, layer_bytes / (1024 * 1024)
+
+
+def _case_pack_chunked(src: Path, work: Path, repeat: int) -> tuple[list[float], float]:
+    outs = iter(range(repeat))
+
+    def pack() -> None:
+        ADPackage.create_from_directory(src, work / f"oci{next(outs)}", chunked=True)
+
+    samples = _time(pack, repeat)
+    pkg = ADPackage.open(work / "oci0")
+    index = json.loads(pkg._blob(pkg._package_layers()[0]["digest"]).read_text())
+    return samples, index["size"] / (1024 * 1024)
+
+
+def _case_read_adp(src: Path, work: Path, repeat: int) -> tuple[list[float], float]:
+    pkg = ADPackage.create_from_directory(src, work / "oci")
+    return _time(pkg.read_adp, repeat), 1.0
+
+
+def _case_read_adp_lazy(
+    src: Path, work: Path, repeat: int
+) -> tuple[list[float], float]:
+    pkg = ADPackage.create_from_directory(src, work / "oci")
+    return _time(lambda: pkg.read_adp(lazy=True).id, repeat), 1.0
+
+
+def _case_read_config(src: Path, work: Path, repeat: int) -> tuple[list[float], float]:
+    pkg = ADPackage.create_from_directory(src, work / "oci")
+    return _time(pkg.read_config, repeat), 1.0
+
+
+def _case_validate(src: Path, work: Path, repeat: int) -> tuple[list[float], float]:
+    adp = ADP.from_file(src / "adp" / "agent.yaml")
+    validate_adp(adp)  # warm schema caches
+    return _time(lambda: validate_adp(adp), repeat), 1.0
+
+
+def _case_unpack(src: Path, work: Path, repeat: int) -> tuple[list[float], float]:
+    pkg = ADPackage.create_from_directory(src, work / "oci")
+    dest = work / "deploy"
+    pkg.unpack(dest)  # first unpack is cold; measure warm redeploys
+    layer_bytes = pkg._package_layers()[0]["size"]
+    return _time(lambda: pkg.unpack(dest), repeat), layer_bytes / (1024 * 1024)
+
+
+SERVE_CLIENTS = 8
+
+
+def _fetch_concurrently(host: str, port: int, path: str, repeat: int) -> list[float]:
+    """Each sample: SERVE_CLIENTS keep-alive clients fetch ``path`` once."""
+    conns = [http.client.HTTPConnection(host, port) for _ in range(SERVE_CLIENTS)]
+
+    def fetch(conn: http.client.HTTPConnection) -> None:
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        while resp.read(1 << 20):
+            pass
+
+    with ThreadPoolExecutor(SERVE_CLIENTS) as pool:
+        list(pool.map(fetch, conns))  # connect and warm the page cache
+        samples = _time(lambda: list(pool.map(fetch, conns)), repeat)
+    for conn in conns:
+        conn.close()
+    return samples
+
+
+def _case_serve_sendfile(
+    src: Path, work: Path, repeat: int
+) -> tuple[list[float], float]:
+    pkg = ADPackage.create_from_directory(src, work / "oci")
+    layer = pkg._package_layers()[0]
+    with BlobServer(pkg.path) as server:
+        samples = _fetch_concurrently(
+            server.host, server.port, f"/v2/agent/blobs/{layer['digest']}", repeat
+        )
+    return samples, SERVE_CLIENTS * layer["size"] / (1024 * 1024)
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+def _case_serve_buffered(
+    src: Path, work: Path, repeat: int
+) -> tuple[list[float], float]:
+    """Baseline for ``serve_sendfile``: stdlib threaded server, read/write copy."""
+    pkg = ADPackage.create_from_directory(src, work / "oci")
+    layer = pkg._package_layers()[0]
+    handler = functools.partial(_QuietHandler, directory=str(pkg.path))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        path = "/blobs/" + layer["digest"].replace(":", "/")
+        samples = _fetch_concurrently(*server.server_address, path, repeat)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return samples, SERVE_CLIENTS * layer["size"] / (1024 * 1024)
+
+
+# name -> (runner, throughput unit)
+CASES = {
+    "pack": (_case_pack, "MB/s"),
+    "pack_chunked": (_case_pack_chunked, "MB/s"),
+    "read_adp": (_case_read_adp, "manifests/s"),
+    "read_adp_lazy": (_case_read_adp_lazy, "manifests/s"),
+    "read_config": (_case_read_config, "manifests/s"),
+    "validate": (_case_validate, "manifests/s"),
+    "unpack_warm": (_case_unpack, "MB/s"),
+    "serve_sendfile": (_case_serve_sendfile, "MB/s"),
+    "serve_buffered": (_case_serve_buffered, "MB/s"),
+}
+
+
+def _run_case(name: str, src: str, repeat: int) -> CaseResult:
+    runner, unit = CASES[name]
+    with tempfile.TemporaryDirectory(prefix=f"adp-bench-{name}-") as work:
+        samples, units_per_run = runner(Path(src), Path(work), repeat)
+    mean = sum(samples) / len(samples)
+    return CaseResult(
+        name=name,
+        samples=len(samples),
+        p50_ms=percentile(samples, 50) * 1000,
+        p90_ms=percentile(samples, 90) * 1000,
+        p99_ms=percentile(samples, 99) * 1000,
+        throughput=units_per_run / mean if mean else 0.0,
+        unit=unit,
+        peak_rss_mb=_peak_rss_mb(),
+    )
+
+
+def run(
+    workload: Workload, repeat: int, cases: list[str] | None = None
+) -> list[CaseResult]:
+    """Generate ``workload`` once and run each case in a fresh process.
+
+    A fresh process per case keeps peak RSS attributable to that case.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix="adp-bench-src-") as tmp:
+        src = make_agent(Path(tmp) / "agent", workload)
+        for name in cases or list(CASES):
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                results.append(pool.submit(_run_case, name, str(src), repeat).result())
+    return results
+
+
+def compare(results: list[CaseResult], baseline: dict, tolerance: float) -> list[str]:
+    """Return one message per case whose p50 regressed beyond ``tolerance``."""
+    previous = {c["name"]: c for c in baseline.get("cases", [])}
+    regressions = []
+    for result in results:
+        before = previous.get(result.name)
+        if not before or not before["p50_ms"]:
+            continue
+        ratio = result.p50_ms / before["p50_ms"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{result.name}: p50 {result.p50_ms:.2f}ms vs "
+                f"{before['p50_ms']:.2f}ms baseline ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--case", action="append", choices=sorted(CASES))
+    parser.add_argument("--files", type=int, help="override source file count")
+    parser.add_argument("--layer-mb", type=int, help="override layer size (MiB)")
+    parser.add_argument("--flow-nodes", type=int, help="override flow node count")
+    parser.add_argument("--eval-suites", type=int, help="override suite count")
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    workload = PROFILES[args.profile]
+    overrides = {
+        "files": args.files,
+        "layer_bytes": args.layer_mb << 20 if args.layer_mb else None,
+        "flow_nodes": args.flow_nodes,
+        "eval_suites": args.eval_suites,
+    }
+    workload = replace(workload, **{k: v for k, v in overrides.items() if v})
+
+    results = run(workload, args.repeat, args.case)
+    print(
+        f"{'case':<14} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} "
+        f"{'throughput':>21} {'peak RSS':>10}"
+    )
+    for r in results:
+        print(
+            f"{r.name:<14} {r.p50_ms:>10.2f} {r.p90_ms:>10.2f} {r.p99_ms:>10.2f} "
+            f"{r.throughput:>9.1f} {r.unit:<11} {r.peak_rss_mb:>7.1f} MB"
+        )
+
+    report = {
+        "profile": args.profile,
+        "workload": asdict(workload),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": [asdict(r) for r in results],
+    }
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2))
+    if args.compare:
+        regressions = compare(
+            results, json.loads(args.compare.read_text()), args.tolerance
+        )
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
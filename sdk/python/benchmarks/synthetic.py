@@ -0,0 +1,148 @@
+"""Generate synthetic ADP agent source trees of configurable size."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+import yaml
+
+_WRITE_CHUNK = 4 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Workload:
+    files: int = 1_000
+    layer_bytes: int = 1 << 20
+    flow_nodes: int = 10
+    eval_suites: int = 1
+    metrics_per_suite: int = 3
+    eval_tasks: int = 10
+    seed: int = 0
+
+
+PROFILES = {
+    "smoke": Workload(files=50, layer_bytes=256 << 10, flow_nodes=10, eval_tasks=5),
+    "small": Workload(files=1_000, layer_bytes=1 << 20, flow_nodes=10),
+    "medium": Workload(
+        files=10_000,
+        layer_bytes=64 << 20,
+        flow_nodes=1_000,
+        eval_suites=20,
+        eval_tasks=1_000,
+    ),
+    "large": Workload(
+        files=100_000,
+        layer_bytes=1 << 30,
+        flow_nodes=10_000,
+        eval_suites=100,
+        eval_tasks=10_000,
+    ),
+    "huge": Workload(
+        files=100_000,
+        layer_bytes=4 << 30,
+        flow_nodes=50_000,
+        eval_suites=200,
+        eval_tasks=50_000,
+    ),
+}
+
+
+def make_flow(nodes: int) -> dict:
+    """A linear flow: input -> (llm|tool)* -> output, ``nodes`` nodes in total."""
+    nodes = max(nodes, 2)
+    graph_nodes = [{"id": "n0", "kind": "input"}]
+    for i in range(1, nodes - 1):
+        if i % 2:
+            graph_nodes.append({"id": f"n{i}", "kind": "llm", "model_ref": "primary"})
+        else:
+            graph_nodes.append({"id": f"n{i}", "kind": "tool", "tool_ref": "api"})
+    graph_nodes.append({"id": f"n{nodes - 1}", "kind": "output"})
+    edges = [{"from": f"n{i}", "to": f"n{i + 1}"} for i in range(nodes - 1)]
+    return {
+        "id": "synthetic.flow",
+        "graph": {
+            "nodes": graph_nodes,
+            "edges": edges,
+            "start_nodes": ["n0"],
+            "end_nodes": [f"n{nodes - 1}"],
+        },
+    }
+
+
+def make_evaluation(suites: int, metrics: int) -> dict:
+    kinds = [
+        {"type": "deterministic", "function": "noop", "scoring": "boolean"},
+        {"type": "llm_judge", "model": "judge", "rubric": "grounded", "threshold": 3},
+        {"type": "telemetry", "metric": "p95_latency_ms", "max_ms": 2500},
+    ]
+    return {
+        "suites": [
+            {
+                "id": f"suite{s}",
+                "metrics": [
+                    {"id": f"m{m}", **kinds[m % len(kinds)]} for m in range(metrics)
+                ],
+                "scoring": {"combine": "average"},
+                "promotion_threshold": 0.8,
+            }
+            for s in range(suites)
+        ]
+    }
+
+
+def make_manifest(workload: Workload) -> dict:
+    return {
+        "adp_version": "0.2.0",
+        "id": f"bench.agent.s{workload.seed}",
+        "name": "Synthetic benchmark agent",
+        "tags": ["benchmark"],
+        "runtime": {
+            "execution": [
+                {"backend": "python", "id": "py", "entrypoint": "agent.main:app"}
+            ],
+            "models": [{"id": "primary", "provider": "openai", "model": "gpt-4"}],
+        },
+        "flow": make_flow(workload.flow_nodes),
+        "evaluation": make_evaluation(workload.eval_suites, workload.metrics_per_suite),
+    }
+
+
+def _write_file(path: Path, size: int, rng: random.Random) -> None:
+    with path.open("wb") as f:
+        remaining = size
+        while remaining > 0:
+            n = min(remaining, _WRITE_CHUNK)
+            f.write(rng.randbytes(n))
+            remaining -= n
+
+
+def make_agent(root: str | Path, workload: Workload | None = None) -> Path:
+    """Write a synthetic agent source tree to ``root`` and return it."""
+    workload = workload or Workload()
+    root_path = Path(root)
+    rng = random.Random(workload.seed)
+    (root_path / "adp").mkdir(parents=True, exist_ok=True)
+    (root_path / "adp" / "agent.yaml").write_text(
+        yaml.safe_dump(make_manifest(workload), sort_keys=False)
+    )
+
+    eval_dir = root_path / "eval"
+    eval_dir.mkdir(exist_ok=True)
+    for s in range(workload.eval_suites):
+        tasks = [
+            {"id": f"t{t}", "prompt": f"question {t}", "expected_contains": "ok"}
+            for t in range(workload.eval_tasks)
+        ]
+        (eval_dir / f"suite{s}.yaml").write_text(
+            yaml.safe_dump({"suite": f"suite{s}", "tasks": tasks}, sort_keys=False)
+        )
+
+    per_file, extra = divmod(workload.layer_bytes, max(workload.files, 1))
+    for i in range(workload.files):
+        pkg_dir = root_path / "src" / f"pkg{i // 1000:03d}"
+        pkg_dir.mkdir(parents=True, exist_ok=True)
+        size = per_file + (1 if i < extra else 0)
+        _write_file(pkg_dir / f"mod{i:06d}.py", size, rng)
+    return root_path
@@ -0,0 +1,106 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from adp_sdk.acs import build_plan, load_acs, validate_acs
+
+EXAMPLE = Path(__file__).resolve().parents[3] / "examples" / "acme-analytics"
+
+
+@pytest.fixture
+def agent(tmp_path):
+    return Path(shutil.copytree(EXAMPLE, tmp_path / "agent"))
+
+
+def test_validate_acs_reports_schema_errors(agent):
+    """The example validates; bad documents report every problem with a path."""
+    acs = load_acs(agent / "acs" / "container.yaml")
+    assert validate_acs(acs) == []
+    bad = dict(acs, acs_version="9", runtime={"command": []})
+    errors = validate_acs(bad)
+    assert any(e.startswith("acs_version:") for e in errors)
+    assert any(e.startswith("runtime/command:") for e in errors)
+
+
+def test_load_acs_rejects_non_mapping(tmp_path):
+    path = tmp_path / "container.yaml"
+    path.write_text("- not\n- a mapping\n")
+    with pytest.raises(TypeError, match="must be a mapping"):
+        load_acs(path)
+
+
+def test_build_plan_orders_steps_for_cache_reuse(agent):
+    """Dependencies come before copies; src/ is copied last."""
+    plan = build_plan(load_acs(agent / "acs" / "container.yaml"), agent)
+    assert [s.name for s in plan.steps] == [
+        "base",
+        "system-deps",
+        "python-deps",
+        "copy-adp",
+        "copy-other",
+        "copy-src",
+        "runtime",
+    ]
+    dockerfile = plan.dockerfile()
+    assert dockerfile.index("pip install") < dockerfile.index("COPY ./adp/agent.yaml")
+    assert dockerfile.index("COPY ./eval") < dockerfile.index("COPY ./src")
+    assert (
+        'CMD ["python", "-m", "acme_agents.main", "--config", "/app/agent.yaml"]'
+        in dockerfile
+    )
+    assert "EXPOSE 8080" in dockerfile and "HEALTHCHECK --interval=30s" in dockerfile
+    assert plan.warnings == []
+
+
+def test_step_digests_change_only_from_edited_step(agent):
+    """A src/ edit only invalidates the src copy and what follows it."""
+    acs = load_acs(agent / "acs" / "container.yaml")
+    before = build_plan(acs, agent)
+    assert build_plan(acs, agent).changed_since(before.digests()) == []
+
+    source = next(p for p in (agent / "src").rglob("*") if p.is_file())
+    source.write_text(source.read_text() + "\n# edit\n")
+    after = build_plan(acs, agent)
+    assert [s.name for s in after.changed_since(before.digests())] == [
+        "copy-src",
+        "runtime",
+    ]
+
+    acs["build"]["dependencies"]["python"].append("httpx")
+    deps = build_plan(acs, agent)
+    assert deps.changed_since(after.digests())[0].name == "python-deps"
+    assert "httpx" in deps.warnings[0]
+
+
+def test_build_plan_rejects_invalid_or_missing_sources(agent):
+    acs = load_acs(agent / "acs" / "container.yaml")
+    with pytest.raises(ValueError):
+        build_plan(dict(acs, acs_version="2"), agent)
+    shutil.rmtree(agent / "eval")
+    with pytest.raises(FileNotFoundError):
+        build_plan(acs, agent)
+
+
+def test_build_plan_keeps_copy_order_for_overlapping_destinations(agent):
+    """Regrouping may not change which COPY wins a destination."""
+    acs = load_acs(agent / "acs" / "container.yaml")
+    acs["build"]["copy"] = [
+        {"src": "./src", "dest": "."},
+        {"src": "./adp/agent.yaml", "dest": "./agent.yaml"},
+    ]
+    with pytest.raises(ValueError, match="overlapping destinations"):
+        build_plan(acs, agent)
+
+    # Declared order already matches the layering: nothing moves.
+    acs["build"]["copy"].reverse()
+    copies = [s for s in build_plan(acs, agent).steps if s.name.startswith("copy")]
+    assert [s.inputs for s in copies] == [["./adp/agent.yaml"], ["./src"]]
+
+
+def test_build_plan_rejects_sources_outside_root(agent):
+    acs = load_acs(agent / "acs" / "container.yaml")
+    acs["build"]["copy"].append({"src": "../outside", "dest": "/app/x"})
+    (agent.parent / "outside").mkdir()
+    with pytest.raises(ValueError, match="outside the build root"):
+        build_plan(acs, agent)
@@ -7,7 +7,7 @@ import pytest
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from adp_sdk.adpkg import ADPackage  # type: ignore
-from adp_sdk.adp_model import ADP  # type: ignore
+from adp_sdk.adp_model import ADP, LazyADP, split_sections  # type: ignore
 
 
 def build_source(tmp_path: Path, version: str = "0.1.0") -> Path:
@@ -304,6 +304,65 @@ def test_read_adp_from_package(tmp_path: Path):
     assert adp.runtime.execution[0].id == "py"
 
 
+def test_read_config_answers_identity_queries(tmp_path: Path):
+    """read_config returns identity and version.json fields from the config blob."""
+    src = build_source_with_metadata(tmp_path)
+    pkg = ADPackage.create_from_directory(src, tmp_path / "oci")
+
+    config = pkg.read_config()
+    assert config.agent_id == "agent.complete"
+    assert config.adp_version == "0.1.0"
+    assert config.name == "Complete Agent"
+    assert config.version["agent_version"] == "1.0.0"
+
+    # Identity queries must not touch the layer blob.
+    pkg._blob(pkg._package_layers()[0]["digest"]).unlink()
+    assert pkg.read_config().agent_id == "agent.complete"
+
+
+def test_read_adp_lazy_defers_heavy_sections(tmp_path: Path):
+    """read_adp(lazy=True) parses flow/evaluation/runtime only when accessed."""
+    src = build_source_with_metadata(tmp_path)
+    pkg = ADPackage.create_from_directory(src, tmp_path / "oci")
+
+    adp = pkg.read_adp(lazy=True)
+    assert adp.id == "agent.complete" and adp.name == "Complete Agent"
+    assert adp.loaded == {"adp_version", "id", "name", "description"}
+    assert adp.flow["graph"]["start_nodes"] == ["input"]
+    assert "flow" in adp.loaded and "evaluation" not in adp.loaded
+    assert adp.runtime.execution[0].env == {"LOG_LEVEL": "info"}
+    assert adp.to_adp() == pkg.read_adp()
+    with pytest.raises(AttributeError):
+        _ = adp.tools
+
+
+def test_lazy_adp_falls_back_to_full_parse() -> None:
+    """Documents that cannot be split by top-level key are parsed eagerly."""
+    text = """
+defaults: &env {LOG_LEVEL: info}
+adp_version: "0.1.0"
+id: agent.anchored
+tags:
+- a
+- b
+runtime:
+  execution:
+    - {backend: python, id: py, env: *env}
+"""
+    assert split_sections(text) is None
+    adp = LazyADP(text)
+    assert adp.tags == ["a", "b"]
+    assert adp.runtime.execution[0].env == {"LOG_LEVEL": "info"}
+
+    sections = split_sections(text.replace("&env ", "").replace("*env", "{}"))
+    assert list(sections) == ["defaults", "adp_version", "id", "tags", "runtime"]
+    assert sections["tags"] == "tags:\n- a\n- b\n"
+    with pytest.raises(ValueError, match="'id'"):
+        LazyADP("adp_version: '0.1.0'\nruntime: {execution: []}\n")
+    with pytest.raises(TypeError, match="'id'"):
+        LazyADP("adp_version: '0.1.0'\nid: 7\nruntime: {execution: []}\n")
+
+
 def test_package_digest_integrity(tmp_path: Path):
     """Test that digests match actual blob content."""
     src = build_source_with_metadata(tmp_path)
@@ -531,3 +590,52 @@ def test_read_adp_agent_yaml_is_directory(tmp_path: Path):
     assert "not found" in error_msg.lower(), (
         f"Error should indicate file not found, got: {error_msg}"
     )
+
+
+class _WriteOnly:
+    """File object that only supports write(), like a pipe or socket."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+
+def test_write_archive_streams_oci_layout(tmp_path: Path):
+    """Test that write_archive produces the same blobs as the directory layout."""
+    src = build_source_with_metadata(tmp_path / "src")
+    pkg = ADPackage.create_from_directory(src, tmp_path / "oci")
+
+    sink = _WriteOnly()
+    manifest_desc = ADPackage.write_archive(src, sink)
+
+    archive = tmp_path / "package.tar"
+    archive.write_bytes(b"".join(sink.chunks))
+    with tarfile.open(archive, "r") as tar:
+        names = tar.getnames()
+        assert names[0] == "oci-layout"
+        assert names[-1] == "index.json"
+        tar.extractall(tmp_path / "extracted")
+
+    extracted = ADPackage.open(tmp_path / "extracted")
+    assert sorted(extracted.list_blobs()) == sorted(pkg.list_blobs())
+    assert extracted.read_adp().id == "agent.complete"
+    index = json.loads((tmp_path / "extracted" / "index.json").read_text())
+    assert index["manifests"][0]["digest"] == manifest_desc.digest
+
+
+def test_failed_layer_write_leaves_no_temp_blob(tmp_path: Path, monkeypatch):
+    """A packer that fails part-way removes its temporary layer file."""
+    src = build_source(tmp_path / "src")
+
+    def fail(src_path, fileobj):
+        fileobj.write(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ADPackage, "_write_layer", staticmethod(fail))
+    with pytest.raises(OSError, match="disk full"):
+        ADPackage.create_from_directory(src, tmp_path / "oci")
+    names = [p.name for p in (tmp_path / "oci" / "blobs" / "sha256").iterdir()]
+    assert all(len(name) == 64 for name in names), names
@@ -0,0 +1,98 @@
+"""Tests for the async package API and verify()."""
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from test_adpkg import build_source
+
+from adp_sdk import aio
+from adp_sdk.adp_model import ADP
+from adp_sdk.adpkg import ADPackage, VerificationError
+from adp_sdk.chunking import CHUNKED_LAYER_MEDIA_TYPE
+
+
+def test_verify_accepts_valid_package(tmp_path: Path):
+    pkg = ADPackage.create_from_directory(
+        build_source(tmp_path / "src"), tmp_path / "oci"
+    )
+    pkg.verify()
+
+
+def test_verify_reports_corrupt_blob(tmp_path: Path):
+    pkg = ADPackage.create_from_directory(
+        build_source(tmp_path / "src"), tmp_path / "oci"
+    )
+    config = pkg._manifest()["config"]["digest"]
+    pkg._blob(config).write_text(json.dumps({"agent_id": "tampered"}))
+
+    with pytest.raises(VerificationError) as exc_info:
+        pkg.verify()
+    assert any(config in err for err in exc_info.value.errors)
+
+
+def test_verify_reports_bad_layout(tmp_path: Path):
+    pkg = ADPackage.create_from_directory(
+        build_source(tmp_path / "src"), tmp_path / "oci"
+    )
+    (tmp_path / "oci" / "oci-layout").unlink()
+    with pytest.raises(VerificationError, match="oci-layout"):
+        pkg.verify()
+
+
+def test_async_roundtrip(tmp_path: Path):
+    src = build_source(tmp_path / "src")
+
+    async def scenario():
+        await ADPackage.acreate_from_directory(src, tmp_path / "oci")
+        pkg = await ADPackage.aopen(tmp_path / "oci")
+        adps = await asyncio.gather(*(pkg.aread_adp() for _ in range(8)))
+        await pkg.averify()
+        adp = await ADP.afrom_file(src / "adp" / "agent.yaml")
+        return adps, await pkg.alist_blobs(), adp
+
+    adps, blobs, adp = asyncio.run(scenario())
+    assert {a.id for a in adps} == {"agent.test"}
+    assert len(blobs) == 3
+    assert adp.id == "agent.test"
+
+
+def test_async_create_forwards_options(tmp_path: Path):
+    src = build_source(tmp_path / "src")
+    pkg = asyncio.run(
+        ADPackage.acreate_from_directory(src, tmp_path / "oci", chunked=True)
+    )
+    assert pkg._manifest()["layers"][0]["mediaType"] == CHUNKED_LAYER_MEDIA_TYPE
+
+
+def test_async_verify_reports_corrupt_layer(tmp_path: Path):
+    pkg = ADPackage.create_from_directory(
+        build_source(tmp_path / "src"), tmp_path / "oci"
+    )
+    layer = pkg._blob(pkg._manifest()["layers"][0]["digest"])
+    layer.write_bytes(layer.read_bytes()[:-1] + b"\x01")
+
+    with pytest.raises(VerificationError):
+        asyncio.run(pkg.averify())
+
+
+def test_aopen_missing_layout(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(ADPackage.aopen(tmp_path / "missing"))
+
+
+def test_set_executor_bounds_work(tmp_path: Path):
+    pkg = ADPackage.create_from_directory(
+        build_source(tmp_path / "src"), tmp_path / "oci"
+    )
+    executor = ThreadPoolExecutor(max_workers=1)
+    aio.set_executor(executor)
+    try:
+        assert aio.get_executor() is executor
+        asyncio.run(pkg.averify())
+    finally:
+        aio.set_executor(None)
+        executor.shutdown()
+    assert aio.get_executor() is not executor
@@ -0,0 +1,34 @@
+"""Smoke tests for the benchmark workload generator and baseline comparison."""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from adp_sdk.adp_model import ADP
+from adp_sdk.validation import validate_adp
+from benchmarks.run import CaseResult, compare, percentile
+from benchmarks.synthetic import Workload, make_agent
+
+
+def test_synthetic_agent_is_valid(tmp_path: Path):
+    workload = Workload(files=12, layer_bytes=1200, flow_nodes=7, eval_suites=2)
+    src = make_agent(tmp_path / "agent", workload)
+
+    adp = ADP.from_file(src / "adp" / "agent.yaml")
+    assert validate_adp(adp) == []
+    assert len(adp.flow["graph"]["nodes"]) == 7
+    files = list((src / "src").rglob("*.py"))
+    assert len(files) == 12
+    assert sum(f.stat().st_size for f in files) == 1200
+    assert len(list((src / "eval").glob("*.yaml"))) == 2
+
+
+def test_percentile_and_compare():
+    assert percentile([3.0, 1.0, 2.0, 4.0], 50) == 2.0
+    assert percentile([3.0, 1.0, 2.0, 4.0], 99) == 4.0
+
+    result = CaseResult("pack", 5, 130.0, 140.0, 150.0, 10.0, "MB/s", 40.0)
+    baseline = {"cases": [{"name": "pack", "p50_ms": 100.0}]}
+    assert compare([result], baseline, tolerance=0.5) == []
+    assert len(compare([result], baseline, tolerance=0.2)) == 1
@@ -0,0 +1,143 @@
+import http.client
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from test_adpkg import build_source
+
+from adp_sdk.adpkg import ADPackage
+from adp_sdk.blobserver import BlobServer, parse_range
+from adp_sdk.registry import RegistryClient
+
+
+@pytest.fixture
+def served(tmp_path: Path):
+    src = build_source(tmp_path / "src")
+    (src / "data.bin").write_bytes(bytes(range(256)) * 4096)
+    pkg = ADPackage.create_from_directory(src, tmp_path / "oci")
+    with BlobServer(pkg.path) as server:
+        yield server, pkg
+
+
+def get(server, path, headers=None, method="GET"):
+    conn = http.client.HTTPConnection(server.host, server.port, timeout=5)
+    try:
+        conn.request(method, path, headers=headers or {})
+        resp = conn.getresponse()
+        return resp, resp.read()
+    finally:
+        conn.close()
+
+
+def test_blob_get_head_and_etag(served) -> None:
+    server, pkg = served
+    layer = pkg._package_layers()[0]
+    path = f"/v2/agent/blobs/{layer['digest']}"
+
+    resp, body = get(server, path)
+    assert resp.status == 200 and body == pkg._blob(layer["digest"]).read_bytes()
+    assert resp.headers["Docker-Content-Digest"] == layer["digest"]
+    etag = resp.headers["ETag"]
+    assert etag == f'"{layer["digest"]}"'
+
+    resp, body = get(server, path, method="HEAD")
+    assert resp.status == 200 and body == b""
+    assert int(resp.headers["Content-Length"]) == layer["size"]
+
+    resp, body = get(server, path, {"If-None-Match": etag})
+    assert resp.status == 304 and body == b""
+    resp, _ = get(server, path, {"If-Match": '"sha256:other"'})
+    assert resp.status == 412
+
+    missing = "sha256:" + "0" * 64
+    assert get(server, f"/v2/agent/blobs/{missing}")[0].status == 404
+    assert get(server, "/v2/agent/blobs/sha256:../../index.json")[0].status == 404
+
+
+def test_blob_ranges(served) -> None:
+    server, pkg = served
+    layer = pkg._package_layers()[0]
+    data = pkg._blob(layer["digest"]).read_bytes()
+    path = f"/v2/agent/blobs/{layer['digest']}"
+    etag = f'"{layer["digest"]}"'
+
+    resp, body = get(server, path, {"Range": "bytes=10-19"})
+    assert resp.status == 206 and body == data[10:20]
+    assert resp.headers["Content-Range"] == f"bytes 10-19/{len(data)}"
+    assert get(server, path, {"Range": "bytes=-5"})[1] == data[-5:]
+    assert get(server, path, {"Range": "bytes=100-"})[1] == data[100:]
+
+    resp, _ = get(server, path, {"Range": f"bytes={len(data)}-"})
+    assert resp.status == 416
+    assert resp.headers["Content-Range"] == f"bytes */{len(data)}"
+
+    resp, body = get(server, path, {"Range": "bytes=0-3", "If-Range": '"stale"'})
+    assert resp.status == 200 and body == data
+    resp, body = get(server, path, {"Range": "bytes=0-3", "If-Range": etag})
+    assert resp.status == 206 and body == data[:4]
+
+
+def test_parse_range() -> None:
+    assert parse_range(None, 10) is None
+    assert parse_range("bytes=0-0", 10) == (0, 0)
+    assert parse_range("bytes=5-100", 10) == (5, 9)
+    assert parse_range("bytes=-20", 10) == (0, 9)
+    assert parse_range("bytes=0-1,4-5", 10) is None
+    assert parse_range("bytes=9-3", 10) is False
+    assert parse_range("bytes=-0", 10) is False
+
+
+def test_manifests_tags_and_keep_alive(served) -> None:
+    server, pkg = served
+    desc = pkg._manifest_desc()
+    conn = http.client.HTTPConnection(server.host, server.port, timeout=5)
+    try:
+        for ref in (desc["digest"], "agent.test", "latest"):
+            conn.request("GET", f"/v2/any/manifests/{ref}")
+            resp = conn.getresponse()
+            body = resp.read()
+            assert resp.status == 200
+            assert json.loads(body) == pkg._manifest()
+            assert resp.headers["Content-Type"] == json.loads(body)["mediaType"]
+        conn.request("GET", "/v2/any/tags/list")
+        tags = json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+    assert tags == {"name": "any", "tags": ["agent.test", "latest"]}
+    assert server.stats.connections == 1 and server.stats.requests == 4
+    assert get(server, "/v2/any/manifests/nope")[0].status == 404
+    assert get(server, "/v2/", method="POST")[0].status == 405
+
+
+def test_manifest_route_rejects_non_manifest_blobs(served) -> None:
+    """Layer and config digests are not manifests and get a 404."""
+    server, pkg = served
+    manifest = pkg._manifest()
+    for desc in (manifest["config"], *manifest["layers"]):
+        resp, body = get(server, f"/v2/any/manifests/{desc['digest']}")
+        assert resp.status == 404 and b"MANIFEST_UNKNOWN" in body
+    assert get(server, "/v2/")[0].status == 200
+
+
+def test_registry_client_pulls_from_blob_server(served, tmp_path: Path) -> None:
+    server, pkg = served
+    with RegistryClient(server.url, chunk_size=64 * 1024) as client:
+        result = client.pull("agents/test", "agent.test", tmp_path / "pulled")
+    pulled = ADPackage.open(tmp_path / "pulled")
+    pulled.verify()
+    assert result.manifest_digest == pkg._manifest_desc()["digest"]
+    assert pulled.read_adp().id == "agent.test"
+
+
+def test_concurrent_clients(served) -> None:
+    server, pkg = served
+    layer = pkg._package_layers()[0]
+    expected = pkg._blob(layer["digest"]).read_bytes()
+
+    def fetch(_):
+        return get(server, f"/v2/agent/blobs/{layer['digest']}")[1] == expected
+
+    with ThreadPoolExecutor(16) as pool:
+        assert all(pool.map(fetch, range(64)))
+    assert server.stats.requests == 64
@@ -0,0 +1,53 @@
+"""Tests for bulk packing of many agents."""
+
+import json
+from pathlib import Path
+
+from test_adpkg import build_source
+
+from adp_sdk.adpkg import ADPackage
+from adp_sdk.bulk import discover_agents, main, pack_all
+
+
+def build_monorepo(root: Path) -> Path:
+    for name in ("alpha", "beta"):
+        agent = build_source(root / "agents" / name)
+        text = (agent / "adp" / "agent.yaml").read_text()
+        (agent / "adp" / "agent.yaml").write_text(
+            text.replace('"agent.test"', f'"agent.{name}"')
+        )
+    broken = root / "agents" / "broken" / "adp"
+    broken.mkdir(parents=True)
+    (broken / "agent.yaml").write_text("adp_version: '0.1.0'\nid: broken\n")
+    return root
+
+
+def test_discover_agents(tmp_path: Path):
+    root = build_monorepo(tmp_path / "repo")
+    names = [p.name for p in discover_agents(root)]
+    assert names == ["alpha", "beta", "broken"]
+
+
+def test_pack_all_shares_blob_store(tmp_path: Path):
+    root = build_monorepo(tmp_path / "repo")
+    out = tmp_path / "oci"
+    report = pack_all(root, out, jobs=2)
+
+    assert [a.agent_id for a in report.agents if not a.error] == [
+        "agent.alpha",
+        "agent.beta",
+    ]
+    assert len(report.failed) == 1
+    assert all(a.seconds > 0 for a in report.agents)
+
+    index = json.loads((out / "index.json").read_text())
+    assert len(index["manifests"]) == 2
+    assert ADPackage.open(out, ref="agent.beta").read_adp().id == "agent.beta"
+    saved = json.loads((out / "pack-report.json").read_text())
+    assert len(saved["agents"]) == 3
+
+
+def test_pack_all_main_reports_failures(tmp_path: Path, capsys):
+    root = build_monorepo(tmp_path / "repo")
+    assert main([str(root), str(tmp_path / "oci"), "--jobs", "1"]) == 1
+    assert "packed 3 agents" in capsys.readouterr().out
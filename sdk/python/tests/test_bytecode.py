@@ -0,0 +1,92 @@
+import subprocess
+import sys
+import tarfile
+from pathlib import Path
+
+import pytest
+from test_adpkg import build_source
+
+from adp_sdk.adpkg import ADPackage
+from adp_sdk.bytecode import BYTECODE_MEDIA_TYPE, CACHE_TAG_ANNOTATION
+
+TAG = sys.implementation.cache_tag
+
+
+def source_with_module(path: Path) -> Path:
+    build_source(path)
+    (path / "agent").mkdir()
+    (path / "agent" / "__init__.py").write_text("")
+    (path / "agent" / "main.py").write_text("def app(payload):\n    return payload\n")
+    return path
+
+
+def bytecode_layers(pkg: ADPackage) -> list[dict]:
+    return [
+        layer
+        for layer in pkg._manifest()["layers"]
+        if layer["mediaType"] == BYTECODE_MEDIA_TYPE
+    ]
+
+
+def test_bytecode_layer_is_hash_based_and_deterministic(tmp_path: Path) -> None:
+    src = source_with_module(tmp_path / "src")
+    first = ADPackage.create_from_directory(src, tmp_path / "a", bytecode=True)
+    second = ADPackage.create_from_directory(src, tmp_path / "b", bytecode=True)
+
+    [layer] = bytecode_layers(first)
+    assert layer["annotations"][CACHE_TAG_ANNOTATION] == TAG
+    assert first.bytecode_tags() == [TAG]
+    assert layer["digest"] == bytecode_layers(second)[0]["digest"]
+
+    with tarfile.open(first._blob(layer["digest"])) as tar:
+        names = tar.getnames()
+        header = tar.extractfile(f"agent/__pycache__/main.{TAG}.pyc").read(8)
+    assert f"agent/__init__.{TAG}.pyc" not in names
+    assert f"agent/__pycache__/__init__.{TAG}.pyc" in names
+    # PEP 552 flags: bit 0 = hash-based, bit 1 = check source.
+    assert int.from_bytes(header[4:8], "little") == 0b11
+
+
+def test_unpack_selects_matching_bytecode_layer(tmp_path: Path) -> None:
+    """The running interpreter imports the shipped pyc without recompiling."""
+    src = source_with_module(tmp_path / "src")
+    pkg = ADPackage.create_from_directory(src, tmp_path / "oci", bytecode=True)
+
+    dest = tmp_path / "out"
+    pkg.unpack(dest)
+    pyc = dest / "agent" / "__pycache__" / f"main.{TAG}.pyc"
+    assert pyc.is_file()
+    proc = subprocess.run(
+        [sys.executable, "-B", "-v", "-c", "import agent.main"],
+        cwd=dest,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert f"code object from '{pyc}'" in proc.stderr
+
+    other = tmp_path / "other"
+    pkg.unpack(other, python_tag="cpython-99")
+    assert (other / "agent" / "main.py").is_file()
+    assert not (other / "agent" / "__pycache__").exists()
+
+
+def test_source_layer_excludes_pycache(tmp_path: Path) -> None:
+    src = source_with_module(tmp_path / "src")
+    stale = src / "agent" / "__pycache__"
+    stale.mkdir()
+    (stale / "main.cpython-30.pyc").write_bytes(b"stale")
+    pkg = ADPackage.create_from_directory(src, tmp_path / "oci")
+
+    assert bytecode_layers(pkg) == []
+    layer = pkg._package_layers()[0]
+    with tarfile.open(pkg._blob(layer["digest"])) as tar:
+        assert not any("__pycache__" in name for name in tar.getnames())
+
+
+def test_bytecode_rejects_unknown_invalidation_mode(tmp_path: Path) -> None:
+    src = source_with_module(tmp_path / "src")
+    with pytest.raises(ValueError, match="invalidation_mode"):
+        ADPackage.create_from_directory(
+            src, tmp_path / "oci", bytecode=True, invalidation_mode="timestamp"
+        )
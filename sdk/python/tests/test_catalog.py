@@ -0,0 +1,109 @@
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import yaml
+from test_adpkg import build_source
+
+from adp_sdk.adpkg import ADPackage
+from adp_sdk.catalog import Catalog, find_layouts
+
+
+def make_layout(root: Path, name: str, model: str, tags: list[str]) -> Path:
+    src = build_source(root / "src" / name, version="0.2.0")
+    agent_yaml = src / "adp" / "agent.yaml"
+    agent = yaml.safe_load(agent_yaml.read_text())
+    agent["id"] = f"agent.{name}"
+    agent["tags"] = tags
+    agent["runtime"]["models"][0]["model"] = model
+    agent["skills"] = [{"id": "answer", "name": "Answer", "description": "Answers"}]
+    agent["tools"] = {
+        "mcp_servers": [
+            {
+                "id": "github",
+                "description": "GitHub",
+                "transport": "stdio",
+                "endpoint": "npx github-mcp",
+            }
+        ],
+        "http_apis": [
+            {"id": "api", "description": "API", "base_url": "https://x.test"}
+        ],
+    }
+    agent_yaml.write_text(yaml.safe_dump(agent))
+    (src / "metadata" / "version.json").write_text(
+        json.dumps({"agent_version": f"1.0.{len(tags)}"})
+    )
+    out = root / "layouts" / name
+    ADPackage.create_from_directory(src, out)
+    return out
+
+
+def test_catalog_queries(tmp_path: Path) -> None:
+    make_layout(tmp_path, "a", "gpt-4", ["analytics"])
+    make_layout(tmp_path, "b", "gpt-4o", ["analytics", "beta"])
+    make_layout(tmp_path, "c", "gpt-4", [])
+
+    with Catalog(tmp_path / "catalog.db") as catalog:
+        stats = catalog.index_tree(tmp_path / "layouts")
+        assert stats.indexed == 3 and not stats.errors
+
+        assert [e.agent_id for e in catalog.by_model("gpt-4")] == ["agent.a", "agent.c"]
+        assert [e.agent_id for e in catalog.by_model("primary")] == [
+            "agent.a",
+            "agent.b",
+            "agent.c",
+        ]
+        assert [e.agent_id for e in catalog.by_tag("beta")] == ["agent.b"]
+        assert len(catalog.by_skill("answer")) == 3
+        assert len(catalog.by_tool("github")) == len(catalog.by_tool("api")) == 3
+        [entry] = catalog.by_agent("agent.b")
+        assert entry.version == "1.0.2" and entry.adp_version == "0.2.0"
+
+    # A copied layout shares every blob with its original.
+    shutil.copytree(tmp_path / "layouts" / "a", tmp_path / "layouts" / "a-copy")
+    with Catalog(tmp_path / "catalog.db") as catalog:
+        assert catalog.index_tree(tmp_path / "layouts").skipped == 3
+        layer = ADPackage.open(tmp_path / "layouts" / "a")._package_layers()[0]
+        assert [Path(p).name for p in catalog.layouts_with_blob(layer["digest"])] == [
+            "a",
+            "a-copy",
+        ]
+        shared = {digest: n for digest, _, n in catalog.shared_blobs()}
+        assert shared[layer["digest"]] == 2 and len(shared) == 3
+
+
+def test_catalog_reindexes_only_changed_layouts(tmp_path: Path) -> None:
+    make_layout(tmp_path, "a", "gpt-4", ["x"])
+    make_layout(tmp_path, "b", "gpt-4", ["y"])
+    db = tmp_path / "catalog.db"
+    with Catalog(db) as catalog:
+        catalog.index_tree(tmp_path / "layouts")
+
+    with Catalog(db) as catalog, ThreadPoolExecutor(2) as pool:
+        assert catalog.index_tree(tmp_path / "layouts", executor=pool).skipped == 2
+
+        make_layout(tmp_path / "v2", "b", "claude", ["y"])
+        new_b = tmp_path / "layouts" / "b"
+        (new_b / "index.json").write_bytes(
+            (tmp_path / "v2" / "layouts" / "b" / "index.json").read_bytes()
+        )
+        for blob in (tmp_path / "v2" / "layouts" / "b" / "blobs" / "sha256").iterdir():
+            (new_b / "blobs" / "sha256" / blob.name).write_bytes(blob.read_bytes())
+        stats = catalog.index(find_layouts(tmp_path / "layouts"))
+        assert (stats.indexed, stats.skipped) == (1, 1)
+        assert [e.agent_id for e in catalog.by_model("claude")] == ["agent.b"]
+        assert [e.agent_id for e in catalog.by_model("gpt-4")] == ["agent.a"]
+
+        stats = catalog.index([tmp_path / "layouts" / "a"], prune=True)
+        assert stats.removed == 1 and len(catalog) == 1
+        assert catalog.by_tag("y") == []
+
+
+def test_catalog_reports_broken_layouts(tmp_path: Path) -> None:
+    layout = make_layout(tmp_path, "a", "gpt-4", [])
+    (layout / "index.json").write_text('{"manifests": [{"digest": "sha256:00"}]}')
+    with Catalog(tmp_path / "catalog.db") as catalog:
+        stats = catalog.index([layout, tmp_path / "missing"])
+    assert stats.indexed == 0 and len(stats.errors) == 2
@@ -0,0 +1,96 @@
+import random
+from pathlib import Path
+
+import pytest
+from test_adpkg import build_source
+
+from adp_sdk import chunking
+from adp_sdk.adpkg import ADPackage, VerificationError
+from adp_sdk.chunking import (
+    CHUNK_MEDIA_TYPE,
+    CHUNKED_LAYER_MEDIA_TYPE,
+    ChunkParams,
+    cut_points,
+)
+
+SMALL = ChunkParams(min_size=4096, avg_size=16384, max_size=65536)
+
+
+def chunked_source(tmp_path: Path, data: bytes) -> Path:
+    src = build_source(tmp_path)
+    (src / "src").mkdir()
+    (src / "src" / "index.bin").write_bytes(data)
+    return src
+
+
+def chunk_digests(pkg: ADPackage) -> set[str]:
+    return {
+        layer["digest"]
+        for layer in pkg._manifest()["layers"]
+        if layer["mediaType"] == CHUNK_MEDIA_TYPE
+    }
+
+
+def test_cut_points_are_bounded_and_match_pure_python(monkeypatch) -> None:
+    """The numpy scan and the byte loop choose identical boundaries."""
+    data = random.Random(0).randbytes(400_000)
+    cuts = cut_points(data, SMALL)
+    sizes = [b - a for a, b in zip([0, *cuts[:-1]], cuts, strict=True)]
+    assert cuts[-1] == len(data)
+    assert all(SMALL.min_size <= s <= SMALL.max_size for s in sizes[:-1])
+
+    monkeypatch.setattr(chunking, "np", None)
+    assert cut_points(data, SMALL) == cuts
+    with pytest.raises(ValueError, match="power of two"):
+        ChunkParams(avg_size=3000)
+
+
+def test_chunked_package_round_trip(tmp_path: Path) -> None:
+    """read_adp, unpack and verify reassemble the chunked layer."""
+    data = random.Random(1).randbytes(300_000)
+    src = chunked_source(tmp_path / "src", data)
+    pkg = ADPackage.create_from_directory(src, tmp_path / "oci", chunked=SMALL)
+
+    layers = pkg._manifest()["layers"]
+    assert layers[0]["mediaType"] == CHUNKED_LAYER_MEDIA_TYPE
+    assert len(chunk_digests(pkg)) > 5
+    assert pkg.read_adp().id == "agent.test"
+    pkg.verify()
+    pkg.unpack(tmp_path / "out")
+    assert (tmp_path / "out" / "src" / "index.bin").read_bytes() == data
+
+    pkg._blob(layers[1]["digest"]).write_bytes(b"corrupt")
+    with pytest.raises(VerificationError, match="has digest"):
+        pkg.verify()
+
+
+@pytest.mark.parametrize("same_size", [True, False])
+def test_corrupt_chunk_fails_streaming_reads(tmp_path: Path, same_size) -> None:
+    """Readers that skip verify() still never see bytes from a bad chunk."""
+    data = random.Random(3).randbytes(300_000)
+    src = chunked_source(tmp_path / "src", data)
+    pkg = ADPackage.create_from_directory(src, tmp_path / "oci", chunked=SMALL)
+    chunk = pkg._blob(pkg._manifest()["layers"][-1]["digest"])
+    content = chunk.read_bytes()
+    chunk.write_bytes(content[:-1] + b"!" if same_size else content + b"!")
+
+    with pytest.raises(ValueError, match="chunk"):
+        pkg.unpack(tmp_path / "out")
+    assert not (tmp_path / "out" / "src" / "index.bin").exists()
+
+
+def test_small_edit_adds_few_chunks(tmp_path: Path) -> None:
+    """Editing a large file changes only the chunks around the edit."""
+    data = random.Random(2).randbytes(600_000)
+    old = ADPackage.create_from_directory(
+        chunked_source(tmp_path / "a", data), tmp_path / "oci-a", chunked=SMALL
+    )
+    edited = data[:300_000] + b"inserted" + data[300_000:]
+    new = ADPackage.create_from_directory(
+        chunked_source(tmp_path / "b", edited), tmp_path / "oci-b", chunked=SMALL
+    )
+
+    added = chunk_digests(new) - chunk_digests(old)
+    assert 0 < len(added) <= 3
+    diff = old.diff(new)
+    assert [c.name for c in diff.changes()] == ["src/index.bin"]
@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+from test_adpkg import build_source
+
+from adp_sdk import cli
+from adp_sdk.cli import Watcher
+
+
+def make_agents(root: Path, count: int = 2) -> list[Path]:
+    agents = []
+    for i in range(count):
+        src = build_source(root / f"agent{i}")
+        agent_yaml = src / "adp" / "agent.yaml"
+        data = yaml.safe_load(agent_yaml.read_text())
+        data["id"] = f"agent.{i}"
+        agent_yaml.write_text(yaml.safe_dump(data))
+        agents.append(src)
+    return agents
+
+
+def results(out: str) -> list[dict]:
+    return [json.loads(line) for line in out.splitlines() if line.startswith("{")]
+
+
+def test_validate_many_targets_in_parallel(tmp_path: Path, capsys) -> None:
+    """A root expands to its agents; failures are reported per target."""
+    _good, bad = make_agents(tmp_path)
+    (bad / "adp" / "agent.yaml").write_text("adp_version: '0.1.0'\nid: bad\n")
+
+    code = cli.main(["validate", "--json", "-j", "2", str(tmp_path)])
+    by_target = {Path(r["target"]).name: r for r in results(capsys.readouterr().out)}
+    assert code == 1
+    assert by_target["agent0"]["ok"] and not by_target["agent1"]["ok"]
+    assert "ValidationError" in by_target["agent1"]["detail"]
+
+
+def test_pack_verify_inspect_unpack(tmp_path: Path, capsys) -> None:
+    make_agents(tmp_path / "src")
+    out = tmp_path / "out"
+    assert (
+        cli.main(["pack", "--json", "-j", "2", str(tmp_path / "src"), "-o", str(out)])
+        == 0
+    )
+    assert sorted(p.name for p in out.iterdir()) == ["agent0", "agent1"]
+
+    assert cli.main(["verify", "--json", str(out)]) == 0
+    assert cli.main(["inspect", "--json", str(out / "agent0")]) == 0
+    dest = tmp_path / "x"
+    assert cli.main(["unpack", "--json", str(out / "agent1"), "-d", str(dest)]) == 0
+    lines = results(capsys.readouterr().out)
+    packed, verified, inspected, unpacked = lines[:2], lines[2:4], lines[4], lines[5]
+    assert all(r["ok"] for r in [*packed, *verified, unpacked])
+    assert inspected["data"]["id"] == "agent.0"
+    assert inspected["data"]["layers"][0]["digest"].startswith("sha256:")
+    assert (dest / "adp" / "agent.yaml").is_file()
+
+
+def test_validate_acs_is_opt_in(tmp_path: Path, capsys) -> None:
+    [agent] = make_agents(tmp_path, count=1)
+    assert cli.main(["validate", str(agent)]) == 0
+    assert cli.main(["validate", "--acs", str(agent)]) == 1
+    assert "acs: " in capsys.readouterr().out
+
+
+def test_missing_target_is_usage_error(tmp_path: Path, capsys) -> None:
+    assert cli.main(["verify", str(tmp_path / "nope")]) == 2
+    assert "no such layout" in capsys.readouterr().err
+    assert cli.main(["serve", str(tmp_path)]) == 2
+    assert "no blobs/ directory" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("method", ["poll", "auto"])
+def test_watcher_reports_only_changed_targets(tmp_path: Path, method: str) -> None:
+    first, second = make_agents(tmp_path)
+    watcher = Watcher([first, second], method=method, interval=0.01)
+    try:
+        assert watcher.poll(timeout=0.05) == []
+        time.sleep(0.01)
+        (second / "adp" / "agent.yaml").write_text(
+            (second / "adp" / "agent.yaml").read_text() + "\n# edit\n"
+        )
+        assert watcher.poll(timeout=2) == [second]
+        (first / "__pycache__").mkdir()
+        (first / "__pycache__" / "x.pyc").write_bytes(b"")
+        assert watcher.poll(timeout=0.05) == []
+    finally:
+        watcher.close()
+
+
+def test_watch_mode_repacks_changed_agent(tmp_path: Path, capsys) -> None:
+    first, second = make_agents(tmp_path / "src")
+    out = tmp_path / "src" / "out"  # inside the watched tree, must be ignored
+    stop = threading.Event()
+    argv = ["pack", "--json", "--watch", "--watch-method", "poll", "--interval", "0.02"]
+    thread = threading.Thread(
+        target=cli.main,
+        args=([*argv, str(first), str(second), "-o", str(out)],),
+        kwargs={"stop": stop},
+    )
+    thread.start()
+    try:
+        deadline = time.monotonic() + 5
+        while "watching" not in capsys.readouterr().out and time.monotonic() < deadline:
+            time.sleep(0.02)
+        (first / "notes.txt").write_text("changed")
+        repacked: list[dict] = []
+        while not repacked and time.monotonic() < deadline:
+            time.sleep(0.05)
+            repacked = results(capsys.readouterr().out)
+    finally:
+        stop.set()
+        thread.join(5)
+    assert [Path(r["target"]).name for r in repacked] == ["agent0"]
+    assert repacked[0]["ok"]
+
+
+def test_watch_mode_picks_up_new_agents(tmp_path: Path, capsys) -> None:
+    """An agent added under a watched root is validated without a restart."""
+    root = tmp_path / "agents"
+    make_agents(root, count=1)
+    stop = threading.Event()
+    argv = ["validate", "--json", "--watch", "--watch-method", "poll"]
+    thread = threading.Thread(
+        target=cli.main,
+        args=([*argv, "--interval", "0.02", str(root)],),
+        kwargs={"stop": stop},
+    )
+    thread.start()
+    try:
+        deadline = time.monotonic() + 5
+        while "watching" not in capsys.readouterr().out and time.monotonic() < deadline:
+            time.sleep(0.02)
+        build_source(root / "late")
+        seen: list[dict] = []
+        while not seen and time.monotonic() < deadline:
+            time.sleep(0.05)
+            seen = results(capsys.readouterr().out)
+    finally:
+        stop.set()
+        thread.join(5)
+    assert [Path(r["target"]).name for r in seen] == ["late"]
+    assert seen[0]["ok"]
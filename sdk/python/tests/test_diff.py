@@ -0,0 +1,58 @@
+"""Tests for ADPackage.diff."""
+
+from pathlib import Path
+
+from test_adpkg import build_source
+
+from adp_sdk.adpkg import ADPackage
+from adp_sdk.diff import ADDED, MODIFIED, REMOVED
+
+
+def make_source(root: Path) -> Path:
+    src = build_source(root)
+    (src / "src").mkdir()
+    (src / "src" / "main.py").write_text("print('v1')\n")
+    (src / "src" / "old.py").write_text("pass\n")
+    return src
+
+
+def test_diff_identical_packages(tmp_path: Path):
+    pkg = ADPackage.create_from_directory(make_source(tmp_path / "a"), tmp_path / "oci")
+    result = pkg.diff(ADPackage.open(tmp_path / "oci"))
+    assert result.identical
+    assert not result.changed()
+
+
+def test_diff_reports_member_changes(tmp_path: Path):
+    src = make_source(tmp_path / "src")
+    old = ADPackage.create_from_directory(src, tmp_path / "v1")
+
+    (src / "src" / "main.py").write_text("print('v2')\n")
+    (src / "src" / "old.py").unlink()
+    (src / "src" / "new.py").write_text("pass\n")
+    new = ADPackage.create_from_directory(src, tmp_path / "v2")
+
+    result = old.diff(new)
+    assert not result.identical
+    assert result.config == {}
+    statuses = {c.name: c.status for c in result.changes()}
+    assert statuses == {
+        "src/main.py": MODIFIED,
+        "src/new.py": ADDED,
+        "src/old.py": REMOVED,
+    }
+    assert result.changed("src/")
+    assert not result.changed("adp/")
+
+
+def test_diff_reports_config_changes(tmp_path: Path):
+    src = make_source(tmp_path / "src")
+    old = ADPackage.create_from_directory(src, tmp_path / "v1")
+    agent = src / "adp" / "agent.yaml"
+    agent.write_text(agent.read_text().replace('"agent.test"', '"agent.renamed"'))
+    new = ADPackage.create_from_directory(src, tmp_path / "v2")
+
+    result = old.diff(new)
+    assert result.config == {"agent_id": ("agent.test", "agent.renamed")}
+    assert result.changed("adp/agent.yaml")
+    assert not result.changed("src/")
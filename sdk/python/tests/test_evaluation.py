@@ -0,0 +1,214 @@
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+from test_adpkg import build_source
+
+from adp_sdk.adp_model import ADP
+from adp_sdk.adpkg import ADPackage
+from adp_sdk.evalcache import EvalCache
+from adp_sdk.evaluation import (
+    EvaluationRunner,
+    Task,
+    bound_suites,
+    combine,
+    load_tasks,
+)
+
+SUITES = [
+    {
+        "id": "quality",
+        "metrics": [
+            {
+                "id": "mentions",
+                "type": "deterministic",
+                "function": "contains",
+                "threshold": True,
+            },
+            {"id": "judge", "type": "llm_judge", "model": "m", "threshold": 4},
+            {"id": "latency", "type": "telemetry", "metric": "p95", "max_ms": 5000},
+        ],
+        "scoring": {
+            "combine": "weighted_average",
+            "weights": {"mentions": 0.5, "judge": 0.3, "latency": 0.2},
+        },
+        "promotion_threshold": 0.8,
+    },
+    {
+        "id": "smoke",
+        "metrics": [
+            {
+                "id": "ping",
+                "type": "deterministic",
+                "function": "noop",
+                "scoring": "boolean",
+                "threshold": True,
+            }
+        ],
+    },
+]
+
+
+def write_tasks(root: Path, suite: str | None, tasks: list[dict], name: str) -> None:
+    (root / "eval").mkdir(parents=True, exist_ok=True)
+    data = {"tasks": tasks} if suite is None else {"suite": suite, "tasks": tasks}
+    (root / "eval" / f"{name}.yaml").write_text(yaml.safe_dump(data))
+
+
+def test_combine_methods():
+    """Each ``scoring.combine`` method reduces metric values as specified."""
+    values = {"a": 1.0, "b": 0.5}
+    assert combine({"combine": "average"}, values) == 0.75
+    assert combine({"combine": "sum"}, values) == 1.5
+    assert combine({"combine": "boolean"}, values) == 0.0
+    assert (
+        combine({"combine": "weighted_average", "weights": {"a": 3}}, values) == 0.875
+    )
+    with pytest.raises(ValueError):
+        combine({"combine": "median"}, values)
+
+
+def test_runner_scores_suites_and_promotion(tmp_path):
+    """Scores combine per-metric pass rates and gate on promotion_threshold."""
+    write_tasks(
+        tmp_path,
+        "quality",
+        [
+            {"id": "q1", "prompt": "latency?", "expected_contains": "ms"},
+            {"id": "q2", "prompt": "error rate?", "expected_contains": "%"},
+        ],
+        "quality",
+    )
+    judge = {"q1": 5, "q2": 3}
+    runner = EvaluationRunner(
+        SUITES,
+        load_tasks(tmp_path),
+        agent=lambda task: "42 ms" if task.id == "q1" else "oops",
+        evaluators={"llm_judge": lambda metric, case: judge[case.task.id]},
+    )
+    report = runner.run()
+
+    quality = report.suite("quality")
+    assert quality.metrics == {"mentions": 0.5, "judge": 0.5, "latency": 1.0}
+    assert quality.score == pytest.approx(0.6)
+    assert not quality.passed
+    assert len(quality.cases) == 6
+    # A suite without task files still runs its metrics once.
+    smoke = report.suite("smoke")
+    assert smoke.passed and [c.task for c in smoke.cases] == ["default"]
+    assert report.passed(["smoke"]) and not report.passed()
+
+
+def test_runner_records_errors_as_failures(tmp_path):
+    """Agent exceptions and missing evaluators fail cases instead of raising."""
+
+    def agent(task):
+        raise RuntimeError("boom")
+
+    report = EvaluationRunner(SUITES, agent=agent).run(["quality"])
+    cases = report.suite("quality").cases
+    assert all(not c.passed and c.error for c in cases)
+    with pytest.raises(KeyError):
+        EvaluationRunner(SUITES).run(["missing"])
+
+
+def test_runner_runs_cases_concurrently():
+    """Wall-clock time tracks the slowest case, not the sum of all cases."""
+    suites = [{"id": "s", "metrics": [{"id": "m", "type": "deterministic"}]}]
+    tasks = {"s": [Task(f"t{i}") for i in range(8)]}
+
+    def slow_agent(task):
+        time.sleep(0.2)
+        return "ok"
+
+    report = EvaluationRunner(suites, tasks, slow_agent, concurrency=8).run()
+    assert report.passed()
+    assert report.seconds < 0.2 * 8 / 2
+
+
+def test_runner_from_package_reads_layer_tasks(tmp_path):
+    """Suites and eval/*.yaml tasks are loaded from a packed layout."""
+    src = tmp_path / "src"
+    build_source(src)
+    agent_yaml = src / "adp" / "agent.yaml"
+    data = yaml.safe_load(agent_yaml.read_text())
+    data["evaluation"] = {"suites": [SUITES[1]]}
+    agent_yaml.write_text(yaml.safe_dump(data))
+    write_tasks(src, None, [{"id": "shared"}], "shared")
+
+    pkg = ADPackage.create_from_directory(src, tmp_path / "oci")
+    report = EvaluationRunner.from_package(pkg).run()
+    assert [c.task for c in report.suite("smoke").cases] == ["shared"]
+
+    local = EvaluationRunner.from_adp(ADP.from_file(agent_yaml), src).run()
+    assert local.passed()
+
+
+def test_bound_suites_reads_acs_hooks():
+    """ACS eval_bindings map to the suites a hook must run or pass."""
+    acs = {
+        "eval_bindings": {
+            "on_startup": {"run_suites": ["smoke"]},
+            "on_deploy": {"require_passing_suites": ["quality"]},
+        }
+    }
+    assert bound_suites(acs) == ["quality"]
+    assert bound_suites(acs, "on_startup") == ["smoke"]
+    assert bound_suites({}) == []
+
+
+def test_cache_reuses_results_until_inputs_change(tmp_path):
+    """Cached cases skip the agent; a new digest or suite definition misses."""
+    calls = []
+
+    def agent(task):
+        calls.append(task.id)
+        return "42 ms"
+
+    tasks = {"quality": [Task("q1", expected_contains="ms"), Task("q2")]}
+    judge = {"llm_judge": lambda metric, case: 5}
+    with EvalCache(tmp_path / "cache.db") as cache:
+        first = EvaluationRunner(
+            SUITES, tasks, agent, evaluators=judge, cache=cache, digest="sha256:a"
+        ).run(["quality"])
+        assert (first.cache_hits, first.cache_misses) == (0, 6)
+        assert len(calls) == 2
+
+    with EvalCache(tmp_path / "cache.db") as cache:
+        again = EvaluationRunner(
+            SUITES, tasks, agent, evaluators=judge, cache=cache, digest="sha256:a"
+        ).run(["quality"])
+        assert again.hit_rate == 1.0 and len(calls) == 2
+        assert again.suite("quality").score == first.suite("quality").score
+
+        changed = [dict(SUITES[0], promotion_threshold=0.5)]
+        other = EvaluationRunner(
+            changed, tasks, agent, evaluators=judge, cache=cache, digest="sha256:a"
+        ).run()
+        assert other.cache_hits == 0 and len(calls) == 4
+
+        EvaluationRunner(
+            SUITES, tasks, agent, evaluators=judge, cache=cache, digest="sha256:b"
+        ).run(["quality"])
+        assert len(calls) == 6
+
+
+def test_cache_skips_errors_and_evicts(tmp_path):
+    """Failed cases are re-run; size and TTL limits evict old entries."""
+    with EvalCache(tmp_path / "cache.db", max_entries=2) as cache:
+        report = EvaluationRunner(SUITES, cache=cache, digest="sha256:a").run(
+            ["quality"]
+        )
+        # llm_judge has no evaluator, so that case errors and is not stored.
+        assert len(cache) == 2
+        for i in range(3):
+            cache.put(("sha256:x", "s", "m", f"t{i}"), {"score": 1.0})
+        cache.commit()
+        assert len(cache) == 2 and cache.stats.evicted == 3
+        assert report.cache_misses == 3
+
+    with EvalCache(tmp_path / "cache.db", ttl=0) as cache:
+        assert cache.get(("sha256:x", "s", "m", "t2")) is None
+        cache.commit()
+        assert len(cache) == 0
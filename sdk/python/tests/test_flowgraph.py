@@ -0,0 +1,198 @@
+from pathlib import Path
+
+import pytest
+import yaml
+from test_adpkg import build_source
+
+from adp_sdk.adp_model import ADP
+from adp_sdk.adpkg import ADPackage
+from adp_sdk.flowgraph import (
+    END,
+    START,
+    FlowCompiler,
+    compile_flow,
+    evaluate_condition,
+)
+
+FLOW = {
+    "id": "test.flow",
+    "graph": {
+        "nodes": [
+            {"id": "input", "kind": "input"},
+            {"id": "classify", "kind": "router"},
+            {"id": "answer", "kind": "llm"},
+            {"id": "refuse", "kind": "tool"},
+            {"id": "output", "kind": "output"},
+        ],
+        "edges": [
+            {"from": "input", "to": "classify"},
+            {"from": "classify", "to": "answer", "condition": "safe"},
+            {"from": "classify", "to": "refuse", "condition": "not safe"},
+            {"from": "answer", "to": "output"},
+            {"from": "refuse", "to": "output"},
+        ],
+        "start_nodes": ["input"],
+        "end_nodes": ["output"],
+    },
+}
+
+
+class FakeStateGraph:
+    """Just enough of ``langgraph.graph.StateGraph`` to run a flow."""
+
+    compiled = 0
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.nodes = {}
+        self.edges = {}
+        self.routers = {}
+
+    def add_node(self, name, fn):
+        self.nodes[name] = fn
+
+    def add_edge(self, source, target):
+        self.edges.setdefault(source, []).append(target)
+
+    def add_conditional_edges(self, source, router, path_map):
+        self.routers[source] = router
+
+    def compile(self):
+        FakeStateGraph.compiled += 1
+        return self
+
+    def invoke(self, state):
+        frontier = list(self.edges[START])
+        while frontier:
+            name = frontier.pop(0)
+            if name == END:
+                continue
+            state = {**state, **self.nodes[name](state)}
+            if name in self.routers:
+                frontier.extend(self.routers[name](state))
+            frontier.extend(self.edges.get(name, []))
+        return state
+
+
+def make_adp(flow=FLOW) -> ADP:
+    return ADP.model_validate(
+        {
+            "adp_version": "0.1.0",
+            "id": "agent.flow",
+            "runtime": {"execution": [{"backend": "python", "id": "py"}]},
+            "flow": flow,
+        }
+    )
+
+
+def step(name):
+    def factory(adp, node):
+        return lambda state: {"path": [*state.get("path", []), node["id"]]}
+
+    return factory
+
+
+HANDLERS = {"router": step("router"), "llm": step("llm"), "tool": step("tool")}
+
+
+def test_compile_flow_routes_conditional_edges() -> None:
+    graph = compile_flow(make_adp(), HANDLERS, state_graph=FakeStateGraph)
+    assert graph.invoke({"safe": True})["path"] == ["classify", "answer"]
+    assert graph.invoke({"safe": False})["path"] == ["classify", "refuse"]
+    assert graph.edges[START] == ["input"] and graph.edges["output"] == [END]
+
+
+def test_handlers_by_node_id_override_kind() -> None:
+    handlers = {**HANDLERS, "answer": lambda adp, node: lambda s: {"agent": adp.id}}
+    graph = compile_flow(make_adp(), handlers, state_graph=FakeStateGraph)
+    result = graph.invoke({"safe": True})
+    assert result["agent"] == "agent.flow" and result["path"] == ["classify"]
+
+
+def test_compile_flow_rejects_missing_handler_and_unknown_nodes() -> None:
+    with pytest.raises(ValueError, match="no handler for node 'classify'"):
+        compile_flow(make_adp(), {}, state_graph=FakeStateGraph)
+    bad = yaml.safe_load(yaml.safe_dump(FLOW))
+    bad["graph"]["edges"].append({"from": "output", "to": "missing"})
+    with pytest.raises(ValueError, match="unknown node 'missing'"):
+        compile_flow(make_adp(bad), HANDLERS, state_graph=FakeStateGraph)
+
+
+def test_compile_flow_without_langgraph(monkeypatch) -> None:
+    monkeypatch.setattr("adp_sdk.flowgraph.StateGraph", None)
+    with pytest.raises(ImportError, match="langgraph is not installed"):
+        compile_flow(make_adp(), HANDLERS)
+
+
+def test_evaluate_condition() -> None:
+    state = {"route": "sql", "score": {"value": 3}, "empty": []}
+    assert evaluate_condition("route == sql", state)
+    assert evaluate_condition("score.value == 3", state)
+    assert evaluate_condition("route != chart", state)
+    assert evaluate_condition("not empty", state)
+    assert not evaluate_condition("missing.key", state)
+
+
+def test_compiler_memoizes_per_manifest_digest(tmp_path: Path, monkeypatch) -> None:
+    """One compile per package digest, however many requests ask for it."""
+    src = build_source(tmp_path / "src")
+    agent = yaml.safe_load((src / "adp" / "agent.yaml").read_text())
+    agent["flow"] = FLOW
+    (src / "adp" / "agent.yaml").write_text(yaml.safe_dump(agent))
+    pkg = ADPackage.create_from_directory(src, tmp_path / "oci")
+
+    compiler = FlowCompiler(HANDLERS, state_graph=FakeStateGraph)
+    before = FakeStateGraph.compiled
+    graphs = {id(compiler.for_package(ADPackage.open(pkg.path))) for _ in range(5)}
+    assert len(graphs) == 1 and FakeStateGraph.compiled == before + 1
+
+    agent_yaml = src / "adp" / "agent.yaml"
+    first = compiler.for_file(agent_yaml)
+    assert compiler.for_file(agent_yaml) is first
+    reads = []
+    monkeypatch.setattr(
+        Path, "read_bytes", lambda self: reads.append(self) or b"not: [yaml"
+    )
+    assert compiler.for_file(agent_yaml) is first and reads == []
+    monkeypatch.undo()
+    agent["name"] = "changed"
+    agent_yaml.write_text(yaml.safe_dump(agent))
+    assert compiler.for_file(agent_yaml) is not first
+
+
+def test_compile_flow_with_langgraph() -> None:
+    pytest.importorskip("langgraph")
+    graph = compile_flow(make_adp(), HANDLERS)
+    assert graph.invoke({"safe": True})["path"] == ["classify", "answer"]
+    assert graph.invoke({"safe": False})["path"] == ["classify", "refuse"]
+
+
+def test_langgraph_fan_out_and_join() -> None:
+    """Parallel branches each return an update; the join sees both."""
+    pytest.importorskip("langgraph")
+    flow = {
+        "id": "fan.flow",
+        "graph": {
+            "nodes": [
+                {"id": "in", "kind": "input"},
+                {"id": "a", "kind": "llm"},
+                {"id": "b", "kind": "tool"},
+                {"id": "out", "kind": "join"},
+            ],
+            "edges": [
+                {"from": "in", "to": "a"},
+                {"from": "in", "to": "b"},
+                {"from": "a", "to": "out"},
+                {"from": "b", "to": "out"},
+            ],
+            "start_nodes": ["in"],
+            "end_nodes": ["out"],
+        },
+    }
+    handlers = {
+        "a": lambda adp, node: lambda state: {"a": state["x"] + 1},
+        "b": lambda adp, node: lambda state: {"b": state["x"] + 2},
+        "join": lambda adp, node: lambda state: {"total": state["a"] + state["b"]},
+    }
+    result = compile_flow(make_adp(flow), handlers).invoke({"x": 1})
+    assert result == {"x": 1, "a": 2, "b": 3, "total": 5}
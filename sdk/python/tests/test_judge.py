@@ -0,0 +1,178 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from adp_sdk.evaluation import EvaluationRunner, Task
+from adp_sdk.judge import JudgeClient, JudgeError, JudgeRequest, TokenBucket
+
+
+class StubOpenAI:
+    """A local ``/v1/chat/completions`` endpoint that scores by answer length."""
+
+    def __init__(self):
+        self.bodies: list[dict] = []
+        self.auth: set[str] = set()
+        self.fail_next = 0
+        self.delay = 0.0
+        self.garble_batches = False
+        self.lock = threading.Lock()
+
+
+def make_handler(state: StubOpenAI):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with state.lock:
+                state.bodies.append(body)
+                state.auth.add(self.headers.get("Authorization", ""))
+                fail = state.fail_next > 0
+                state.fail_next -= fail
+            time.sleep(state.delay)
+            if self.path != "/v1/chat/completions" or fail:
+                status, payload = (404 if not fail else 429), b"{}"
+            else:
+                user = body["messages"][1]["content"]
+                answers = re.findall(r"Answer:\n(.*)", user)
+                if "JSON array" in user and not state.garble_batches:
+                    content = json.dumps([min(5, len(a)) for a in answers])
+                else:
+                    content = f"Score: {min(5, len(answers[-1]))}"
+                payload = json.dumps(
+                    {
+                        "choices": [
+                            {"message": {"role": "assistant", "content": content}}
+                        ]
+                    }
+                ).encode()
+                status = 200
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+@pytest.fixture
+def stub():
+    state = StubOpenAI()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    state.url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def test_token_bucket_limits_rate():
+    """After the burst, acquisitions are spaced by 1/rate."""
+    bucket = TokenBucket(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(7):
+        bucket.acquire()
+    assert time.monotonic() - start >= 5 / 50 * 0.9
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_score_many_dedupes_and_keeps_order(stub):
+    """Identical triples are sent once; results follow request order."""
+    stub.delay = 0.05
+    requests = [
+        JudgeRequest("m1", "judge", "q", "abc"),
+        JudgeRequest("m2", "judge", "q", "abcd"),
+        JudgeRequest("m1", "judge", "q", "abc"),
+    ]
+    with JudgeClient(stub.url, api_key="k", rate=100) as client:
+        assert client.score_many(requests * 4) == [3.0, 4.0, 3.0] * 4
+        assert client.requests_sent == 2
+        assert client.score(requests[0]) == 3.0
+        assert client.requests_sent == 2
+    assert stub.auth == {"Bearer k"}
+    assert {b["model"] for b in stub.bodies} == {"m1", "m2"}
+    assert all(b["temperature"] == 0 for b in stub.bodies)
+
+
+@pytest.mark.parametrize("garble", [False, True])
+def test_score_many_batches_per_model(stub, garble):
+    """One chat request per batch of a model; bad batch replies fall back."""
+    stub.garble_batches = garble
+    answers = ["a" * (i % 5 + 1) + str(i) for i in range(10)]
+    requests = [JudgeRequest(m, "judge", "q", a) for m in ("m1", "m2") for a in answers]
+    with JudgeClient(stub.url, rate=100, batch_size=4) as client:
+        scores = client.score_many(requests)
+        sent = client.requests_sent
+    assert scores == [float(min(5, len(a))) for a in answers] * 2
+    # Per model, 10 items make batches of 4, 4 and 2.
+    batched = 2 * 3
+    assert sent == (batched + 20 if garble else batched)
+    assert {b["model"] for b in stub.bodies} == {"m1", "m2"}
+
+
+def test_retries_on_rate_limit(stub):
+    """429 answers are retried with backoff before giving up."""
+    stub.fail_next = 2
+    with JudgeClient(stub.url, backoff=0.01, rate=100) as client:
+        assert client.score(JudgeRequest("m", "s", "q", "ab")) == 2.0
+    stub.fail_next = 5
+    with (
+        JudgeClient(stub.url, backoff=0.01, retries=1, rate=100) as client,
+        pytest.raises(JudgeError) as info,
+    ):
+        client.score(JudgeRequest("m", "s", "q", "other"))
+    assert info.value.status == 429
+
+
+def test_retries_acquire_rate_tokens(stub, monkeypatch):
+    """Every attempt, not just the first, waits for the model's bucket."""
+    acquired = []
+    monkeypatch.setattr(TokenBucket, "acquire", lambda self: acquired.append(1))
+    stub.fail_next = 2
+    with JudgeClient(stub.url, backoff=0, rate=100) as client:
+        assert client.score(JudgeRequest("m", "s", "q", "ab")) == 2.0
+    assert len(acquired) == 3
+
+
+def test_judge_plugs_into_runner(stub):
+    """The client serves as the runner's llm_judge evaluator."""
+    suites = [
+        {
+            "id": "judged",
+            "metrics": [
+                {
+                    "id": "grounded",
+                    "type": "llm_judge",
+                    "model": "judge-1",
+                    "system_prompt": "Grade the answer.",
+                    "rubric": [{"criterion": "Cites sources", "scale": "1-5"}],
+                    "threshold": 4,
+                }
+            ],
+            "promotion_threshold": 0.5,
+        }
+    ]
+    tasks = {"judged": [Task("t1", prompt="q1"), Task("t2", prompt="q2")]}
+    answers = {"t1": "long answer", "t2": "no"}
+    with JudgeClient(stub.url, rate=100) as client:
+        report = EvaluationRunner(
+            suites,
+            tasks,
+            agent=lambda task: answers[task.id],
+            evaluators={"llm_judge": client.evaluate},
+        ).run()
+    suite = report.suite("judged")
+    assert suite.metrics == {"grounded": 0.5} and suite.passed
+    assert "Cites sources (scale 1-5)" in stub.bodies[0]["messages"][0]["content"]
@@ -0,0 +1,296 @@
+"""Tests for OCI distribution push/pull against an in-process registry."""
+
+import hashlib
+import json
+import random
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from test_adpkg import build_source
+
+from adp_sdk.adpkg import ADPackage
+from adp_sdk.chunking import ChunkParams
+from adp_sdk.registry import RegistryClient
+
+
+class StubRegistry:
+    """Just enough of the OCI distribution API to exercise the client."""
+
+    def __init__(self):
+        self.blobs: dict[str, bytes] = {}
+        self.manifests: dict[tuple[str, str], bytes] = {}
+        self.uploads: dict[str, bytearray] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.fail_patches = 0
+        self.reject_patches = 0
+        self.truncate_gets = 0
+        self.lock = threading.Lock()
+
+
+def make_handler(state: StubRegistry):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=b"", headers=None):
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return self.rfile.read(length) if length else b""
+
+        def _route(self):
+            with state.lock:
+                state.requests.append((self.command, self.path))
+            path, _, query = self.path.partition("?")
+            parts = path.strip("/").split("/")
+            return parts, query
+
+        def do_HEAD(self):
+            parts, _ = self._route()
+            digest = parts[-1]
+            if parts[-2] == "blobs" and digest in state.blobs:
+                self._send(200, headers={"Docker-Content-Digest": digest})
+            else:
+                self._send(404)
+
+        def do_GET(self):
+            parts, _ = self._route()
+            if parts[-2] == "manifests":
+                data = state.manifests.get((parts[1], parts[-1]))
+                return self._send(200, data) if data else self._send(404)
+            if parts[-2] == "uploads":
+                data = state.uploads[parts[-1]]
+                # Like the reference registry, an empty session reads 0-0.
+                headers = {"Location": self.path, "Range": f"0-{max(len(data) - 1, 0)}"}
+                return self._send(204, headers=headers)
+            data = state.blobs.get(parts[-1])
+            if data is None:
+                return self._send(404)
+            start, end = 0, len(data) - 1
+            status = 200
+            if "Range" in self.headers:
+                spec = self.headers["Range"].split("=", 1)[1]
+                start, end = (int(x) for x in spec.split("-"))
+                status = 206
+            body = data[start : end + 1]
+            if state.truncate_gets:
+                state.truncate_gets -= 1
+                # Promise the full range, deliver half, then drop the socket.
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body[: len(body) // 2])
+                self.close_connection = True
+                return
+            self._send(status, body)
+
+        def do_POST(self):
+            parts, _ = self._route()
+            upload_id = uuid.uuid4().hex
+            state.uploads[upload_id] = bytearray()
+            location = f"/v2/{parts[1]}/blobs/uploads/{upload_id}"
+            self._send(202, headers={"Location": location})
+
+        def do_PATCH(self):
+            parts, _ = self._route()
+            body = self._body()
+            if state.reject_patches:
+                state.reject_patches -= 1
+                return self._send(500)
+            if state.fail_patches:
+                state.fail_patches -= 1
+                # Accept half the chunk, then report a server error.
+                state.uploads[parts[-1]].extend(body[: len(body) // 2])
+                return self._send(500)
+            start = int(self.headers["Content-Range"].split("-")[0])
+            upload = state.uploads[parts[-1]]
+            if start != len(upload):
+                return self._send(416)
+            upload.extend(body)
+            self._send(202, headers={"Location": self.path})
+
+        def do_PUT(self):
+            parts, query = self._route()
+            body = self._body()
+            if parts[-2] == "manifests":
+                state.manifests[(parts[1], parts[-1])] = body
+                return self._send(201)
+            digest = query.split("digest=", 1)[1].replace("%3A", ":")
+            data = bytes(state.uploads.pop(parts[-1])) + body
+            if f"sha256:{hashlib.sha256(data).hexdigest()}" != digest:
+                return self._send(400)
+            state.blobs[digest] = data
+            self._send(201)
+
+    return Handler
+
+
+@pytest.fixture
+def registry():
+    state = StubRegistry()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    state.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def make_package(tmp_path: Path, name: str, payload: str = "v1") -> ADPackage:
+    src = build_source(tmp_path / name)
+    (src / "src").mkdir()
+    (src / "src" / "data.txt").write_text(payload * 5000)
+    return ADPackage.create_from_directory(src, tmp_path / f"{name}-oci")
+
+
+def test_push_pull_roundtrip(tmp_path: Path, registry: StubRegistry):
+    pkg = make_package(tmp_path, "a")
+    with RegistryClient(registry.url, chunk_size=4096) as client:
+        pushed = client.push(pkg, "acme/agent", "1.0")
+        pulled = client.pull("acme/agent", "1.0", tmp_path / "pulled")
+
+    assert len(pushed.transferred) == 2
+    assert pushed.skipped == []
+    assert pulled.manifest_digest == pushed.manifest_digest
+    out = ADPackage.open(tmp_path / "pulled")
+    assert out.read_adp().id == "agent.test"
+    assert sorted(out.list_blobs()) == sorted(pkg.list_blobs())
+
+
+def test_push_skips_existing_blobs(tmp_path: Path, registry: StubRegistry):
+    first = make_package(tmp_path, "a", "v1")
+    second = make_package(tmp_path, "b", "v2")
+    client = RegistryClient(registry.url)
+    client.push(first, "acme/agent", "1")
+    result = client.push(second, "acme/agent", "2")
+
+    layer = json.loads(second._blob(result.manifest_digest).read_text())["layers"][0]
+    assert result.transferred == [layer["digest"]], "only the new layer is sent"
+    assert len(result.skipped) == 1
+
+
+def test_push_resumes_interrupted_upload(tmp_path: Path, registry: StubRegistry):
+    pkg = make_package(tmp_path, "a")
+    registry.fail_patches = 1
+    client = RegistryClient(registry.url, chunk_size=4096, backoff=0)
+    result = client.push(pkg, "acme/agent", "1")
+
+    assert len(result.transferred) == 2
+    assert any(
+        method == "GET" and "/uploads/" in path for method, path in registry.requests
+    )
+
+
+def test_push_resumes_empty_upload_session(tmp_path: Path, registry: StubRegistry):
+    """A 0-0 Range on an empty session resumes from byte 0, not byte 1."""
+    pkg = make_package(tmp_path, "a")
+    registry.reject_patches = 1
+    client = RegistryClient(registry.url, chunk_size=4096, backoff=0)
+    result = client.push(pkg, "acme/agent", "1")
+    assert len(result.transferred) == 2
+    assert set(registry.blobs) >= set(result.transferred)
+
+
+def test_pull_resumes_and_skips_present_blobs(tmp_path: Path, registry: StubRegistry):
+    pkg = make_package(tmp_path, "a")
+    client = RegistryClient(registry.url, chunk_size=8192, backoff=0)
+    client.push(pkg, "acme/agent", "1")
+
+    registry.truncate_gets = 1
+    first = client.pull("acme/agent", "1", tmp_path / "pulled")
+    assert len(first.transferred) == 2
+    assert ADPackage.open(tmp_path / "pulled").read_adp().id == "agent.test"
+
+    again = client.pull("acme/agent", "1", tmp_path / "pulled")
+    assert again.transferred == []
+    assert len(again.skipped) == 2
+
+
+def test_chunked_packages_transfer_only_new_chunks(
+    tmp_path: Path, registry: StubRegistry
+):
+    params = ChunkParams(min_size=4096, avg_size=16384, max_size=65536)
+    data = random.Random(0).randbytes(400_000)
+    packages = []
+    for name, content in (("a", data), ("b", data[:200_000] + b"!" + data[200_000:])):
+        src = build_source(tmp_path / name)
+        (src / "src").mkdir()
+        (src / "src" / "index.bin").write_bytes(content)
+        packages.append(
+            ADPackage.create_from_directory(
+                src, tmp_path / f"{name}-oci", chunked=params
+            )
+        )
+
+    client = RegistryClient(registry.url, backoff=0)
+    first = client.push(packages[0], "acme/agent", "1")
+    second = client.push(packages[1], "acme/agent", "2")
+    assert len(second.transferred) < len(first.transferred) / 4
+
+    client.pull("acme/agent", "1", tmp_path / "v1")
+    pulled = client.pull("acme/agent", "2", tmp_path / "v2", seed=[tmp_path / "v1"])
+    assert len(pulled.transferred) == len(second.transferred)
+    out = ADPackage.open(tmp_path / "v2")
+    out.verify()
+    out.unpack(tmp_path / "deploy")
+    assert (tmp_path / "deploy" / "src" / "index.bin").read_bytes()[
+        200_000:200_001
+    ] == b"!"
+
+
+def test_pull_rejects_corrupt_blob(tmp_path: Path, registry: StubRegistry):
+    pkg = make_package(tmp_path, "a")
+    client = RegistryClient(registry.url)
+    client.push(pkg, "acme/agent", "1")
+    for digest, data in registry.blobs.items():
+        registry.blobs[digest] = data[:-1] + b"!"
+
+    with pytest.raises(ValueError, match="digest mismatch"):
+        client.pull("acme/agent", "1", tmp_path / "pulled")
+
+
+@pytest.mark.parametrize("digest", ["sha256:../../../escape", "md5:abc", None])
+def test_pull_rejects_invalid_manifest_digests(
+    tmp_path: Path, registry: StubRegistry, digest
+):
+    """Remote digests never become paths unless they are sha256 hex."""
+    manifest = {
+        "schemaVersion": 2,
+        "config": {"digest": digest, "size": 1},
+        "layers": [],
+    }
+    registry.manifests[("acme", "1")] = json.dumps(manifest).encode()
+    client = RegistryClient(registry.url)
+    with pytest.raises(ValueError, match="invalid blob digest"):
+        client.pull("acme/agent", "1", tmp_path / "pulled")
+    assert not (tmp_path / "escape").exists()
+
+
+def test_pull_fetches_repeated_digest_once(tmp_path: Path, registry: StubRegistry):
+    pkg = make_package(tmp_path, "a")
+    client = RegistryClient(registry.url)
+    client.push(pkg, "acme/agent", "1")
+    manifest = json.loads(registry.manifests[("acme", "1")])
+    manifest["layers"] = manifest["layers"] * 3
+    registry.manifests[("acme", "2")] = json.dumps(manifest).encode()
+
+    result = client.pull("acme/agent", "2", tmp_path / "pulled")
+    assert len(result.transferred) == 2
+    blob_gets = [r for r in registry.requests if r[0] == "GET" and "/blobs/" in r[1]]
+    assert len(blob_gets) == 2
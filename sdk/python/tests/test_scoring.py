@@ -0,0 +1,99 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from adp_sdk.evaluation import CaseResult
+from adp_sdk.evaluation import score_suite as score_cases
+from adp_sdk.scoring import (
+    ResultTable,
+    combine_values,
+    score_slices,
+    score_suite,
+)
+
+SUITE = {
+    "id": "quality",
+    "metrics": [
+        {"id": "valid", "type": "deterministic", "threshold": True},
+        {"id": "judge", "type": "llm_judge", "threshold": 4},
+        {"id": "raw", "type": "deterministic"},
+    ],
+    "scoring": {"combine": "weighted_average", "weights": {"valid": 2, "judge": 1}},
+    "promotion_threshold": 0.6,
+}
+
+
+def cases() -> list[CaseResult]:
+    rows = [
+        ("t1", {"valid": 1.0, "judge": 5.0, "raw": 0.5}),
+        ("t2", {"valid": 0.0, "judge": 4.0, "raw": 1.0}),
+        ("t3", {"valid": 1.0, "judge": 2.0, "raw": 0.0}),
+    ]
+    out = []
+    for task, scores in rows:
+        for metric, score in scores.items():
+            threshold = {"valid": True, "judge": 4}.get(metric)
+            passed = bool(score) if threshold in (None, True) else score >= threshold
+            out.append(CaseResult("quality", metric, task, score, passed, 0.0))
+    out.append(CaseResult("quality", "judge", "t4", 0.0, False, 0.0, "timeout"))
+    return out
+
+
+def test_score_suite_matches_runner_scoring():
+    """The vectorized path agrees with the runner's per-item scoring."""
+    expected = score_cases(SUITE, cases())
+    table = ResultTable.from_cases(cases())
+    result = score_suite(SUITE, table)
+    assert result.score == pytest.approx(expected.score)
+    assert result.passed == expected.passed
+    assert result.metrics == pytest.approx(expected.metrics)
+    assert result.cases == len(cases())
+
+
+def test_combine_values_vectorized_over_rows():
+    """combine_values reduces the last axis for every combine method."""
+    values = np.array([[1.0, 0.5], [1.0, 1.0]])
+    ids = ["a", "b"]
+    assert combine_values({}, ids, values).tolist() == [0.75, 1.0]
+    assert combine_values({"combine": "sum"}, ids, values).tolist() == [1.5, 2.0]
+    assert combine_values({"combine": "boolean"}, ids, values).tolist() == [0.0, 1.0]
+    weighted = {"combine": "weighted_average", "weights": {"a": 3}}
+    assert combine_values(weighted, ids, values).tolist() == [0.875, 1.0]
+    with pytest.raises(ValueError):
+        combine_values({"combine": "median"}, ids, values)
+
+
+def test_score_slices_by_tag_and_task():
+    """Slices are scored in one pass; multi-tagged tasks count in each slice."""
+    tags = {"t1": ["easy", "sql"], "t2": ["sql"], "t3": ["easy"]}
+    table = ResultTable.from_cases(cases(), tags=tags)
+    by_tag = score_slices(SUITE, table)
+    assert set(by_tag) == {"easy", "sql"}
+    assert by_tag["easy"].metrics["valid"] == 1.0
+    assert by_tag["easy"].metrics["judge"] == 0.5
+    assert by_tag["sql"].metrics["valid"] == 0.5
+    assert by_tag["sql"].cases == 6
+
+    by_task = score_slices(SUITE, table, by="task")
+    assert by_task["t1"].passed and by_task["t1"].score == 0.875
+    # t4 only has a failed judge case.
+    assert by_task["t4"].metrics == {"valid": 0.0, "judge": 0.0, "raw": 0.0}
+    assert not by_task["t4"].passed
+
+
+def test_from_columns_handles_large_tables():
+    """Columns of scores score without per-row Python work."""
+    n = 200_000
+    rng = np.random.default_rng(0)
+    table = ResultTable.from_columns(
+        {
+            "valid": rng.random(n) > 0.1,
+            "judge": rng.integers(1, 6, n),
+            "raw": rng.random(n),
+        }
+    )
+    result = score_suite(SUITE, table)
+    assert 0.8 < result.metrics["valid"] < 0.95
+    assert result.cases == 3 * n
+    halves = score_slices(SUITE, table, by={t: str(int(t) % 2) for t in table.task_ids})
+    assert set(halves) == {"0", "1"}
@@ -0,0 +1,144 @@
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from adp_sdk.evaluation import EvaluationRunner
+from adp_sdk.telemetry import (
+    TDigest,
+    TelemetryEvaluator,
+    iter_values,
+    parse_quantile_metric,
+    sketch_files,
+)
+
+
+def exact(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def write_traces(path, values):
+    with path.open("w") as f:
+        for i, value in enumerate(values):
+            f.write(json.dumps({"span": i, "attributes": {"latency_ms": value}}) + "\n")
+            if i % 100 == 0:
+                f.write("not json\n\n")
+
+
+def test_tdigest_tail_quantiles_are_accurate():
+    """p50/p95/p99 land within a fraction of a percent of the exact values."""
+    rng = random.Random(1)
+    values = [rng.lognormvariate(4, 0.6) for _ in range(50_000)]
+    digest = TDigest().update(values)
+    for q in (0.5, 0.95, 0.99):
+        assert digest.quantile(q) == pytest.approx(exact(values, q), rel=0.01)
+    assert digest.quantile(0) == min(values) and digest.quantile(1) == max(values)
+    assert len(digest.means) < 400
+    assert TDigest().quantile(0.5) != TDigest().quantile(0.5)  # NaN
+
+
+def test_merged_digests_match_single_digest():
+    """Digests over shards merge to the same answer as one pass."""
+    rng = random.Random(2)
+    values = [rng.expovariate(1 / 200) for _ in range(30_000)]
+    parts = [TDigest().update(values[i::3]) for i in range(3)]
+    merged = TDigest()
+    for part in parts:
+        merged.merge(TDigest.from_dict(part.to_dict()))
+    assert merged.count == len(values)
+    assert merged.quantile(0.95) == pytest.approx(exact(values, 0.95), rel=0.01)
+
+
+def test_sharded_file_sketch_reads_every_line_once(tmp_path):
+    """Byte shards split on line boundaries: no record is lost or doubled."""
+    rng = random.Random(3)
+    values = [rng.uniform(0, 1000) for _ in range(5_000)]
+    path = tmp_path / "traces.jsonl"
+    write_traces(path, values)
+
+    assert list(iter_values(path, "attributes.latency_ms")) == values
+    with ThreadPoolExecutor(4) as pool:
+        digest = sketch_files(
+            [path], "attributes.latency_ms", shard_bytes=4096, executor=pool
+        )
+    assert digest.count == len(values)
+    assert digest.quantile(0.95) == pytest.approx(exact(values, 0.95), rel=0.01)
+
+
+def test_sketch_files_uses_process_pool(tmp_path):
+    """Shards run in worker processes when no executor is given."""
+    paths = []
+    for i in range(2):
+        path = tmp_path / f"shard{i}.jsonl"
+        write_traces(path, [float(v) for v in range(i * 100, i * 100 + 100)])
+        paths.append(path)
+    digest = sketch_files(paths, "attributes.latency_ms", shard_bytes=2048, workers=2)
+    assert digest.count == 200
+    assert digest.quantile(0.5) == pytest.approx(100, abs=2)
+
+
+def test_telemetry_evaluator_in_runner(tmp_path):
+    """p95_latency_ms is computed from traces and gated on max_ms."""
+    path = tmp_path / "traces.jsonl"
+    write_traces(path, [float(v) for v in range(1, 1001)])
+    suites = [
+        {
+            "id": "perf",
+            "metrics": [
+                {
+                    "id": "p95",
+                    "type": "telemetry",
+                    "metric": "p95_latency_ms",
+                    "max_ms": 2500,
+                },
+                {
+                    "id": "p99",
+                    "type": "telemetry",
+                    "metric": "p99_latency_ms",
+                    "max_ms": 900,
+                },
+            ],
+        }
+    ]
+    evaluator = TelemetryEvaluator(
+        [path],
+        fields={
+            "p95_latency_ms": "attributes.latency_ms",
+            "p99_latency_ms": "attributes.latency_ms",
+        },
+    )
+    report = EvaluationRunner(suites, evaluators={"telemetry": evaluator}).run()
+    assert report.suite("perf").metrics == {"p95": 1.0, "p99": 0.0}
+    assert evaluator.values["p95"] == pytest.approx(950, abs=2)
+    assert parse_quantile_metric("p99.9_latency_ms") == (
+        pytest.approx(0.999),
+        "latency_ms",
+    )
+    with pytest.raises(ValueError):
+        parse_quantile_metric("latency_ms")
+
+
+def test_telemetry_threshold_is_not_a_latency_limit(tmp_path):
+    """``threshold`` gates the verdict; only ``max_ms`` bounds the latency."""
+    path = tmp_path / "traces.jsonl"
+    write_traces(path, [float(v) for v in range(1, 101)])
+    metric = {"type": "telemetry", "metric": "p95_latency_ms"}
+    suites = [
+        {
+            "id": "perf",
+            "metrics": [
+                {**metric, "id": "only_threshold", "threshold": 300},
+                {**metric, "id": "both", "max_ms": 300, "threshold": 1.0},
+            ],
+        }
+    ]
+    evaluator = TelemetryEvaluator(
+        [path], fields={"p95_latency_ms": "attributes.latency_ms"}
+    )
+    result = EvaluationRunner(suites, evaluators={"telemetry": evaluator}).run()
+    perf = result.suite("perf")
+    assert perf.metrics == {"only_threshold": 0.0, "both": 1.0}
+    (bad,) = [c for c in perf.cases if c.metric == "only_threshold"]
+    assert "has no max_ms" in bad.error
@@ -0,0 +1,91 @@
+from contextlib import contextmanager
+
+from test_adpkg import build_source
+
+from adp_sdk import tracing
+from adp_sdk.adpkg import ADPackage
+from adp_sdk.tracing import OpenTelemetryTracer, RecordingTracer, set_tracer
+
+
+def test_disabled_tracer_returns_shared_null_span():
+    """Without a tracer every span is the same no-op object."""
+    set_tracer(None)
+    assert tracing.span("a") is tracing.span("b", x=1)
+
+
+def test_recording_tracer_covers_pack_read_and_validate(tmp_path):
+    """Packing and reading emit one span per phase with byte counters."""
+    src = tmp_path / "src"
+    build_source(src)
+    tracer = RecordingTracer()
+    set_tracer(tracer)
+    try:
+        pkg = ADPackage.create_from_directory(src, tmp_path / "oci")
+        pkg.read_adp()
+    finally:
+        set_tracer(None)
+
+    by_name = {r.name: r for r in tracer.records}
+    for name in (
+        "adp.pack",
+        "adp.pack.load",
+        "adp.pack.iter_files",
+        "adp.pack.tar",
+        "adp.hash",
+        "adp.pack.blob_write",
+        "adp.validate",
+        "adp.validate.schema",
+        "adp.read_adp",
+        "adp.read.layer",
+        "adp.read.parse",
+    ):
+        assert name in by_name, name
+    assert by_name["adp.pack.iter_files"].attributes["adp.files"] == 3
+    assert by_name["adp.pack.tar"].attributes["adp.bytes"] > 0
+    assert by_name["adp.validate"].attributes["adp.errors"] == 0
+    assert by_name["adp.validate"].parent == "adp.pack"
+    assert by_name["adp.read.layer"].parent == "adp.read_adp"
+    assert by_name["adp.pack"].seconds >= by_name["adp.pack.tar"].seconds
+    assert set(tracer.totals()) == set(by_name)
+
+
+def test_span_records_error(tmp_path):
+    """A failing phase is still reported, tagged with the exception type."""
+    tracer = RecordingTracer()
+    set_tracer(tracer)
+    try:
+        ADPackage.create_from_directory(tmp_path / "missing", tmp_path / "oci")
+    except FileNotFoundError:
+        pass
+    finally:
+        set_tracer(None)
+    assert tracer.records[-1].name == "adp.pack"
+    assert tracer.records[-1].error == "FileNotFoundError"
+
+
+class _FakeOtelTracer:
+    def __init__(self):
+        self.started = []
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        self.started.append((name, dict(attributes or {})))
+        yield self
+
+    def set_attribute(self, key, value):
+        self.started[-1][1][key] = value
+
+
+def test_opentelemetry_adapter_forwards_spans(tmp_path):
+    """The adapter opens spans through ``start_as_current_span``."""
+    src = tmp_path / "src"
+    build_source(src)
+    otel = _FakeOtelTracer()
+    set_tracer(OpenTelemetryTracer(otel))
+    try:
+        ADPackage.create_from_directory(src, tmp_path / "oci")
+    finally:
+        set_tracer(None)
+    names = [name for name, _ in otel.started]
+    assert names[0] == "adp.pack"
+    assert "adp.validate" in names
@@ -0,0 +1,198 @@
+"""Tests for ADPackage.unpack and layer extraction."""
+
+import io
+import os
+import tarfile
+from pathlib import Path
+
+import pytest
+from test_adpkg import build_source
+
+from adp_sdk.adpkg import ADPackage
+from adp_sdk.unpack import extract_layers, safe_target, state_path
+
+
+def make_package(tmp_path: Path) -> ADPackage:
+    src = build_source(tmp_path / "src")
+    (src / "src").mkdir()
+    (src / "src" / "main.py").write_text("print('hello')\n")
+    return ADPackage.create_from_directory(src, tmp_path / "oci")
+
+
+def test_unpack_writes_layer_contents(tmp_path: Path):
+    pkg = make_package(tmp_path)
+    dest = tmp_path / "deploy"
+    result = pkg.unpack(dest)
+
+    assert (dest / "adp" / "agent.yaml").exists()
+    assert (dest / "src" / "main.py").read_text() == "print('hello')\n"
+    assert result.written == 4
+    assert result.skipped == 0
+    assert result.bytes_written > 0
+
+
+def test_unpack_skips_unchanged_files(tmp_path: Path):
+    pkg = make_package(tmp_path)
+    dest = tmp_path / "deploy"
+    pkg.unpack(dest)
+
+    (dest / "src" / "main.py").write_text("print('local edit')\n")
+    result = pkg.unpack(dest, workers=2)
+
+    assert result.written == 1, "only the modified file should be rewritten"
+    assert result.skipped == 3
+    assert (dest / "src" / "main.py").read_text() == "print('hello')\n"
+
+
+def test_unpack_skips_without_state_file(tmp_path: Path):
+    pkg = make_package(tmp_path)
+    dest = tmp_path / "deploy"
+    pkg.unpack(dest)
+    assert not list(dest.glob(".adpkg*"))
+    state_path(dest).unlink()
+
+    result = pkg.unpack(dest)
+    assert result.skipped == 4
+    assert result.written == 0
+
+
+def test_unpack_hardlinks_from_shared_cache(tmp_path: Path):
+    pkg = make_package(tmp_path)
+    cache = tmp_path / "cache"
+    first = pkg.unpack(tmp_path / "a", cache_dir=cache)
+    second = pkg.unpack(tmp_path / "b", cache_dir=cache)
+
+    assert first.written == 4
+    assert second.linked == 4
+    assert second.bytes_written == 0
+    a = (tmp_path / "a" / "src" / "main.py").stat()
+    b = (tmp_path / "b" / "src" / "main.py").stat()
+    assert a.st_ino == b.st_ino
+
+
+def _tar_with(name: str, data: bytes = b"x", **attrs) -> io.BytesIO:
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        for key, value in attrs.items():
+            setattr(info, key, value)
+        tar.addfile(info, io.BytesIO(data) if info.isreg() else None)
+    buf.seek(0)
+    return buf
+
+
+@pytest.mark.parametrize("name", ["../evil.txt", "/etc/evil", "a/../../evil"])
+def test_unpack_rejects_path_traversal(tmp_path: Path, name: str):
+    dest = tmp_path / "deploy"
+    with pytest.raises(ValueError, match="unsafe"):
+        extract_layers([_tar_with(name)], dest)
+    assert not (tmp_path / "evil.txt").exists()
+
+
+def test_unpack_rejects_escaping_symlink(tmp_path: Path):
+    layer = _tar_with("link", b"", type=tarfile.SYMTYPE, linkname="../../outside")
+    with pytest.raises(ValueError, match="unsafe"):
+        extract_layers([layer], tmp_path / "deploy")
+
+
+def test_unpack_keeps_internal_symlink(tmp_path: Path):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        info = tarfile.TarInfo("src/real.py")
+        info.size = 2
+        tar.addfile(info, io.BytesIO(b"ok"))
+        link = tarfile.TarInfo("src/alias.py")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "real.py"
+        tar.addfile(link)
+    buf.seek(0)
+    dest = tmp_path / "deploy"
+    extract_layers([buf], dest)
+    assert os.readlink(dest / "src" / "alias.py") == "real.py"
+    assert (dest / "src" / "alias.py").read_text() == "ok"
+
+
+def _symlink_tar(links: list[tuple[str, str]]) -> io.BytesIO:
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        for name, linkname in links:
+            info = tarfile.TarInfo(name)
+            info.type = tarfile.SYMTYPE
+            info.linkname = linkname
+            tar.addfile(info)
+    buf.seek(0)
+    return buf
+
+
+@pytest.mark.parametrize(
+    "links",
+    [
+        [("a/b/c", ".."), ("d", "a/b/c/../.."), ("d/pwned", "../a")],
+        # Same chain, but d is created before c makes it escape.
+        [("d", "a/b/c/../.."), ("a/b/c", ".."), ("d/pwned", "../a")],
+    ],
+)
+def test_unpack_rejects_symlink_chain_escape(tmp_path: Path, links):
+    dest = tmp_path / "out" / "deploy"
+    with pytest.raises(ValueError, match="unsafe"):
+        extract_layers([_symlink_tar(links)], dest)
+    assert not os.path.lexists(tmp_path / "out" / "pwned")
+    assert not os.path.lexists(dest / "d") or (dest / "d").resolve().is_relative_to(
+        dest.resolve()
+    )
+
+
+def test_unpack_streams_large_members(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr("adp_sdk.unpack.STREAM_THRESHOLD", 16)
+    data = os.urandom(4096)
+    dest = tmp_path / "deploy"
+    result = extract_layers([_tar_with("big.bin", data)], dest)
+    assert (dest / "big.bin").read_bytes() == data
+    assert result.written == 1 and result.bytes_written == len(data)
+    again = extract_layers([_tar_with("big.bin", data)], dest, cache_dir=tmp_path / "c")
+    assert again.skipped == 1
+    assert not list(dest.glob(".*adpkg-tmp"))
+
+
+def test_safe_target_rejects_symlinked_parent(tmp_path: Path):
+    dest = tmp_path / "deploy"
+    dest.mkdir()
+    (dest / "escape").symlink_to(tmp_path)
+    with pytest.raises(ValueError):
+        safe_target(dest.resolve(), "escape/file.txt")
+
+
+def test_unpack_replaces_directory_with_link(tmp_path: Path):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        info = tarfile.TarInfo("real.txt")
+        info.size = 2
+        tar.addfile(info, io.BytesIO(b"ok"))
+        for name, kind in (("sym", tarfile.SYMTYPE), ("hard", tarfile.LNKTYPE)):
+            link = tarfile.TarInfo(name)
+            link.type = kind
+            link.linkname = "real.txt"
+            tar.addfile(link)
+    dest = tmp_path / "deploy"
+    for name in ("sym", "hard"):
+        (dest / name / "nested").mkdir(parents=True)
+    buf.seek(0)
+    extract_layers([buf], dest)
+    assert os.readlink(dest / "sym") == "real.txt"
+    assert (dest / "hard").read_text() == "ok"
+
+
+def test_unpack_repeated_member_last_wins(tmp_path: Path):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        for i in range(20):
+            data = str(i).encode() * (1000 * (20 - i))
+            info = tarfile.TarInfo("same.txt")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    buf.seek(0)
+    dest = tmp_path / "deploy"
+    extract_layers([buf], dest, workers=8)
+    assert (dest / "same.txt").read_bytes() == b"19" * 1000
+    assert [p.name for p in dest.iterdir()] == ["same.txt"]
@@ -0,0 +1,121 @@
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+import yaml
+from test_adpkg import build_source
+
+from adp_sdk.adpkg import ADPackage
+from adp_sdk.wheelhouse import WHEELHOUSE_MEDIA_TYPE, _extract
+
+
+def make_wheel(wheel_dir: Path, name: str, version: str, requires=()) -> Path:
+    """Write a minimal pure-Python wheel that pip can resolve and install."""
+    dist = f"{name}-{version}.dist-info"
+    files = {
+        f"{name}/__init__.py": f"VERSION = {version!r}\n",
+        f"{dist}/METADATA": "Metadata-Version: 2.1\n"
+        f"Name: {name}\nVersion: {version}\n"
+        + "".join(f"Requires-Dist: {r}\n" for r in requires),
+        f"{dist}/WHEEL": "Wheel-Version: 1.0\nGenerator: test\n"
+        "Root-Is-Purelib: true\nTag: py3-none-any\n",
+    }
+    files[f"{dist}/RECORD"] = "".join(f"{n},,\n" for n in files) + f"{dist}/RECORD,,\n"
+    path = wheel_dir / f"{name}-{version}-py3-none-any.whl"
+    with zipfile.ZipFile(path, "w") as zf:
+        for arcname, text in files.items():
+            zf.writestr(zipfile.ZipInfo(arcname, (1980, 1, 1, 0, 0, 0)), text)
+    return path
+
+
+def source_with_deps(path: Path, deps: list[str]) -> Path:
+    build_source(path)
+    acs = yaml.safe_load((path / "acs" / "container.yaml").read_text()) or {}
+    acs.setdefault("build", {}).setdefault("dependencies", {})["python"] = deps
+    (path / "acs" / "container.yaml").write_text(yaml.safe_dump(acs))
+    return path
+
+
+@pytest.fixture
+def wheels(tmp_path):
+    wheel_dir = tmp_path / "wheels"
+    wheel_dir.mkdir()
+    make_wheel(wheel_dir, "demo_agent_dep", "1.0", requires=["demo_transitive"])
+    make_wheel(wheel_dir, "demo_transitive", "2.0")
+    make_wheel(wheel_dir, "demo_unused", "1.0")
+    return wheel_dir
+
+
+def test_wheelhouse_layer_is_shared_and_deterministic(tmp_path, wheels):
+    """Two agents with one dependency set get the same wheelhouse blob."""
+    layers = []
+    for name in ("a", "b"):
+        src = source_with_deps(tmp_path / name, ["demo_agent_dep==1.0"])
+        if name == "b":
+            (src / "src").mkdir(exist_ok=True)
+            (src / "src" / "extra.py").write_text("x = 1\n")
+        pkg = ADPackage.create_from_directory(
+            src, tmp_path / f"oci-{name}", wheelhouse=wheels
+        )
+        layers.append(pkg._wheelhouse_layer())
+    assert layers[0] == layers[1]
+    assert layers[0]["mediaType"] == WHEELHOUSE_MEDIA_TYPE
+
+    with tarfile.open(pkg._blob(layers[0]["digest"])) as tar:
+        names = tar.getnames()
+    assert names == [
+        "wheels/requirements.txt",
+        "wheels/demo_agent_dep-1.0-py3-none-any.whl",
+        "wheels/demo_transitive-2.0-py3-none-any.whl",
+    ]
+    # The wheelhouse does not leak into the agent files.
+    pkg.unpack(tmp_path / "deploy")
+    assert not (tmp_path / "deploy" / "wheels").exists()
+    pkg.verify()
+
+
+def test_install_dependencies_offline(tmp_path, wheels):
+    """Bundled wheels install into a target without any package index."""
+    src = source_with_deps(tmp_path / "src", ["demo_agent_dep==1.0"])
+    pkg = ADPackage.create_from_directory(src, tmp_path / "oci", wheelhouse=wheels)
+    cache = tmp_path / "cache"
+    digest = pkg.install_dependencies(tmp_path / "site", cache_dir=cache)
+    assert (tmp_path / "site" / "demo_agent_dep" / "__init__.py").exists()
+    assert (tmp_path / "site" / "demo_transitive" / "__init__.py").exists()
+    assert (cache / digest.split(":", 1)[1] / "wheels").is_dir()
+
+
+def test_wheelhouse_errors(tmp_path, wheels):
+    """Missing wheels fail packing; packages without a wheelhouse cannot install."""
+    src = source_with_deps(tmp_path / "src", ["not_in_wheelhouse==1.0"])
+    with pytest.raises(RuntimeError):
+        ADPackage.create_from_directory(src, tmp_path / "oci", wheelhouse=wheels)
+    plain = ADPackage.create_from_directory(src, tmp_path / "plain")
+    assert plain._wheelhouse_layer() is None
+    with pytest.raises(ValueError):
+        plain.install_dependencies(tmp_path / "site")
+
+
+@pytest.mark.parametrize("data_filter", [True, False])
+def test_extract_rejects_unsafe_members(tmp_path, monkeypatch, data_filter):
+    """Without tarfile.data_filter (< 3.11.4) members are checked by hand."""
+    if not data_filter:
+        monkeypatch.delattr(tarfile, "data_filter", raising=False)
+    good = tmp_path / "good.tar"
+    with tarfile.open(good, "w") as tar:
+        tar.add(__file__, "wheels/pkg-1.0-py3-none-any.whl")
+    _extract(good, tmp_path / "ok")
+    assert (tmp_path / "ok" / "wheels" / "pkg-1.0-py3-none-any.whl").is_file()
+
+    for name, kind in (("../evil.whl", tarfile.REGTYPE), ("link", tarfile.SYMTYPE)):
+        bad = tmp_path / "bad.tar"
+        with tarfile.open(bad, "w") as tar:
+            info = tarfile.TarInfo(name)
+            info.type = kind
+            info.linkname = "/etc/passwd"
+            tar.addfile(info)
+        with pytest.raises((ValueError, tarfile.TarError)):
+            _extract(bad, tmp_path / "out")
+        assert not (tmp_path / "evil.whl").exists()
+        assert not (tmp_path / "out" / "link").exists()
@@ -0,0 +1,201 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from test_adpkg import build_source
+
+from adp_sdk.adpkg import ADPackage
+from adp_sdk.workers import WorkerError, WorkerPool, resolve_entrypoint
+
+AGENT_MODULE = """
+import os
+import time
+
+IMPORTED_PID = os.getpid()
+
+
+def app(payload):
+    if payload == "boom":
+        raise ValueError("boom")
+    if payload == "exit":
+        os._exit(3)
+    if payload == "sleep":
+        time.sleep(30)
+    return {
+        "echo": payload,
+        "pid": os.getpid(),
+        "imported_pid": IMPORTED_PID,
+        "env": os.environ.get("AGENT_MODE"),
+    }
+"""
+
+
+def build_package(tmp_path: Path) -> ADPackage:
+    src = build_source(tmp_path / "src")
+    agent = src / "agent"
+    agent.mkdir()
+    (agent / "__init__.py").write_text("")
+    (agent / "main.py").write_text(AGENT_MODULE)
+    yaml_path = src / "adp" / "agent.yaml"
+    yaml_path.write_text(
+        yaml_path.read_text().replace(
+            'entrypoint: "agent.main:app"',
+            'entrypoint: "agent.main:app"\n'
+            "              env:\n"
+            '                AGENT_MODE: "warm"',
+        )
+    )
+    return ADPackage.create_from_directory(src, tmp_path / "oci")
+
+
+def test_pool_serves_from_warm_workers(tmp_path: Path) -> None:
+    """Workers import the agent once, with the entry env, and serve calls."""
+    pkg = build_package(tmp_path)
+    with pkg.worker_pool(workers=2) as pool:
+        results = [pool.call(i) for i in range(4)]
+        health = pool.health()
+    assert [r["echo"] for r in results] == [0, 1, 2, 3]
+    assert all(r["env"] == "warm" for r in results)
+    assert all(r["pid"] == r["imported_pid"] != os.getpid() for r in results)
+    assert health.healthy and len(health.workers) == 2
+    assert health.requests == 4 and health.errors == 0
+    assert sum(w.served for w in health.workers) == 4
+
+
+def test_pool_recycles_after_max_requests(tmp_path: Path) -> None:
+    pkg = build_package(tmp_path)
+    with pkg.worker_pool(workers=1, max_requests=2) as pool:
+        pids = [pool.call("x")["pid"] for _ in range(5)]
+        health = pool.health()
+    assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+    assert health.recycled == 2 and health.healthy
+
+
+def test_pool_reports_errors_and_replaces_dead_workers(tmp_path: Path) -> None:
+    pkg = build_package(tmp_path)
+    with pkg.worker_pool(workers=1) as pool:
+        with pytest.raises(WorkerError, match="ValueError: boom"):
+            pool.call("boom")
+        with pytest.raises(WorkerError, match="worker died"):
+            pool.call("exit")
+        assert pool.call("ok")["echo"] == "ok"
+        health = pool.health()
+    assert health.errors == 2 and health.restarts == 1 and health.healthy
+
+
+def test_pool_concurrent_calls_and_latency(tmp_path: Path) -> None:
+    """Concurrent callers are spread over workers; warm calls beat cold start."""
+    pkg = build_package(tmp_path)
+    with pkg.worker_pool(workers=2) as pool:
+        results: list[dict] = []
+        threads = [
+            threading.Thread(target=lambda i=i: results.append(pool.call(i)))
+            for i in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        warm = pool.measure_warm("x", samples=5)
+        cold = pool.measure_cold("x")
+    assert sorted(r["echo"] for r in results) == list(range(8))
+    assert warm < cold
+
+
+def test_resolve_entrypoint_variants(tmp_path: Path, monkeypatch) -> None:
+    (tmp_path / "entry_mod.py").write_text(
+        "def main():\n    return 'no-args'\n\n"
+        "class Graph:\n    def invoke(self, state):\n        return state + 1\n\n"
+        "graph = Graph()\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    assert resolve_entrypoint("entry_mod:main")({"ignored": True}) == "no-args"
+    assert resolve_entrypoint("entry_mod:graph")(1) == 2
+
+
+def test_pool_rejects_unloadable_entrypoint(tmp_path: Path) -> None:
+    pool = WorkerPool(tmp_path, "missing_module:app", workers=1)
+    with pytest.raises(WorkerError, match="cannot load entrypoint"):
+        pool.start()
+    pool.close()
+
+
+def test_pool_recycles_in_background(tmp_path: Path, monkeypatch) -> None:
+    """The request that triggers a recycle does not wait for the respawn."""
+    pkg = build_package(tmp_path)
+    with pkg.worker_pool(workers=1, max_requests=1) as pool:
+        ready = threading.Event()
+        monkeypatch.setattr(pool, "_respawn", ready.wait)
+        start = time.monotonic()
+        pool.call("x")
+        assert time.monotonic() - start < 5
+        with pytest.raises(TimeoutError, match="no idle worker"):
+            pool.call("x", timeout=0.2)
+        ready.set()
+
+
+def test_pool_close_wakes_waiting_callers(tmp_path: Path) -> None:
+    pkg = build_package(tmp_path)
+    pool = pkg.worker_pool(workers=1).start()
+    pool._idle.get()  # nothing idle: the next caller has to wait
+    errors: list[BaseException] = []
+
+    def waiter() -> None:
+        try:
+            pool.call("x")
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    pool.close()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert "closed" in str(errors[0])
+
+
+def test_pool_failed_respawn_keeps_slot(tmp_path: Path, monkeypatch) -> None:
+    """A spawn failure surfaces as an error and the slot is retried."""
+    pkg = build_package(tmp_path)
+    with pkg.worker_pool(workers=1) as pool:
+        spawn = pool._spawn
+        attempts = iter([WorkerError("spawn failed")])
+
+        def flaky_spawn():
+            failure = next(attempts, None)
+            if failure is not None:
+                raise failure
+            return spawn()
+
+        monkeypatch.setattr(pool, "_spawn", flaky_spawn)
+        with pytest.raises(WorkerError, match="worker died"):
+            pool.call("exit")
+        with pytest.raises(WorkerError, match="failed to start: spawn failed"):
+            pool.call("x", timeout=30)
+        assert pool.call("ok", timeout=30)["echo"] == "ok"
+        assert pool.health().restarts == 2
+
+
+def test_pool_close_during_call(tmp_path: Path) -> None:
+    """Closing the pool under a running call fails that call cleanly."""
+    pkg = build_package(tmp_path)
+    pool = pkg.worker_pool(workers=1).start()
+    errors: list[RuntimeError] = []
+
+    def caller() -> None:
+        try:
+            pool.call("sleep")
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    thread = threading.Thread(target=caller)
+    thread.start()
+    time.sleep(0.5)
+    pool.close()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert [str(e) for e in errors] == ["worker pool closed during the call"]
+    assert "closed" in str(errors[0])
+    assert pool.health().workers == []